@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_CACHE_KEY = "auth-token:{key}"
+
+
+def invalidate_cached_token(key: str) -> None:
+    cache.delete(TOKEN_CACHE_KEY.format(key=key))
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """Сбрасывает закэшированные токены вместе с копией пользователя."""
+    for key in Token.objects.filter(user_id=user_id).values_list(
+        "key", flat=True
+    ):
+        invalidate_cached_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по токену с кэшированием пользователя."""
+
+    def authenticate_credentials(self, key):
+        cache_key = TOKEN_CACHE_KEY.format(key=key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_SECONDS)
+            return user, token
+        return token.user, token
@@ -0,0 +1,121 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from api.relations import get_user_relations
+from api.serializers import UserSerializer
+from recipes.models import Recipe, RecipeIngredient
+
+RecipeTag = Recipe.tags.through
+
+USER_FIELDS = UserSerializer.Meta.fields
+AUTHOR_FIELDS = tuple(
+    field for field in USER_FIELDS if field != "is_subscribed"
+)
+RECIPE_COLUMNS = ("id", "name", "text", "cooking_time")
+
+
+def card_columns(fieldset) -> list:
+    """Колонки values() для выбранных полей карточки."""
+    columns = ["id"]
+    columns.extend(
+        field
+        for field in ("name", "text", "cooking_time", "image")
+        if field in fieldset
+    )
+    if fieldset.is_expanded("author"):
+        columns.extend(f"author__{field}" for field in AUTHOR_FIELDS)
+    elif "author" in fieldset:
+        columns.append("author_id")
+    return columns
+
+
+def _ingredients(recipe_ids) -> dict:
+    ingredients = defaultdict(list)
+    for recipe_id, *row in (
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        .order_by("-id")
+        .values_list(
+            "recipe_id",
+            "ingredient_id",
+            "ingredient__name",
+            "ingredient__measurement_unit",
+            "amount",
+        )
+    ):
+        ingredients[recipe_id].append(
+            dict(zip(("id", "name", "measurement_unit", "amount"), row))
+        )
+    return ingredients
+
+
+def _tags(recipe_ids, expanded: bool) -> dict:
+    tags = defaultdict(list)
+    queryset = RecipeTag.objects.filter(recipe_id__in=recipe_ids).order_by(
+        "tag_id"
+    )
+    if not expanded:
+        for recipe_id, tag_id in queryset.values_list("recipe_id", "tag_id"):
+            tags[recipe_id].append(tag_id)
+        return tags
+    for recipe_id, *row in queryset.values_list(
+        "recipe_id", "tag_id", "tag__name", "tag__color", "tag__slug"
+    ):
+        tags[recipe_id].append(dict(zip(("id", "name", "color", "slug"), row)))
+    return tags
+
+
+def _image_url(name: str, storage, request):
+    if not name:
+        return None
+    url = storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _author(row, relations) -> dict:
+    return {
+        field: (
+            relations.is_subscribed(row["author__id"])
+            if field == "is_subscribed"
+            else row[f"author__{field}"]
+        )
+        for field in USER_FIELDS
+    }
+
+
+def recipe_cards(rows, request, fieldset) -> list:
+    """Карточки рецептов в формате RecipeGetSerializer.
+
+    rows — строки values(*card_columns(fieldset)) одной страницы.
+    Ингредиенты и теги загружаются по запросу, только если они выбраны,
+    связи с пользователем берутся из UserRelations запроса.
+    """
+    recipe_ids = [row["id"] for row in rows]
+    relations = get_user_relations(request)
+    relations.add_recipes(recipe_ids)
+    getters = {field: itemgetter(field) for field in RECIPE_COLUMNS}
+    getters["is_favorited"] = lambda row: relations.is_favorited(row["id"])
+    getters["is_in_shopping_cart"] = lambda row: (
+        relations.is_in_shopping_cart(row["id"])
+    )
+    if "image" in fieldset:
+        storage = Recipe._meta.get_field("image").storage
+        getters["image"] = lambda row: _image_url(
+            row["image"], storage, request
+        )
+    if fieldset.is_expanded("author"):
+        relations.add_authors(row["author__id"] for row in rows)
+        getters["author"] = lambda row: _author(row, relations)
+    else:
+        getters["author"] = itemgetter("author_id")
+    if "ingredients" in fieldset:
+        ingredients = _ingredients(recipe_ids)
+        getters["ingredients"] = lambda row: ingredients[row["id"]]
+    if "tags" in fieldset:
+        tags = _tags(recipe_ids, fieldset.is_expanded("tags"))
+        getters["tags"] = lambda row: tags[row["id"]]
+    return [
+        {field: getters[field](row) for field in fieldset.fields}
+        for row in rows
+    ]
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from rest_framework.settings import api_settings
+
+from api.authentication import CachedTokenAuthentication
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def token_cache_is_shared(app_configs, **kwargs):
+    """Кэш токенов должен быть общим для всех процессов."""
+    if CachedTokenAuthentication not in (
+        api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ):
+        return []
+    if settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            "CachedTokenAuthentication требует общего кэша.",
+            hint=(
+                "Задайте CACHE_BACKEND и CACHE_LOCATION (например, Redis "
+                "или Memcached) или выключите AUTH_TOKEN_CACHE_ENABLED."
+            ),
+            id="api.E001",
+        )
+    ]
@@ -9,3 +9,9 @@ PDF_LEFT = 50
 PDF_STEP = 20
 INTEGER_FIELD_MIN_VALUE = 1
 INTEGER_FIELD_MAX_VALUE = 32000
+IMAGE_UPLOAD_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
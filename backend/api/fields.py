@@ -0,0 +1,73 @@
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+
+def _to_pk(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField, который проверяет список id одним запросом.
+
+    Список (many=True или вложенный сериализатор) заранее вызывает
+    preload, и дальше объекты берутся из загруженного словаря.
+    """
+
+    preloaded = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def preload(self, values) -> None:
+        ids = {_to_pk(value) for value in values} - {None}
+        self.preloaded = self.get_queryset().in_bulk(ids)
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        pk = _to_pk(data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = self.preloaded.get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, (list, tuple)):
+            self.child_relation.preload(data)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.child_relation.preloaded = None
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """Загружает объекты для поля bulk_field всех элементов одним запросом."""
+
+    bulk_field = "id"
+
+    def to_internal_value(self, data):
+        field = self.child.fields[self.bulk_field]
+        if isinstance(data, list):
+            field.preload(
+                item.get(self.bulk_field)
+                for item in data
+                if isinstance(item, dict)
+            )
+        try:
+            return super().to_internal_value(data)
+        finally:
+            field.preloaded = None
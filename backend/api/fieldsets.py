@@ -0,0 +1,51 @@
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value) -> list:
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Fieldset:
+    """Поля ответа, выбранные параметрами fields и expand.
+
+    Без fields отдаются все поля, а связи разворачиваются в объекты. Если
+    fields задан, связи из него отдаются id, кроме перечисленных в expand.
+    """
+
+    def __init__(self, available, expandable=(), fields=None, expand=None):
+        requested = _split(fields)
+        expanded = _split(expand)
+        errors = {}
+        unknown = set(requested) - set(available)
+        if unknown:
+            errors["fields"] = "Неизвестные поля: " + ", ".join(
+                sorted(unknown)
+            )
+        unknown = set(expanded) - set(expandable)
+        if unknown:
+            errors["expand"] = "Нельзя развернуть: " + ", ".join(
+                sorted(unknown)
+            )
+        if errors:
+            raise ValidationError(errors)
+        self.fields = tuple(
+            field for field in available if not requested or field in requested
+        )
+        self.expanded = frozenset(expanded if requested else expandable)
+
+    @classmethod
+    def from_request(cls, request, available, expandable=()):
+        return cls(
+            available,
+            expandable,
+            request.query_params.get("fields"),
+            request.query_params.get("expand"),
+        )
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.fields
+
+    def is_expanded(self, field: str) -> bool:
+        return field in self and field in self.expanded
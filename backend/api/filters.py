@@ -1,10 +1,15 @@
 import django_filters
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
 
 from recipes.models import Ingredient, Recipe, Tag
 
 User = get_user_model()
 
+SEARCH_CONFIG = "russian"
+
 
 class IngredientFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(
@@ -17,6 +22,17 @@ class IngredientFilter(django_filters.FilterSet):
         fields = ("name", "measurement_unit")
 
 
+class UserFilter(django_filters.FilterSet):
+    username = django_filters.CharFilter(
+        field_name="username",
+        lookup_expr="istartswith",
+    )
+
+    class Meta:
+        model = User
+        fields = ("username",)
+
+
 class RecipeFilter(django_filters.FilterSet):
     tags = django_filters.ModelMultipleChoiceFilter(
         field_name="tags__slug",
@@ -33,9 +49,23 @@ class RecipeFilter(django_filters.FilterSet):
         method="get_is_in_shopping_cart",
     )
 
+    search = django_filters.CharFilter(method="get_search")
+
+    ordering = django_filters.ChoiceFilter(
+        choices=(("trending", "Популярные"),),
+        method="get_ordering",
+    )
+
     class Meta:
         model = Recipe
-        fields = ("tags", "author", "is_in_shopping_cart", "is_favorited")
+        fields = (
+            "tags",
+            "author",
+            "is_in_shopping_cart",
+            "is_favorited",
+            "search",
+            "ordering",
+        )
 
     def get_is_favorited(self, queryset, name, value):
         if value:
@@ -46,3 +76,33 @@ class RecipeFilter(django_filters.FilterSet):
         if value:
             return queryset.filter(cart__user=self.request.user)
         return queryset
+
+    def get_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        if connections[queryset.db].vendor == "postgresql":
+            query = SearchQuery(
+                value, config=SEARCH_CONFIG, search_type="websearch"
+            )
+            queryset = queryset.filter(search_vector=query).annotate(
+                search_rank=SearchRank(F("search_vector"), query)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(name__icontains=value) | Q(text__icontains=value)
+            ).annotate(
+                search_rank=Case(
+                    When(name__icontains=value, then=Value(1.0)),
+                    default=Value(0.4),
+                    output_field=FloatField(),
+                )
+            )
+        return queryset.order_by("-search_rank", "-id")
+
+    def get_ordering(self, queryset, name, value):
+        if value == "trending":
+            return queryset.order_by(
+                F("ranking__score").desc(nulls_last=True), "-id"
+            )
+        return queryset
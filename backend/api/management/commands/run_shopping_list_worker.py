@@ -0,0 +1,89 @@
+import multiprocessing
+import time
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ProcessPoolExecutor, wait)
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.shopping_list import claim_jobs, fail_stale_jobs, prune_jobs, run_job
+
+MAINTENANCE_INTERVAL = 60
+
+
+class InlineExecutor(Executor):
+    """Выполняет задания сразу в текущем процессе."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+class Command(BaseCommand):
+    help = "Рендерит списки покупок в PDF из очереди заданий"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SHOPPING_LIST_MAX_RENDERS,
+            help="Число процессов рендеринга",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выйти, когда очередь опустеет",
+        )
+        parser.add_argument(
+            "--inline",
+            action="store_true",
+            help="Рендерить в этом процессе, без пула",
+        )
+
+    def handle(self, *args, **options):
+        if options["inline"]:
+            pool = InlineExecutor()
+        else:
+            # Дочерние процессы открывают свои соединения с базой.
+            pool = ProcessPoolExecutor(
+                options["concurrency"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        with pool:
+            self.work(pool, options)
+
+    def work(self, pool, options):
+        concurrency = options["concurrency"]
+        running = {}
+        maintained_at = 0
+        while True:
+            if time.monotonic() - maintained_at > MAINTENANCE_INTERVAL:
+                fail_stale_jobs()
+                prune_jobs()
+                maintained_at = time.monotonic()
+            for job_id in claim_jobs(concurrency - len(running)):
+                running[pool.submit(run_job, job_id)] = job_id
+            if not running:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+            done, _ = wait(
+                running,
+                timeout=options["poll_interval"],
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                job_id = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    self.stderr.write(f"Задание {job_id}: {error!r}")
+                else:
+                    self.stdout.write(f"Задание {job_id}: {future.result()}")
@@ -0,0 +1,159 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+class Counter:
+    """Счётчик в формате Prometheus."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames=(), buckets=()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(
+                key, ([0] * (len(self.buckets) + 1), 0.0)
+            )
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {
+                key: (list(counts), total)
+                for key, (counts, total) in self._values.items()
+            }
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": bound},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(
+    Counter(
+        "foodgram_requests_total",
+        "Количество обработанных запросов.",
+        ("view", "method", "status"),
+    )
+)
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "foodgram_request_duration_seconds",
+        "Полное время обработки запроса.",
+        ("view",),
+        DURATION_BUCKETS,
+    )
+)
+DB_QUERIES = registry.register(
+    Histogram(
+        "foodgram_db_queries",
+        "Количество SQL-запросов на один запрос.",
+        ("view",),
+        QUERY_COUNT_BUCKETS,
+    )
+)
+DB_DURATION = registry.register(
+    Histogram(
+        "foodgram_db_duration_seconds",
+        "Суммарное время SQL-запросов на один запрос.",
+        ("view",),
+        DURATION_BUCKETS,
+    )
+)
+RENDER_DURATION = registry.register(
+    Histogram(
+        "foodgram_render_duration_seconds",
+        "Время сериализации тела ответа.",
+        ("view",),
+        DURATION_BUCKETS,
+    )
+)
+RESPONSE_SIZE = registry.register(
+    Histogram(
+        "foodgram_response_size_bytes",
+        "Размер тела ответа.",
+        ("view",),
+        SIZE_BUCKETS,
+    )
+)
@@ -0,0 +1,133 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from api import metrics
+from backend.db_router import pin_to_primary
+
+logger = logging.getLogger("api.metrics")
+
+
+class ReplicaPinMiddleware:
+    """После записи пользователя читает его данные из основной базы."""
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and user is not None
+            and response.status_code < 400
+        ):
+            pin_to_primary(user)
+        return response
+
+
+class QueryTimer:
+    """Считает количество и время SQL-запросов через execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def resolve_view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name
+    method = request.method.lower()
+    actions = getattr(match.func, "actions", None) or {}
+    return f"{view_class.__name__}.{actions.get(method, method)}"
+
+
+class RequestMetricsMiddleware:
+    """Собирает время запроса, SQL и сериализации по каждому view."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._metrics_render_duration = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        self.record(request, response, timer, total)
+        return response
+
+    def process_template_response(self, request, response):
+        render_started = time.perf_counter()
+
+        def render_finished(response):
+            request._metrics_render_duration = (
+                time.perf_counter() - render_started
+            )
+
+        response.add_post_render_callback(render_finished)
+        return response
+
+    def record(self, request, response, timer, total):
+        view = resolve_view_name(request)
+        render = request._metrics_render_duration
+        if response.streaming:
+            size = int(response.get("Content-Length", 0))
+        else:
+            size = len(response.content)
+
+        metrics.REQUESTS.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        metrics.REQUEST_DURATION.observe(total, view=view)
+        metrics.DB_QUERIES.observe(timer.count, view=view)
+        metrics.DB_DURATION.observe(timer.duration, view=view)
+        metrics.RENDER_DURATION.observe(render, view=view)
+        metrics.RESPONSE_SIZE.observe(size, view=view)
+
+        response["Server-Timing"] = (
+            f"db;dur={timer.duration * 1000:.2f};"
+            f'desc="{timer.count} queries", '
+            f"render;dur={render * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "view": view,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": timer.count,
+                    "db_ms": round(timer.duration * 1000, 2),
+                    "render_ms": round(render * 1000, 2),
+                    "total_ms": round(total * 1000, 2),
+                    "size": size,
+                }
+            )
+        )
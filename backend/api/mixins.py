@@ -1,5 +1,53 @@
+from django.utils.functional import cached_property
 from rest_framework import mixins, viewsets
 
+from api.fieldsets import Fieldset
+from backend.db_router import is_pinned_to_primary, read_from_replica
+
+
+class ReplicaReadMixin:
+    """Выполняет чтение в перечисленных действиях на реплике базы."""
+
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and not is_pinned_to_primary(request.user)
+        ):
+            self._replica_reads = read_from_replica()
+            self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_reads = getattr(self, "_replica_reads", None)
+        if replica_reads is not None:
+            self._replica_reads = None
+            replica_reads.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class FieldsetMixin:
+    """Передаёт сериализатору поля, выбранные параметрами fields и expand."""
+
+    fieldset_serializer = None
+    fieldset_actions = ("list", "retrieve")
+
+    @cached_property
+    def fieldset(self):
+        serializer = self.fieldset_serializer
+        if self.action not in self.fieldset_actions:
+            return Fieldset(serializer.Meta.fields, serializer.compact_fields)
+        return Fieldset.from_request(
+            self.request, serializer.Meta.fields, serializer.compact_fields
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.fieldset_actions:
+            context["fieldset"] = self.fieldset
+        return context
+
 
 class ListRetrieveViewSet(
     mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
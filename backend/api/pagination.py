@@ -1,7 +1,36 @@
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = settings.PAGE_SIZE
     page_size_query_param = "limit"
+
+
+class PkCountPaginator(Paginator):
+    """Считает объекты без вычисления аннотаций queryset."""
+
+    @cached_property
+    def count(self):
+        return self.object_list.values("pk").count()
+
+
+class UserPageNumberPagination(CustomPageNumberPagination):
+    django_paginator_class = PkCountPaginator
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset-пагинация по убыванию id."""
+
+    page_size = settings.PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = settings.MAX_PAGE_SIZE
+    ordering = "-id"
+
+
+class UserCursorPagination(IdCursorPagination):
+    """Keyset-пагинация пользователей по возрастанию id."""
+
+    ordering = "id"
@@ -0,0 +1,63 @@
+from recipes.models import Favorite, Shopping
+from users.models import Subscribe
+
+RELATIONS = {
+    "favorites": (Favorite, "recipe_id"),
+    "cart": (Shopping, "recipe_id"),
+    "following": (Subscribe, "author_id"),
+}
+
+
+class UserRelations:
+    """Избранное, корзина и подписки текущего пользователя.
+
+    Сериализаторы заранее сообщают id рецептов и авторов страницы, а
+    множества загружаются лениво: по одному запросу на вид связи, только
+    для ещё не проверенных id.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._wanted = {kind: set() for kind in RELATIONS}
+        self._checked = {kind: set() for kind in RELATIONS}
+        self._found = {kind: set() for kind in RELATIONS}
+
+    def add_recipes(self, recipe_ids) -> None:
+        recipe_ids = set(recipe_ids)
+        self._wanted["favorites"] |= recipe_ids
+        self._wanted["cart"] |= recipe_ids
+
+    def add_authors(self, author_ids) -> None:
+        self._wanted["following"] |= set(author_ids)
+
+    def _contains(self, kind: str, object_id: int) -> bool:
+        if not self.user.is_authenticated:
+            return False
+        self._wanted[kind].add(object_id)
+        unchecked = self._wanted[kind] - self._checked[kind]
+        if unchecked:
+            model, field = RELATIONS[kind]
+            self._found[kind].update(
+                model.objects.filter(
+                    user=self.user, **{f"{field}__in": unchecked}
+                ).values_list(field, flat=True)
+            )
+            self._checked[kind] |= unchecked
+        return object_id in self._found[kind]
+
+    def is_favorited(self, recipe_id: int) -> bool:
+        return self._contains("favorites", recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id: int) -> bool:
+        return self._contains("cart", recipe_id)
+
+    def is_subscribed(self, author_id: int) -> bool:
+        return self._contains("following", author_id)
+
+
+def get_user_relations(request) -> UserRelations:
+    """Связи пользователя, общие для всех сериализаторов запроса."""
+    relations = getattr(request, "user_relations", None)
+    if relations is None:
+        relations = request.user_relations = UserRelations(request.user)
+    return relations
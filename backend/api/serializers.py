@@ -1,12 +1,25 @@
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery
 from djoser.serializers import UserCreateSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from rest_framework.validators import UniqueTogetherValidator
 
-from api.constants import INTEGER_FIELD_MAX_VALUE, INTEGER_FIELD_MIN_VALUE
+from api.constants import (IMAGE_UPLOAD_EXTENSIONS, INTEGER_FIELD_MAX_VALUE,
+                           INTEGER_FIELD_MIN_VALUE)
+from api.fields import BulkPrimaryKeyRelatedField, BulkRelatedListSerializer
+from api.relations import get_user_relations
 from api.utils import recipe_ingredient_create
-from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.media import (discard_upload, image_storage, is_own_upload,
+                           read_upload)
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingListJob, Tag)
 from users.models import Subscribe
 
 User = get_user_model()
@@ -25,7 +38,42 @@ class UserRegistrationSerializer(UserCreateSerializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class RelationListSerializer(serializers.ListSerializer):
+    """Сообщает связям пользователя id всей страницы до сериализации."""
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        instances = list(data)
+        self.child.add_relations(
+            get_user_relations(self.context["request"]), instances
+        )
+        return super().to_representation(instances)
+
+
+class SparseFieldsMixin:
+    """Оставляет поля из context["fieldset"].
+
+    Неразвёрнутые связи из compact_fields заменяются полями с id.
+    """
+
+    compact_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get("fieldset")
+        if fieldset is None:
+            return
+        for name in list(self.fields):
+            if name not in fieldset:
+                self.fields.pop(name)
+            elif name in self.compact_fields and not fieldset.is_expanded(
+                name
+            ):
+                self.fields[name] = self.compact_fields[name]()
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -37,13 +85,20 @@ class UserSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "is_subscribed",
+            "recipes_count",
+            "followers_count",
+            "following_count",
         )
+        list_serializer_class = RelationListSerializer
+
+    def add_relations(self, relations, instances):
+        relations.add_authors(user.id for user in instances)
 
     def get_is_subscribed(self, obj):
-        user = self.context["request"].user
-        if user.is_anonymous:
-            return False
-        return Subscribe.objects.filter(user=user, author=obj).exists()
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        relations = get_user_relations(self.context["request"])
+        return relations.is_subscribed(obj.id)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -83,13 +138,14 @@ class IngredientRecipeSerializer(serializers.ModelSerializer):
         min_value=INTEGER_FIELD_MIN_VALUE,
         max_value=INTEGER_FIELD_MAX_VALUE,
     )
-    id = serializers.PrimaryKeyRelatedField(
+    id = BulkPrimaryKeyRelatedField(
         source="ingredient", queryset=Ingredient.objects.all()
     )
 
     class Meta:
         model = RecipeIngredient
         fields = ("id", "amount", "recipe")
+        list_serializer_class = BulkRelatedListSerializer
 
 
 class RecipeFollowSerializer(serializers.ModelSerializer):
@@ -100,6 +156,38 @@ class RecipeFollowSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "image", "cooking_time")
 
 
+def author_recipes(author_ids, limit=None) -> dict:
+    """Рецепты авторов одним запросом, не больше limit на автора."""
+    queryset = Recipe.objects.filter(author_id__in=author_ids).only(
+        "id", "author_id", "name", "image", "cooking_time"
+    )
+    if limit:
+        queryset = queryset.filter(
+            id__in=Subquery(
+                Recipe.objects.filter(author_id=OuterRef("author_id"))
+                .values("id")[:limit]
+            )
+        )
+    recipes = defaultdict(list)
+    for recipe in queryset:
+        recipes[recipe.author_id].append(recipe)
+    return recipes
+
+
+class FollowListSerializer(serializers.ListSerializer):
+    """Загружает рецепты всех авторов страницы одним запросом."""
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        instances = list(data)
+        self.context["author_recipes"] = author_recipes(
+            [follow.author_id for follow in instances],
+            self.child.recipes_limit(),
+        )
+        return super().to_representation(instances)
+
+
 class FollowSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField(source="author.id")
     email = serializers.ReadOnlyField(source="author.email")
@@ -107,7 +195,7 @@ class FollowSerializer(serializers.ModelSerializer):
     first_name = serializers.ReadOnlyField(source="author.first_name")
     last_name = serializers.ReadOnlyField(source="author.last_name")
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source="author.recipes.count")
+    recipes_count = serializers.ReadOnlyField(source="author.recipes_count")
 
     class Meta:
         model = Subscribe
@@ -120,6 +208,7 @@ class FollowSerializer(serializers.ModelSerializer):
             "recipes",
             "recipes_count",
         )
+        list_serializer_class = FollowListSerializer
 
     def validate(self, data):
         method = self.context["request"].method
@@ -137,16 +226,71 @@ class FollowSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Ошибка подписки")
         return data
 
+    def recipes_limit(self):
+        limit = self.context["request"].GET.get("recipes_limit")
+        return int(limit) if limit else None
+
     def get_recipes(self, obj):
-        request = self.context["request"]
-        limit = request.GET.get("recipes_limit")
-        queryset = Recipe.objects.filter(author=obj.author)
-        if limit:
-            queryset = queryset[: int(limit)]
-        return RecipeFollowSerializer(queryset, many=True).data
+        recipes = self.context.get("author_recipes")
+        if recipes is None:
+            recipes = author_recipes([obj.author_id], self.recipes_limit())
+        return RecipeFollowSerializer(
+            recipes.get(obj.author_id, []), many=True
+        ).data
+
+
+class IngredientMatchSerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+    )
+    min_coverage = serializers.FloatField(
+        min_value=0,
+        max_value=1,
+        default=0,
+    )
 
 
-class RecipeGetSerializer(serializers.ModelSerializer):
+class ImageUploadSerializer(serializers.Serializer):
+    content_type = serializers.ChoiceField(
+        choices=list(IMAGE_UPLOAD_EXTENSIONS)
+    )
+
+
+class ShoppingListJobSerializer(serializers.ModelSerializer):
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ShoppingListJob
+        fields = (
+            "id",
+            "status",
+            "created_at",
+            "finished_at",
+            "expires_at",
+            "download",
+        )
+
+    def get_download(self, obj):
+        if obj.status != ShoppingListJob.DONE:
+            return None
+        return reverse(
+            "api:shopping_list_jobs-download",
+            kwargs={"pk": obj.pk},
+            request=self.context.get("request"),
+        )
+
+
+class SyncParamsSerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SYNC_PAGE_SIZE,
+        default=settings.SYNC_PAGE_SIZE,
+    )
+
+
+class RecipeGetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     image = Base64ImageField(max_length=None, use_url=True)
     ingredients = serializers.SerializerMethodField()
     author = UserSerializer(read_only=True)
@@ -154,6 +298,15 @@ class RecipeGetSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
+    compact_fields = {
+        "author": lambda: serializers.IntegerField(
+            source="author_id", read_only=True
+        ),
+        "tags": lambda: serializers.PrimaryKeyRelatedField(
+            many=True, read_only=True
+        ),
+    }
+
     class Meta:
         model = Recipe
         fields = (
@@ -172,23 +325,23 @@ class RecipeGetSerializer(serializers.ModelSerializer):
             "id",
             "author",
         )
+        list_serializer_class = RelationListSerializer
+
+    def add_relations(self, relations, instances):
+        relations.add_recipes(recipe.id for recipe in instances)
+        relations.add_authors(recipe.author_id for recipe in instances)
 
     def get_is_favorited(self, obj):
-        user = self.context["request"].user
-        if user.is_anonymous:
-            return False
-        return obj.favorites.filter(user=user).exists()
+        relations = get_user_relations(self.context["request"])
+        return relations.is_favorited(obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context["request"].user
-        if user.is_anonymous:
-            return False
-        return obj.cart.filter(user=user).exists()
+        relations = get_user_relations(self.context["request"])
+        return relations.is_in_shopping_cart(obj.id)
 
     def get_ingredients(self, obj):
-        recipe_ingredients = RecipeIngredient.objects.filter(recipe=obj)
         return IngredientRecipeGetSerializer(
-            recipe_ingredients,
+            obj.amount.all(),
             many=True,
         ).data
 
@@ -196,11 +349,12 @@ class RecipeGetSerializer(serializers.ModelSerializer):
 class RecipeSerializer(serializers.ModelSerializer):
     ingredients = IngredientRecipeSerializer(many=True)
     author = UserSerializer(read_only=True)
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
         many=True,
     )
-    image = Base64ImageField(max_length=None, use_url=True)
+    image = Base64ImageField(max_length=None, use_url=True, required=False)
+    image_upload = serializers.CharField(write_only=True, required=False)
     cooking_time = serializers.IntegerField(
         min_value=INTEGER_FIELD_MIN_VALUE,
         max_value=INTEGER_FIELD_MAX_VALUE,
@@ -217,6 +371,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             "tags",
             "cooking_time",
             "image",
+            "image_upload",
         )
         read_only_fields = ("id", "author", "tags")
         extra_kwargs = {
@@ -241,8 +396,38 @@ class RecipeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Проверьте, какой-то ингредиент был выбран более 1 раза"
             )
+        upload = data.pop("image_upload", None)
+        if upload is not None:
+            if "image" in data:
+                raise serializers.ValidationError(
+                    "Передайте либо image, либо image_upload"
+                )
+            data["image"] = upload
+        elif self.instance is None and "image" not in data:
+            raise serializers.ValidationError(
+                {"image": "Обязательное поле."}
+            )
         return data
 
+    def validate_image_upload(self, key):
+        """Проверяет файл, загруженный клиентом напрямую в хранилище."""
+        storage = image_storage()
+        user_id = self.context["request"].user.id
+        if not is_own_upload(key, user_id) or not storage.exists(key):
+            raise serializers.ValidationError("Загрузка не найдена")
+        if storage.size(key) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Файл слишком большой")
+        self.claimed_upload = key
+        return serializers.ImageField().to_internal_value(read_upload(key))
+
+    def save(self, **kwargs):
+        recipe = super().save(**kwargs)
+        upload = getattr(self, "claimed_upload", None)
+        if upload is not None:
+            transaction.on_commit(partial(discard_upload, upload))
+        return recipe
+
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop("ingredients")
         tags_data = validated_data.pop("tags")
@@ -251,6 +436,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         recipe_ingredient_create(ingredients_data, RecipeIngredient, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if "tags" in self.validated_data:
             tags_data = validated_data.pop("tags")
@@ -273,7 +459,10 @@ class RecipeSerializer(serializers.ModelSerializer):
         self.fields.pop("tags")
         representation = super().to_representation(instance)
         representation["ingredients"] = IngredientRecipeGetSerializer(
-            RecipeIngredient.objects.filter(recipe=instance), many=True
+            RecipeIngredient.objects.filter(recipe=instance).select_related(
+                "ingredient"
+            ),
+            many=True,
         ).data
         representation["tags"] = TagSerializer(instance.tags, many=True).data
         return representation
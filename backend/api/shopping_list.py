@@ -0,0 +1,227 @@
+import hashlib
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from api.constants import (PDF_CENTER, PDF_FONT_NAME, PDF_HEADER_FONT_SIZE,
+                           PDF_HEADER_TEXT, PDF_HEIGHT, PDF_LEFT, PDF_STEP,
+                           PDF_TEXT_FONT_SIZE)
+from recipes.models import RecipeIngredient, Shopping, ShoppingListJob
+
+# Ключ advisory-блокировки Postgres, под которой воркеры забирают задания.
+CLAIM_LOCK_ID = 5_050_001
+
+
+def shopping_list(user):
+    return (
+        RecipeIngredient.objects.filter(recipe__cart__user=user)
+        .values("ingredient__name", "ingredient__measurement_unit")
+        .annotate(amount=Sum("amount"))
+        .order_by()
+    )
+
+
+def render_shopping_list(rows) -> bytes:
+    pdfmetrics.registerFont(
+        TTFont(
+            PDF_FONT_NAME,
+            f"{PDF_FONT_NAME}.ttf",
+            "UTF-8",
+        )
+    )
+    buffer = io.BytesIO()
+    pdf_file = canvas.Canvas(buffer)
+    pdf_file.setFont(PDF_FONT_NAME, PDF_HEADER_FONT_SIZE)
+    pdf_file.drawString(
+        PDF_CENTER,
+        PDF_HEIGHT,
+        PDF_HEADER_TEXT,
+    )
+    pdf_file.setFont(PDF_FONT_NAME, PDF_TEXT_FONT_SIZE)
+    from_bottom = PDF_HEIGHT - PDF_LEFT
+    for number, ingredient in enumerate(rows, start=1):
+        pdf_file.drawString(
+            PDF_LEFT,
+            from_bottom,
+            (
+                f'{number}.  {ingredient["ingredient__name"]} - '
+                f'{ingredient["amount"]} '
+                f'{ingredient["ingredient__measurement_unit"]}'
+            ),
+        )
+        from_bottom -= PDF_STEP
+        if from_bottom <= PDF_LEFT:
+            from_bottom = PDF_HEIGHT
+            pdf_file.showPage()
+            pdf_file.setFont(PDF_FONT_NAME, PDF_TEXT_FONT_SIZE)
+    pdf_file.showPage()
+    pdf_file.save()
+    return buffer.getvalue()
+
+
+def cart_fingerprint(user_id: int) -> str:
+    """Хэш рецептов корзины и времени их изменения."""
+    digest = hashlib.sha256()
+    for recipe_id, updated_at in (
+        Shopping.objects.filter(user_id=user_id)
+        .values_list("recipe_id", "recipe__updated_at")
+        .order_by("recipe_id")
+    ):
+        digest.update(f"{recipe_id}:{updated_at.isoformat()};".encode())
+    return digest.hexdigest()
+
+
+def request_job(user):
+    """Задание пользователя на выгрузку и признак, что оно создано.
+
+    У пользователя не больше одного задания в очереди или в работе: на
+    повторный запрос возвращается оно же. Готовый файл отдаётся повторно,
+    пока не истёк срок хранения и корзина не изменилась.
+    """
+    fingerprint = cart_fingerprint(user.id)
+    job = (
+        ShoppingListJob.objects.filter(user=user)
+        .filter(
+            Q(status__in=ShoppingListJob.ACTIVE)
+            | Q(
+                status=ShoppingListJob.DONE,
+                fingerprint=fingerprint,
+                expires_at__gt=timezone.now(),
+            )
+        )
+        .first()
+    )
+    if job is not None:
+        return job, False
+    try:
+        with transaction.atomic():
+            job = ShoppingListJob.objects.create(
+                user=user, fingerprint=fingerprint
+            )
+    except IntegrityError:
+        # Параллельный запрос уже поставил задание в очередь.
+        return (
+            ShoppingListJob.objects.get(
+                user=user, status__in=ShoppingListJob.ACTIVE
+            ),
+            False,
+        )
+    return job, True
+
+
+def _lock_claims() -> None:
+    """Сериализует выборку заданий между воркерами до конца транзакции.
+
+    Без блокировки два воркера в READ COMMITTED одновременно видят одно
+    и то же число выполняемых заданий и вместе превышают лимит. SQLite
+    и так допускает только одну пишущую транзакцию.
+    """
+    connection = transaction.get_connection()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_ID])
+
+
+def claim_jobs(limit: int) -> list:
+    """Забирает из очереди до limit заданий.
+
+    Общее число выполняемых заданий ограничено
+    SHOPPING_LIST_MAX_RENDERS на всех воркерах.
+    """
+    with transaction.atomic():
+        _lock_claims()
+        running = ShoppingListJob.objects.filter(
+            status=ShoppingListJob.RUNNING
+        ).count()
+        limit = min(limit, settings.SHOPPING_LIST_MAX_RENDERS - running)
+        if limit <= 0:
+            return []
+        job_ids = list(
+            ShoppingListJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ShoppingListJob.PENDING)
+            .order_by("id")
+            .values_list("id", flat=True)[:limit]
+        )
+        ShoppingListJob.objects.filter(id__in=job_ids).update(
+            status=ShoppingListJob.RUNNING, started_at=timezone.now()
+        )
+    return job_ids
+
+
+def run_job(job_id: int) -> str:
+    """Рендерит PDF задания и сохраняет его в закрытое хранилище.
+
+    Результат записывается, только если задание всё ещё выполняется:
+    fail_stale_jobs мог завершить его ошибкой по таймауту.
+    """
+    job = ShoppingListJob.objects.get(id=job_id)
+    result = {"error": "", "fingerprint": job.fingerprint}
+    try:
+        result["fingerprint"] = cart_fingerprint(job.user_id)
+        content = render_shopping_list(shopping_list(job.user_id))
+        job.file.save(
+            f"{job.user_id}.pdf", ContentFile(content), save=False
+        )
+    except Exception as error:
+        result["status"] = ShoppingListJob.FAILED
+        result["error"] = repr(error)
+    else:
+        result["status"] = ShoppingListJob.DONE
+    finished_at = timezone.now()
+    updated = ShoppingListJob.objects.filter(
+        id=job.id, status=ShoppingListJob.RUNNING
+    ).update(
+        file=job.file.name or "",
+        finished_at=finished_at,
+        expires_at=finished_at
+        + timedelta(minutes=settings.SHOPPING_LIST_JOB_TTL_MINUTES),
+        **result,
+    )
+    if not updated:
+        if job.file:
+            job.file.delete(save=False)
+        return (
+            ShoppingListJob.objects.filter(id=job.id)
+            .values_list("status", flat=True)
+            .first()
+        )
+    return result["status"]
+
+
+def fail_stale_jobs() -> int:
+    """Завершает ошибкой задания, брошенные остановленным воркером."""
+    now = timezone.now()
+    timeout = timedelta(seconds=settings.SHOPPING_LIST_JOB_TIMEOUT_SECONDS)
+    ttl = timedelta(minutes=settings.SHOPPING_LIST_JOB_TTL_MINUTES)
+    return ShoppingListJob.objects.filter(
+        status=ShoppingListJob.RUNNING, started_at__lt=now - timeout
+    ).update(
+        status=ShoppingListJob.FAILED,
+        error="Превышено время выполнения",
+        finished_at=now,
+        expires_at=now + ttl,
+    )
+
+
+def prune_jobs() -> int:
+    """Удаляет задания с истёкшим сроком хранения и их файлы."""
+    expired = dict(
+        ShoppingListJob.objects.filter(
+            expires_at__lt=timezone.now()
+        ).values_list("id", "file")
+    )
+    if not expired:
+        return 0
+    ShoppingListJob.objects.filter(id__in=expired).delete()
+    storage = ShoppingListJob._meta.get_field("file").storage
+    for name in filter(None, expired.values()):
+        storage.delete(name)
+    return len(expired)
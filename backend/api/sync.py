@@ -0,0 +1,156 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from api.cards import card_columns, recipe_cards
+from recipes.models import Favorite, Recipe, Shopping, Tombstone
+from users.models import Subscribe
+
+RELATION_STREAMS = {
+    "favorites": (Favorite, "recipe_id"),
+    "cart": (Shopping, "recipe_id"),
+    "subscriptions": (Subscribe, "author_id"),
+}
+DELETED_KEYS = {
+    Tombstone.RECIPE: "recipes",
+    Tombstone.FAVORITE: "favorites",
+    Tombstone.CART: "cart",
+    Tombstone.SUBSCRIPTION: "subscriptions",
+}
+
+
+class SyncCursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Курсор устарел, нужна полная синхронизация."
+    default_code = "sync_cursor_expired"
+
+
+def encode_cursor(positions: dict) -> str:
+    return base64.urlsafe_b64encode(
+        json.dumps(
+            {
+                name: [moment.isoformat(), pk]
+                for name, (moment, pk) in positions.items()
+            }
+        ).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        positions = {
+            name: (parse_datetime(moment), int(pk))
+            for name, (moment, pk) in data.items()
+        }
+    except (binascii.Error, ValueError, TypeError, AttributeError):
+        raise ValidationError({"since": "Некорректный курсор."})
+    if any(
+        moment is None or timezone.is_naive(moment)
+        for moment, _ in positions.values()
+    ):
+        raise ValidationError({"since": "Некорректный курсор."})
+    return positions
+
+
+def _page(queryset, field: str, position, limit: int):
+    """Строки после позиции (время, id) по возрастанию и признак хвоста."""
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(
+            Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk})
+        )
+    rows = list(queryset.order_by(field, "id")[: limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def _start_positions(since, now) -> dict:
+    if not since:
+        # Удаления, случившиеся до первой синхронизации, клиенту не нужны.
+        return {"deleted": (now, 0)}
+    positions = decode_cursor(since)
+    horizon = now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    if positions.get("deleted", (now, 0))[0] < horizon:
+        raise SyncCursorExpired
+    return positions
+
+
+def _settle(positions: dict, now) -> None:
+    """Отодвигает позиции последней страницы на SYNC_CURSOR_LAG_SECONDS.
+
+    Транзакция может закоммититься позже своей отметки времени, поэтому
+    самые свежие секунды перечитываются при следующей синхронизации.
+    """
+    settled = now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+    for name in ("recipes", *RELATION_STREAMS, "deleted"):
+        position = positions.get(name)
+        if position is None or position[0] > settled:
+            positions[name] = (settled, 0)
+
+
+def collect_changes(request, fieldset, since=None, limit=None) -> dict:
+    """Изменения с момента курсора since, не больше limit на поток.
+
+    Потоки: рецепты по updated_at, избранное, список покупок и подписки
+    пользователя по created_at и удаления по deleted_at. Позиции потоков
+    хранятся в курсоре ответа.
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    now = timezone.now()
+    user = request.user
+    positions = _start_positions(since, now)
+    has_more = False
+
+    recipes, truncated = _page(
+        Recipe.objects.values(*card_columns(fieldset), "updated_at"),
+        "updated_at",
+        positions.get("recipes"),
+        limit,
+    )
+    has_more |= truncated
+    if recipes:
+        positions["recipes"] = (recipes[-1]["updated_at"], recipes[-1]["id"])
+    changes = {"recipes": recipe_cards(recipes, request, fieldset)}
+
+    for name, (model, field) in RELATION_STREAMS.items():
+        rows, truncated = _page(
+            model.objects.filter(user=user).values_list(
+                "created_at", "id", field
+            ),
+            "created_at",
+            positions.get(name),
+            limit,
+        )
+        has_more |= truncated
+        if rows:
+            positions[name] = rows[-1][:2]
+        changes[name] = [object_id for _, _, object_id in rows]
+
+    rows, truncated = _page(
+        Tombstone.objects.filter(Q(user=None) | Q(user=user)).values_list(
+            "deleted_at", "id", "kind", "object_id"
+        ),
+        "deleted_at",
+        positions.get("deleted"),
+        limit,
+    )
+    has_more |= truncated
+    if rows:
+        positions["deleted"] = rows[-1][:2]
+    changes["deleted"] = {key: [] for key in DELETED_KEYS.values()}
+    for _, _, kind, object_id in rows:
+        changes["deleted"][DELETED_KEYS[kind]].append(object_id)
+
+    if not has_more:
+        _settle(positions, now)
+    changes["cursor"] = encode_cursor(positions)
+    changes["has_more"] = has_more
+    return changes
@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
-                    ShoppingCardView, TagViewSet)
+from .views import (CustomUserViewSet, IngredientViewSet, MetricsView,
+                    RecipeViewSet, ShoppingCardView, ShoppingListJobViewSet,
+                    SyncView, TagViewSet)
 
 app_name = "api"
 
@@ -11,6 +12,11 @@ router_v1.register("users", CustomUserViewSet, basename="users")
 router_v1.register("tags", TagViewSet, basename="tags")
 router_v1.register("ingredients", IngredientViewSet, basename="ingredients")
 router_v1.register("recipes", RecipeViewSet, basename="recipes")
+router_v1.register(
+    "shopping_list_jobs",
+    ShoppingListJobViewSet,
+    basename="shopping_list_jobs",
+)
 
 
 urlpatterns = [
@@ -19,6 +25,8 @@ urlpatterns = [
         ShoppingCardView.as_view(),
         name="download_shopping_cart",
     ),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("_metrics/", MetricsView.as_view(), name="metrics"),
     path("", include(router_v1.urls)),
     path("auth/", include("djoser.urls.authtoken")),
 ]
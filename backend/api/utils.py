@@ -6,7 +6,9 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
+from recipes.ingredient_index import schedule_reindex
 from recipes.models import Favorite, Recipe, RecipeIngredient, Shopping
+from recipes.similarity import schedule_similar_update
 
 
 def prepare_post_response(
@@ -60,3 +62,5 @@ def recipe_ingredient_create(
         for ingredient_data in ingredients_data
     ]
     model.objects.bulk_create(bulk_create_data)
+    schedule_reindex(recipe.id)
+    schedule_similar_update(recipe.id)
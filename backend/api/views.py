@@ -1,41 +1,95 @@
 import io
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import FileResponse
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.constants import (PDF_CENTER, PDF_FILENAME, PDF_FONT_NAME,
-                           PDF_HEADER_FONT_SIZE, PDF_HEADER_TEXT, PDF_HEIGHT,
-                           PDF_LEFT, PDF_STEP, PDF_TEXT_FONT_SIZE)
-from api.filters import IngredientFilter, RecipeFilter
-from api.mixins import ListRetrieveViewSet
-from api.pagination import CustomPageNumberPagination
+from api.authentication import CachedTokenAuthentication
+from api.cards import card_columns, recipe_cards
+from api.constants import IMAGE_UPLOAD_EXTENSIONS, PDF_FILENAME
+from api.fieldsets import Fieldset
+from api.filters import IngredientFilter, RecipeFilter, UserFilter
+from api.metrics import registry
+from api.mixins import FieldsetMixin, ListRetrieveViewSet, ReplicaReadMixin
+from api.pagination import (CustomPageNumberPagination, IdCursorPagination,
+                            UserCursorPagination, UserPageNumberPagination)
 from api.permissions import IsAuthorOrReadOnly
-from api.serializers import (FollowSerializer, IngredientSerializer,
+from api.serializers import (FollowSerializer, ImageUploadSerializer,
+                             IngredientMatchSerializer, IngredientSerializer,
                              RecipeFollowSerializer, RecipeGetSerializer,
-                             RecipeSerializer, TagSerializer)
+                             RecipeSerializer, ShoppingListJobSerializer,
+                             SyncParamsSerializer, TagSerializer,
+                             UserSerializer)
+from api.shopping_list import render_shopping_list, request_job, shopping_list
+from api.sync import collect_changes
 from api.utils import prepare_delete_response, prepare_post_response
+from recipes.catalogue import build_catalogue, catalogue_url, current_catalogue
+from recipes.cofavorites import suggestions_queryset
+from recipes.feed import feed_queryset
+from recipes.ingredient_index import match_recipes
+from recipes.media import image_storage, upload_key
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            Shopping, Tag)
-from users.models import Subscribe
+                            Shopping, ShoppingListJob, Tag)
+from users.models import COUNTER_FIELDS, Subscribe
 
 CustomUser = get_user_model()
 
 
-class CustomUserViewSet(UserViewSet):
-    pagination_class = CustomPageNumberPagination
+class CustomUserViewSet(FieldsetMixin, UserViewSet):
+    """Пользователи с признаком подписки, вычисленным в том же запросе.
+
+    С параметром cursor список отдаётся keyset-пагинацией.
+    """
+
+    pagination_class = UserPageNumberPagination
+    filterset_class = UserFilter
+    fieldset_serializer = UserSerializer
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if "cursor" in self.request.query_params:
+                self._paginator = UserCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ("list", "retrieve"):
+            return queryset
+        if "is_subscribed" not in self.fieldset:
+            return queryset
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=Exists(
+                    Subscribe.objects.filter(user=user, author=OuterRef("pk"))
+                )
+            )
+        else:
+            queryset = queryset.annotate(is_subscribed=Value(False))
+        return queryset
+
+    def get_instance(self):
+        """Текущий пользователь; счётчики из кэша токенов перечитываются."""
+        user = super().get_instance()
+        authenticator = self.request.successful_authenticator
+        if isinstance(authenticator, CachedTokenAuthentication):
+            user.refresh_from_db(fields=COUNTER_FIELDS)
+        return user
 
     @action(
         detail=True,
@@ -78,13 +132,17 @@ class CustomUserViewSet(UserViewSet):
     def subscriptions(self, request):
         current_user = request.user
         context = {"request": request, "user": current_user, "author": None}
-        queryset = Subscribe.objects.filter(user=current_user)
+        queryset = (
+            Subscribe.objects.filter(user=current_user)
+            .select_related("author")
+            .order_by("-id")
+        )
         pages = self.paginate_queryset(queryset)
         serializer = FollowSerializer(pages, many=True, context=context)
         return self.get_paginated_response(serializer.data)
 
 
-class TagViewSet(ListRetrieveViewSet):
+class TagViewSet(ReplicaReadMixin, ListRetrieveViewSet):
     """Класс представления тега."""
 
     queryset = Tag.objects.all()
@@ -93,7 +151,7 @@ class TagViewSet(ListRetrieveViewSet):
     pagination_class = None
 
 
-class IngredientViewSet(ListRetrieveViewSet):
+class IngredientViewSet(ReplicaReadMixin, ListRetrieveViewSet):
     """Класс представления ингредиента."""
 
     queryset = Ingredient.objects.all()
@@ -102,14 +160,80 @@ class IngredientViewSet(ListRetrieveViewSet):
     filterset_class = IngredientFilter
     pagination_class = None
 
+    @action(detail=False, methods=["GET"])
+    def catalogue(self, request):
+        manifest = current_catalogue() or build_catalogue()
+        return Response(
+            {
+                "version": manifest["version"],
+                "url": request.build_absolute_uri(catalogue_url(manifest)),
+                "count": manifest["count"],
+            }
+        )
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class DirectUploadUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "Хранилище не поддерживает прямую загрузку файлов."
+    default_code = "direct_upload_unavailable"
+
+
+class RecipeViewSet(
+    FieldsetMixin, ReplicaReadMixin, viewsets.ModelViewSet
+):
     """Класс представления рецептов."""
 
     queryset = Recipe.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     pagination_class = CustomPageNumberPagination
+    replica_actions = (
+        "list",
+        "retrieve",
+        "match",
+        "feed",
+        "similar",
+        "suggestions",
+    )
+    card_actions = ("list", "feed", "suggestions")
+    fieldset_serializer = RecipeGetSerializer
+    fieldset_actions = ("list", "retrieve", "feed", "suggestions", "match")
+
+    def get_queryset(self):
+        if self.action == "feed":
+            queryset = feed_queryset(self.request.user)
+        elif self.action == "suggestions":
+            queryset = suggestions_queryset(self.request.user)
+        else:
+            queryset = Recipe.objects.all()
+        if self.action in self.card_actions:
+            return queryset
+        fieldset = self.fieldset
+        if fieldset.is_expanded("author"):
+            queryset = queryset.select_related("author")
+        if "tags" in fieldset:
+            queryset = queryset.prefetch_related(
+                Prefetch("tags", queryset=Tag.objects.order_by("id"))
+            )
+        if "ingredients" in fieldset:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "amount",
+                    queryset=RecipeIngredient.objects.select_related(
+                        "ingredient"
+                    ),
+                )
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            queryset.values(*card_columns(self.fieldset))
+        )
+        return self.get_paginated_response(
+            recipe_cards(page, request, self.fieldset)
+        )
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -120,10 +244,99 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return RecipeSerializer
 
     def get_permissions(self):
-        if self.action != "create":
+        if self.action not in ("create", "feed", "suggestions", "upload"):
             return (IsAuthorOrReadOnly(),)
         return super().get_permissions()
 
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsAuthenticated],
+        pagination_class=IdCursorPagination,
+    )
+    def feed(self, request):
+        return self.list(request)
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsAuthenticated],
+    )
+    def suggestions(self, request):
+        return self.list(request)
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsAuthenticated],
+    )
+    def upload(self, request):
+        params = ImageUploadSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        storage = image_storage()
+        if not hasattr(storage, "presigned_upload"):
+            raise DirectUploadUnavailable
+        content_type = params.validated_data["content_type"]
+        key = upload_key(
+            request.user.id, IMAGE_UPLOAD_EXTENSIONS[content_type]
+        )
+        form = storage.presigned_upload(
+            key,
+            content_type,
+            settings.IMAGE_UPLOAD_MAX_SIZE,
+            settings.IMAGE_UPLOAD_EXPIRES_SECONDS,
+        )
+        return Response(
+            {
+                "image_upload": key,
+                "url": form["url"],
+                "fields": form["fields"],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False,
+        methods=["GET"],
+    )
+    def match(self, request):
+        params = IngredientMatchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        matches = match_recipes(
+            params.validated_data["ingredients"],
+            params.validated_data["min_coverage"],
+        )
+        page = self.paginate_queryset(matches)
+        recipes = self.get_queryset().in_bulk(
+            recipe_id for recipe_id, _ in page
+        )
+        found = [
+            (recipes[recipe_id], coverage)
+            for recipe_id, coverage in page
+            if recipe_id in recipes
+        ]
+        serializer = self.get_serializer(
+            [recipe for recipe, _ in found], many=True
+        )
+        data = serializer.data
+        for recipe, (_, coverage) in zip(data, found):
+            recipe["coverage"] = round(coverage, 4)
+        return self.get_paginated_response(data)
+
+    @action(
+        detail=True,
+        methods=["GET"],
+    )
+    def similar(self, request, pk=None):
+        recipe = get_object_or_404(Recipe, id=pk)
+        recipes = Recipe.objects.filter(
+            similar_to__recipe=recipe
+        ).order_by("-similar_to__score")
+        serializer = RecipeFollowSerializer(
+            recipes, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
     @action(
         detail=True,
         methods=["POST", "DELETE"],
@@ -173,46 +386,87 @@ class ShoppingCardView(APIView):
     """Класс представления списка покупок."""
 
     def get(self, request):
-        user = request.user
-        shopping_list = (
-            RecipeIngredient.objects.filter(recipe__cart__user=user)
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(amount=Sum("amount"))
-            .order_by()
-        )
-        pdfmetrics.registerFont(
-            TTFont(
-                PDF_FONT_NAME,
-                f"{PDF_FONT_NAME}.ttf",
-                "UTF-8",
-            )
+        content = render_shopping_list(shopping_list(request.user))
+        return FileResponse(
+            io.BytesIO(content), as_attachment=True, filename=PDF_FILENAME
+        )
+
+
+class ShoppingListJobViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Выгрузка списка покупок в PDF фоновым воркером.
+
+    POST ставит задание в очередь или возвращает текущее, клиент
+    опрашивает задание и скачивает файл, когда статус станет done.
+    """
+
+    serializer_class = ShoppingListJobSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return ShoppingListJob.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        job, _ = request_job(request.user)
+        return Response(
+            self.get_serializer(job).data,
+            status=(
+                status.HTTP_202_ACCEPTED
+                if job.status in ShoppingListJob.ACTIVE
+                else status.HTTP_200_OK
+            ),
+        )
+
+    @action(detail=True, methods=["GET"])
+    def download(self, request, pk):
+        job = self.get_object()
+        if job.status != ShoppingListJob.DONE or not job.file:
+            raise Http404
+        if job.expires_at is not None and job.expires_at <= timezone.now():
+            raise Http404
+        if not job.file.storage.exists(job.file.name):
+            raise Http404
+        return FileResponse(
+            job.file.open("rb"), as_attachment=True, filename=PDF_FILENAME
         )
-        buffer = io.BytesIO()
-        pdf_file = canvas.Canvas(buffer)
-        pdf_file.setFont(PDF_FONT_NAME, PDF_HEADER_FONT_SIZE)
-        pdf_file.drawString(
-            PDF_CENTER,
-            PDF_HEIGHT,
-            PDF_HEADER_TEXT,
-        )
-        pdf_file.setFont(PDF_FONT_NAME, PDF_TEXT_FONT_SIZE)
-        from_bottom = PDF_HEIGHT - PDF_LEFT
-        for number, ingredient in enumerate(shopping_list, start=1):
-            pdf_file.drawString(
-                PDF_LEFT,
-                from_bottom,
-                (
-                    f'{number}.  {ingredient["ingredient__name"]} - '
-                    f'{ingredient["amount"]} '
-                    f'{ingredient["ingredient__measurement_unit"]}'
-                ),
+
+
+class SyncView(APIView):
+    """Изменения рецептов и связей пользователя с момента курсора."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        params = SyncParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        fieldset = Fieldset.from_request(
+            request,
+            RecipeGetSerializer.Meta.fields,
+            RecipeGetSerializer.compact_fields,
+        )
+        return Response(
+            collect_changes(
+                request,
+                fieldset,
+                params.validated_data.get("since"),
+                params.validated_data["limit"],
             )
-            from_bottom -= PDF_STEP
-            if from_bottom <= PDF_LEFT:
-                from_bottom = PDF_HEIGHT
-                pdf_file.showPage()
-                pdf_file.setFont(PDF_FONT_NAME, PDF_TEXT_FONT_SIZE)
-        pdf_file.showPage()
-        pdf_file.save()
-        buffer.seek(0)
-        return FileResponse(buffer, as_attachment=True, filename=PDF_FILENAME)
+        )
+
+
+class MetricsView(APIView):
+    """Метрики запросов в формате Prometheus."""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise Http404
+        return HttpResponse(
+            registry.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
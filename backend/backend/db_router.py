@@ -0,0 +1,63 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DATABASE = "default"
+PRIMARY_PIN_CACHE_KEY = "db-primary-pin:{user_id}"
+
+_replica = ContextVar("replica", default=None)
+
+
+def current_replica():
+    """Реплика, выбранная для текущего запроса, или None."""
+    return _replica.get()
+
+
+@contextmanager
+def read_from_replica():
+    """Направляет чтения внутри блока на одну случайную реплику.
+
+    Реплика выбирается один раз на блок, чтобы все чтения запроса видели
+    одно и то же состояние базы.
+    """
+    replica = None
+    if settings.REPLICA_DATABASES:
+        replica = random.choice(settings.REPLICA_DATABASES)
+    token = _replica.set(replica)
+    try:
+        yield replica
+    finally:
+        _replica.reset(token)
+
+
+def pin_to_primary(user) -> None:
+    """Закрепляет чтения пользователя за основной базой после записи."""
+    if not settings.REPLICA_DATABASES or user.is_anonymous:
+        return
+    cache.set(
+        PRIMARY_PIN_CACHE_KEY.format(user_id=user.pk),
+        True,
+        settings.REPLICA_PIN_SECONDS,
+    )
+
+
+def is_pinned_to_primary(user) -> bool:
+    if user.is_anonymous:
+        return False
+    return bool(cache.get(PRIMARY_PIN_CACHE_KEY.format(user_id=user.pk)))
+
+
+class PrimaryReplicaRouter:
+    """Роутер: запись в основную базу, чтение из реплик по запросу."""
+
+    def db_for_read(self, model, **hints):
+        return current_replica() or PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -14,6 +14,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 ALLOWED_HOSTS = [os.getenv("ALLOWED_HOSTS")]
 
+FOODGRAM_ROLE = os.getenv("FOODGRAM_ROLE", "all")
+
 DJANGO_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -23,6 +25,12 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
 ]
 
+API_ROLE_EXCLUDED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+]
+
 THIRD_PARTY_APPS = [
     "rest_framework",
     "rest_framework.authtoken",
@@ -39,6 +47,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,8 +55,22 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.ReplicaPinMiddleware",
 ]
 
+API_ROLE_MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "api.middleware.ReplicaPinMiddleware",
+]
+
+if FOODGRAM_ROLE == "api":
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS if app not in API_ROLE_EXCLUDED_APPS
+    ]
+    MIDDLEWARE = API_ROLE_MIDDLEWARE
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -79,6 +102,34 @@ DATABASES = {
     }
 }
 
+REPLICA_DATABASES = []
+
+for number, replica_host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    replica_host, _, replica_port = replica_host.strip().partition(":")
+    replica = f"replica_{number}"
+    DATABASES[replica] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(replica)
+
+DATABASE_ROUTERS = ["backend.db_router.PrimaryReplicaRouter"]
+
+REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", 10))
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -110,22 +161,131 @@ STATIC_ROOT = os.path.join(BASE_DIR, "backend_static")
 MEDIA_URL = "/backend_media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "backend_media")
 
+PRIVATE_MEDIA_ROOT = os.path.join(BASE_DIR, "private_media")
+
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "local")
+
+if MEDIA_STORAGE == "s3":
+    DEFAULT_FILE_STORAGE = "recipes.s3.S3ContentAddressedStorage"
+    PRIVATE_FILE_STORAGE = "recipes.s3.PrivateS3Storage"
+    AWS_STORAGE_BUCKET_NAME = os.getenv(
+        "AWS_STORAGE_BUCKET_NAME", "foodgram-media"
+    )
+    AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
+    AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME")
+    AWS_S3_CUSTOM_DOMAIN = os.getenv("AWS_S3_CUSTOM_DOMAIN")
+    AWS_S3_URL_PROTOCOL = os.getenv("AWS_S3_URL_PROTOCOL", "https:")
+    AWS_QUERYSTRING_AUTH = False
+    AWS_DEFAULT_ACL = None
+    AWS_S3_FILE_OVERWRITE = True
+else:
+    DEFAULT_FILE_STORAGE = "recipes.storage.ContentAddressedStorage"
+    PRIVATE_FILE_STORAGE = "recipes.storage.PrivateStorage"
+
+IMAGE_UPLOAD_PREFIX = "uploads"
+
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+IMAGE_UPLOAD_EXPIRES_SECONDS = 900
+
+MEDIA_GC_GRACE_HOURS = 24
+
 EMPTY_VALUE_DISPLAY = "-пусто-"
 
 AUTH_USER_MODEL = "users.CustomUser"
 
 PAGE_SIZE = 6
 
+MAX_PAGE_SIZE = 100
+
+FEED_FANOUT_MIN_FOLLOWING = int(os.getenv("FEED_FANOUT_MIN_FOLLOWING", 0))
+
+FEED_FANOUT_SIZE = 500
+
+TRENDING_HALF_LIFE_DAYS = 7
+
+TRENDING_WINDOW_DAYS = 60
+
+TRENDING_FAVORITE_WEIGHT = 1.0
+
+TRENDING_CART_WEIGHT = 0.5
+
+SIMILAR_RECIPES_COUNT = 10
+
+SIMILAR_RECIPES_TAG_WEIGHT = 0.5
+
+COFAVORITE_RECIPES_COUNT = 20
+
+COFAVORITE_CART_WEIGHT = 0.0
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+INGREDIENT_CATALOGUE_DIR = "catalogue"
+
+INGREDIENT_CATALOGUE_KEEP = 3
+
+SHOPPING_LIST_MAX_RENDERS = int(os.getenv("SHOPPING_LIST_MAX_RENDERS", 2))
+
+SHOPPING_LIST_JOB_TTL_MINUTES = 60
+
+SHOPPING_LIST_JOB_TIMEOUT_SECONDS = 300
+
+SYNC_PAGE_SIZE = 100
+
+SYNC_CURSOR_LAG_SECONDS = 5
+
+SYNC_TOMBSTONE_DAYS = 30
+
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "True") == "True"
+
+# Кэш токенов нужен общий для всех процессов (CACHE_BACKEND), иначе выход
+# и блокировка пользователя видны только одному воркеру gunicorn.
+AUTH_TOKEN_CACHE_ENABLED = os.getenv("AUTH_TOKEN_CACHE_ENABLED") == "True"
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer"
+        if FAST_JSON_ENABLED
+        else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser"
+        if FAST_JSON_ENABLED
+        else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication"
+        if AUTH_TOKEN_CACHE_ENABLED
+        else "rest_framework.authentication.TokenAuthentication",
     ],
 }
 
+AUTH_TOKEN_CACHE_SECONDS = int(os.getenv("AUTH_TOKEN_CACHE_SECONDS", 30))
+
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.metrics": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 DJOSER = {
     "LOGIN_FIELD": "email",
     "HIDE_USERS": False,
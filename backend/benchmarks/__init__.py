@@ -0,0 +1,47 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Создаёт временную тестовую базу на время бенчмарка."""
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(title: str, timings: list, **extra) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    columns = " ".join(f"{name}={value}" for name, value in extra.items())
+    print(
+        f"{title:<40} "
+        f"median={statistics.median(timings) * 1000:.3f}ms "
+        f"p95={p95 * 1000:.3f}ms {columns}"
+    )
@@ -0,0 +1,68 @@
+"""Совместное избранное: расчёт по всему избранному и выдача подсказок.
+
+Запуск: python -m benchmarks.bench_co_favorites --users 50000
+"""
+
+import argparse
+import random
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 20
+
+
+def main(options):
+    from django.core.management import call_command
+
+    from recipes.cofavorites import (build_interaction_matrix,
+                                     rebuild_co_favorites,
+                                     suggestions_queryset)
+    from recipes.models import Favorite
+    from users.models import CustomUser
+
+    call_command(
+        "seed_foodgram",
+        users=options.users,
+        recipes=options.recipes,
+        favorites=options.favorites,
+        cart=0,
+        subscriptions=0,
+        seed=1,
+    )
+    extra = {
+        "favorites": Favorite.objects.count(),
+        "recipes": options.recipes,
+    }
+    report(
+        "build interaction matrix",
+        measure(build_interaction_matrix, 1),
+        **extra,
+    )
+    report(
+        "full co-favorite rebuild", measure(rebuild_co_favorites, 1), **extra
+    )
+
+    users = iter(
+        random.Random(1).sample(
+            list(CustomUser.objects.values_list("id", flat=True)), REPEAT
+        )
+    )
+    report(
+        "suggestions page",
+        measure(
+            lambda: list(suggestions_queryset(CustomUser(id=next(users)))[:6]),
+            REPEAT,
+        ),
+        **extra,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--recipes", type=int, default=50000)
+    parser.add_argument("--favorites", type=int, default=20)
+    arguments = parser.parse_args()
+    setup_django()
+    with benchmark_database():
+        main(arguments)
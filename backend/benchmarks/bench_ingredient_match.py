@@ -0,0 +1,83 @@
+"""Подбор рецептов по ингредиентам: JOIN по RecipeIngredient и индекс.
+
+Запуск: python -m benchmarks.bench_ingredient_match --recipes 100000
+"""
+import argparse
+import random
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 20
+PANTRY_SIZE = 8
+
+
+def match_with_join(ingredient_ids, min_coverage):
+    from django.db.models import Count, Q
+
+    from recipes.models import Recipe
+
+    rows = (
+        Recipe.objects.annotate(
+            total=Count("amount"),
+            matched=Count(
+                "amount", filter=Q(amount__ingredient_id__in=ingredient_ids)
+            ),
+        )
+        .filter(matched__gt=0)
+        .values_list("id", "matched", "total")
+        .order_by()
+    )
+    return sorted(
+        (
+            (recipe_id, matched / total)
+            for recipe_id, matched, total in rows
+            if matched / total >= min_coverage
+        ),
+        key=lambda item: (-item[1], -item[0]),
+    )
+
+
+def main(options):
+    from django.core.management import call_command
+
+    from recipes.ingredient_index import match_recipes
+    from recipes.models import RecipeIngredient
+
+    call_command(
+        "seed_foodgram",
+        users=options.recipes // 50,
+        recipes=options.recipes,
+        favorites=0,
+        cart=0,
+        subscriptions=0,
+        seed=1,
+    )
+    ingredient_ids = list(
+        RecipeIngredient.objects.values_list("ingredient_id", flat=True)
+        .distinct()
+        .order_by()
+    )
+    rng = random.Random(1)
+    pantries = [
+        rng.sample(ingredient_ids, PANTRY_SIZE) for _ in range(REPEAT)
+    ]
+    assert all(
+        match_recipes(pantry, 0.5) == match_with_join(pantry, 0.5)
+        for pantry in pantries[:3]
+    )
+    for name, matcher in (
+        ("join over RecipeIngredient", match_with_join),
+        ("inverted ingredient index", match_recipes),
+    ):
+        queue = iter(pantries)
+        timings = measure(lambda: matcher(next(queue), 0.5), REPEAT)
+        report(name, timings, recipes=options.recipes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=100000)
+    arguments = parser.parse_args()
+    setup_django()
+    with benchmark_database():
+        main(arguments)
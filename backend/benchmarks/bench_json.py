@@ -0,0 +1,82 @@
+"""Рендеринг и разбор JSON: стандартный json DRF и orjson.
+
+Запуск: python -m benchmarks.bench_json
+"""
+import base64
+import io
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 200
+PAGE_SIZE = 100
+IMAGE_BYTES = 2 * 1024 * 1024
+
+
+def recipe_page():
+    """Страница из PAGE_SIZE рецептов в виде RecipeGetSerializer."""
+    from django.core.management import call_command
+    from rest_framework.test import APIRequestFactory
+
+    from api.views import RecipeViewSet
+
+    call_command(
+        "seed_foodgram",
+        users=20,
+        recipes=PAGE_SIZE,
+        favorites=0,
+        cart=0,
+        subscriptions=0,
+        seed=1,
+    )
+    request = APIRequestFactory().get("/api/recipes/", {"limit": PAGE_SIZE})
+    return RecipeViewSet.as_view({"get": "list"})(request).data
+
+
+def recipe_upload() -> bytes:
+    """Тело создания рецепта с изображением в base64."""
+    from rest_framework.renderers import JSONRenderer
+
+    image = base64.b64encode(bytes(IMAGE_BYTES)).decode()
+    return JSONRenderer().render(
+        {
+            "name": "Рецепт",
+            "text": "Описание рецепта. " * 200,
+            "cooking_time": 30,
+            "image": f"data:image/png;base64,{image}",
+            "tags": [1, 2],
+            "ingredients": [{"id": pk, "amount": 10} for pk in range(1, 15)],
+        }
+    )
+
+
+def main():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer
+
+    page = recipe_page()
+    rendered = JSONRenderer().render(page)
+    for renderer in (JSONRenderer(), FastJSONRenderer()):
+        assert renderer.render(page) == rendered
+        report(
+            f"render {type(renderer).__name__}",
+            measure(lambda: renderer.render(page), REPEAT),
+            recipes=PAGE_SIZE,
+            kib=len(rendered) // 1024,
+        )
+
+    body = recipe_upload()
+    for parser in (JSONParser(), FastJSONParser()):
+        report(
+            f"parse {type(parser).__name__}",
+            measure(lambda: parser.parse(io.BytesIO(body)), REPEAT // 4),
+            kib=len(body) // 1024,
+        )
+
+
+if __name__ == "__main__":
+    setup_django()
+    with benchmark_database():
+        main()
@@ -0,0 +1,53 @@
+"""Сравнение полного профиля и профиля FOODGRAM_ROLE=api.
+
+Запуск: python -m benchmarks.bench_middleware
+"""
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 1000
+ROLES = ("all", "api")
+
+
+def run_role():
+    started = time.perf_counter()
+    setup_django()
+    from django.urls import resolve
+
+    resolve("/api/")
+    startup = time.perf_counter() - started
+
+    with benchmark_database():
+        from django.conf import settings
+        from django.test import Client
+
+        client = Client()
+        client.get("/api/tags/")
+        timings = measure(lambda: client.get("/api/tags/"), REPEAT)
+    report(
+        f"FOODGRAM_ROLE={settings.FOODGRAM_ROLE}",
+        timings,
+        startup=f"{startup * 1000:.1f}ms",
+        middleware=len(settings.MIDDLEWARE),
+        apps=len(settings.INSTALLED_APPS),
+    )
+
+
+def main():
+    for role in ROLES:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_middleware", "--role"],
+            env={**os.environ, "FOODGRAM_ROLE": role},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    if "--role" in sys.argv:
+        run_role()
+    else:
+        main()
@@ -0,0 +1,68 @@
+"""Список рецептов: RecipeGetSerializer, карточки из values() и сетка.
+
+Запуск: python -m benchmarks.bench_recipe_cards
+"""
+import statistics
+from contextlib import nullcontext
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 100
+PAGE_SIZES = (6, 50)
+GRID_FIELDS = "id,name,image,cooking_time,tags"
+
+
+def serializer_path():
+    """Возвращает RecipeViewSet.list к ModelSerializer на время блока."""
+    from unittest import mock
+
+    from rest_framework import viewsets
+
+    from api.views import RecipeViewSet
+
+    return mock.patch.multiple(
+        RecipeViewSet, card_actions=(), list=viewsets.ModelViewSet.list
+    )
+
+
+def main():
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    call_command(
+        "seed_foodgram",
+        users=200,
+        recipes=2000,
+        favorites=20,
+        cart=5,
+        subscriptions=10,
+        seed=1,
+    )
+    user = get_user_model().objects.get(email="seed1@example.com")
+    token = Token.objects.create(user=user)
+    client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    for page_size in PAGE_SIZES:
+        url = f"/api/recipes/?limit={page_size}"
+        for title, path, params in (
+            ("serializer", serializer_path, ""),
+            ("cards", nullcontext, ""),
+            ("grid", nullcontext, f"&fields={GRID_FIELDS}"),
+        ):
+            with path():
+                size = len(client.get(url + params).content)
+                timings = measure(lambda: client.get(url + params), REPEAT)
+            report(
+                f"{title} limit={page_size}",
+                timings,
+                requests_per_second=round(1 / statistics.median(timings)),
+                kib=round(size / 1024, 1),
+            )
+
+
+if __name__ == "__main__":
+    setup_django()
+    with benchmark_database():
+        main()
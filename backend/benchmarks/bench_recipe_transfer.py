@@ -0,0 +1,49 @@
+"""Выгрузка и загрузка рецептов в NDJSON.
+
+Запуск: python -m benchmarks.bench_recipe_transfer --recipes 20000
+"""
+import argparse
+import tempfile
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+
+def main(options):
+    from django.core.management import call_command
+
+    from recipes.models import Recipe
+    from recipes.transfer import RecipeImporter, export_recipes
+
+    call_command(
+        "seed_foodgram",
+        users=options.recipes // 20,
+        recipes=options.recipes,
+        favorites=0,
+        cart=0,
+        subscriptions=0,
+        seed=1,
+    )
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stream:
+        timings = measure(lambda: export_recipes(stream), 1)
+        report(
+            "export",
+            timings,
+            recipes_per_sec=round(options.recipes / timings[0]),
+        )
+        Recipe.objects.all().delete()
+        stream.seek(0)
+        timings = measure(lambda: RecipeImporter().run(stream), 1)
+        report(
+            "import",
+            timings,
+            recipes_per_sec=round(options.recipes / timings[0]),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=20000)
+    arguments = parser.parse_args()
+    setup_django()
+    with benchmark_database():
+        main(arguments)
@@ -0,0 +1,64 @@
+"""Похожие рецепты: полный расчёт и пересчёт по очереди изменений.
+
+Запуск: python -m benchmarks.bench_similar_recipes --recipes 50000
+"""
+import argparse
+import random
+
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 3
+CHANGED = 50
+
+
+def main(options):
+    from django.core.management import call_command
+
+    from recipes.models import Ingredient, Recipe
+    from recipes.similarity import (build_feature_matrix,
+                                    rebuild_similar_recipes,
+                                    update_similar_recipes)
+
+    call_command(
+        "seed_foodgram",
+        users=options.recipes // 50,
+        recipes=options.recipes,
+        favorites=0,
+        cart=0,
+        subscriptions=0,
+        seed=1,
+    )
+    recipe_ids = list(Recipe.objects.values_list("id", flat=True))
+    extra = {
+        "recipes": len(recipe_ids),
+        "ingredients": Ingredient.objects.count(),
+    }
+    rng = random.Random(1)
+
+    report(
+        "build sparse feature matrix",
+        measure(build_feature_matrix, REPEAT),
+        **extra,
+    )
+    report(
+        "full top-k rebuild",
+        measure(rebuild_similar_recipes, REPEAT),
+        **extra,
+    )
+    report(
+        f"pending update of {CHANGED} recipes",
+        measure(
+            lambda: update_similar_recipes(rng.sample(recipe_ids, CHANGED)),
+            REPEAT,
+        ),
+        **extra,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=50000)
+    arguments = parser.parse_args()
+    setup_django()
+    with benchmark_database():
+        main(arguments)
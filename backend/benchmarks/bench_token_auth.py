@@ -0,0 +1,50 @@
+"""Сравнение TokenAuthentication и CachedTokenAuthentication.
+
+Запуск: python -m benchmarks.bench_token_auth
+"""
+from benchmarks import benchmark_database, measure, report, setup_django
+
+REPEAT = 500
+
+
+def main():
+    from unittest import mock
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+
+    from api.authentication import CachedTokenAuthentication
+    from api.views import TagViewSet
+
+    user = get_user_model().objects.create_user(
+        email="bench@example.com",
+        username="bench",
+        first_name="Bench",
+        last_name="User",
+        password="bench-password",
+    )
+    token = Token.objects.create(user=user)
+    client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    for auth_class in (TokenAuthentication, CachedTokenAuthentication):
+        with mock.patch.object(
+            TagViewSet, "authentication_classes", [auth_class]
+        ):
+            client.get("/api/tags/")
+            with CaptureQueriesContext(connection) as queries:
+                timings = measure(lambda: client.get("/api/tags/"), REPEAT)
+        report(
+            auth_class.__name__,
+            timings,
+            queries_per_request=len(queries) / REPEAT,
+        )
+
+
+if __name__ == "__main__":
+    setup_django()
+    with benchmark_database():
+        main()
@@ -0,0 +1,245 @@
+"""Нагрузочный тест API на asyncio без внешних зависимостей.
+
+Перед запуском заполните базу: python manage.py seed_foodgram. Команда
+выводит первый номер созданного пользователя, его передают в --first-user.
+Запуск: python -m benchmarks.loadtest --first-user <N>
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+SEED_PASSWORD = "foodgram-seed"
+SEED_EMAIL = "seed{number}@example.com"
+AUTOCOMPLETE_PREFIXES = ("а", "мол", "сах", "со", "кар", "мук", "яй", "ма")
+SCENARIOS = (
+    ("recipe_feed", 40),
+    ("recipe_detail", 15),
+    ("autocomplete", 20),
+    ("toggle_favorite", 8),
+    ("toggle_cart", 7),
+    ("subscriptions", 7),
+    ("download_pdf", 3),
+)
+
+
+class HttpConnection:
+    """Keep-alive соединение HTTP/1.1 поверх asyncio."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, token=None, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}",
+            "Accept: application/json",
+            f"Content-Length: {len(payload)}",
+        ]
+        if payload:
+            headers.append("Content-Type: application/json")
+        if token:
+            headers.append(f"Authorization: Token {token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode())
+        self.writer.write(payload)
+        await self.writer.drain()
+        return await self.read_response()
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(
+                int(headers.get("content-length", 0))
+            )
+        if headers.get("connection") == "close":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class VirtualUser:
+    def __init__(self, connection, token, recipe_ids):
+        self.connection = connection
+        self.token = token
+        self.recipe_ids = recipe_ids
+
+    async def recipe_feed(self):
+        page = random.randint(1, 20)
+        return await self.connection.request(
+            "GET", f"/api/recipes/?page={page}", self.token
+        )
+
+    async def recipe_detail(self):
+        recipe = random.choice(self.recipe_ids)
+        return await self.connection.request(
+            "GET", f"/api/recipes/{recipe}/", self.token
+        )
+
+    async def autocomplete(self):
+        prefix = random.choice(AUTOCOMPLETE_PREFIXES)
+        return await self.connection.request(
+            "GET", f"/api/ingredients/?name={prefix}", self.token
+        )
+
+    async def toggle(self, action):
+        recipe = random.choice(self.recipe_ids)
+        path = f"/api/recipes/{recipe}/{action}/"
+        status, body = await self.connection.request("POST", path, self.token)
+        if status == 400:
+            return await self.connection.request("DELETE", path, self.token)
+        return status, body
+
+    async def toggle_favorite(self):
+        return await self.toggle("favorite")
+
+    async def toggle_cart(self):
+        return await self.toggle("shopping_cart")
+
+    async def subscriptions(self):
+        return await self.connection.request(
+            "GET", "/api/users/subscriptions/?recipes_limit=3", self.token
+        )
+
+    async def download_pdf(self):
+        return await self.connection.request(
+            "GET", "/api/recipes/download_shopping_cart/", self.token
+        )
+
+
+async def login(host, port, number):
+    connection = HttpConnection(host, port)
+    status, body = await connection.request(
+        "POST",
+        "/api/auth/token/login/",
+        body={
+            "email": SEED_EMAIL.format(number=number),
+            "password": SEED_PASSWORD,
+        },
+    )
+    if status != 200:
+        raise RuntimeError(f"Не удалось войти как seed{number}: {body!r}")
+    return connection, json.loads(body)["auth_token"]
+
+
+async def run_user(user, deadline, results):
+    names = [name for name, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status, _ = await getattr(user, name)()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            user.connection.close()
+            status = 599
+        results[name].append((time.perf_counter() - started, status))
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def print_report(results, duration):
+    print(
+        f"{'scenario':<16}{'requests':>9}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    everything = []
+    for name, _ in SCENARIOS:
+        samples = results.get(name, [])
+        if not samples:
+            continue
+        everything.extend(samples)
+        print_row(name, samples, duration)
+    print_row("total", everything, duration)
+
+
+def print_row(name, samples, duration):
+    timings = sorted(timing for timing, _ in samples)
+    errors = sum(1 for _, status in samples if status >= 500)
+    print(
+        f"{name:<16}{len(samples):>9}{errors:>8}"
+        f"{len(samples) / duration:>9.1f}"
+        f"{statistics.median(timings) * 1000:>9.1f}"
+        f"{percentile(timings, 0.95) * 1000:>9.1f}"
+        f"{percentile(timings, 0.99) * 1000:>9.1f}"
+    )
+
+
+async def main(options):
+    url = urlsplit(options.base_url)
+    host, port = url.hostname, url.port or 80
+    sessions = await asyncio.gather(
+        *(
+            login(host, port, number)
+            for number in range(
+                options.first_user, options.first_user + options.users
+            )
+        )
+    )
+    probe, token = sessions[0]
+    _, body = await probe.request("GET", "/api/recipes/?limit=100", token)
+    recipe_ids = [recipe["id"] for recipe in json.loads(body)["results"]]
+
+    results = defaultdict(list)
+    deadline = time.monotonic() + options.duration
+    started = time.monotonic()
+    await asyncio.gather(
+        *(
+            run_user(
+                VirtualUser(connection, token, recipe_ids),
+                deadline,
+                results,
+            )
+            for connection, token in sessions
+        )
+    )
+    print_report(results, time.monotonic() - started)
+    for connection, _ in sessions:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument(
+        "--first-user",
+        type=int,
+        required=True,
+        help="Первый номер пользователя из вывода seed_foodgram",
+    )
+    parser.add_argument("--duration", type=float, default=30)
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,11 @@
 from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
+from .admin_tools import (AuthorEmailFilter, EstimatedCountPaginator,
+                          IngredientNameFilter, RecipeNameFilter,
+                          UserEmailFilter)
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient, Shopping,
                      Tag)
 
@@ -22,75 +27,96 @@ class TagAdmin(admin.ModelAdmin):
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "measurement_unit")
     search_fields = ("name", "measurement_unit")
-    list_filter = ("name",)
+    list_filter = ("measurement_unit",)
     ordering = ("id",)
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
 
 class RecipeIngredientInline(admin.StackedInline):
     model = RecipeIngredient
-    filter_horizontal = ('ingredients',)
+    autocomplete_fields = ("ingredient",)
+    extra = 1
 
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "author", "count_favorites")
+    list_select_related = ("author",)
     search_fields = (
-        "username",
-        "email",
-        "first_name",
-        "last_name",
+        "name",
+        "author__username",
+        "author__email",
     )
     list_filter = (
-        "author",
-        "name",
+        AuthorEmailFilter,
         "tags",
     )
-    ordering = ("name",)
+    autocomplete_fields = ("author", "tags")
+    ordering = ("-id",)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
     inlines = [RecipeIngredientInline]
 
+    def get_queryset(self, request):
+        favorites_count = (
+            Favorite.objects.filter(recipe=OuterRef("pk"))
+            .order_by()
+            .values("recipe")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(favorites_count=Coalesce(Subquery(favorites_count), 0))
+        )
+
+    @admin.display(description="В избранном", ordering="favorites_count")
     def count_favorites(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
-@admin.register(RecipeIngredient)
-class RecipeIngredientAdmin(admin.ModelAdmin):
-    list_display = ("id", "recipe", "ingredient", "amount")
+class RelationAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "recipe")
+    list_select_related = ("user", "recipe")
     search_fields = (
-        "recipe",
-        "ingredient",
+        "user__email",
+        "recipe__name",
     )
     list_filter = (
-        "recipe",
-        "ingredient",
+        UserEmailFilter,
+        RecipeNameFilter,
     )
+    autocomplete_fields = ("user", "recipe")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
 
-@admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "recipe")
+@admin.register(RecipeIngredient)
+class RecipeIngredientAdmin(admin.ModelAdmin):
+    list_display = ("id", "recipe", "ingredient", "amount")
+    list_select_related = ("recipe", "ingredient")
     search_fields = (
-        "user",
-        "recipe",
+        "recipe__name",
+        "ingredient__name",
     )
     list_filter = (
-        "user",
-        "recipe",
+        RecipeNameFilter,
+        IngredientNameFilter,
     )
+    autocomplete_fields = ("recipe", "ingredient")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
 
+@admin.register(Favorite)
+class FavoriteAdmin(RelationAdmin):
+    pass
+
+
 @admin.register(Shopping)
-class ShoppingAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "recipe")
-    search_fields = (
-        "user",
-        "recipe",
-    )
-    list_filter = (
-        "user",
-        "recipe",
-    )
-    empty_value_display = settings.EMPTY_VALUE_DISPLAY
+class ShoppingAdmin(RelationAdmin):
+    pass
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset: QuerySet):
+    """Оценка числа строк таблицы из статистики PostgreSQL."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки без COUNT(*) по большим таблицам.
+
+    Для списка без фильтров берёт оценку из статистики планировщика, если
+    она больше ADMIN_ESTIMATED_COUNT_THRESHOLD.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if (
+                estimate is not None
+                and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+            ):
+                return estimate
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр с полем ввода вместо списка всех значений поля."""
+
+    template = "admin/input_filter.html"
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return ((None, None),)
+
+    def choices(self, changelist):
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = (
+            (name, value)
+            for name, value in changelist.get_filters_params().items()
+            if name != self.parameter_name
+        )
+        yield all_choice
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if value:
+            return queryset.filter(**{self.lookup: value})
+        return queryset
+
+
+class UserEmailFilter(InputFilter):
+    title = "email пользователя"
+    parameter_name = "user_email"
+    lookup = "user__email"
+
+
+class AuthorEmailFilter(InputFilter):
+    title = "email автора"
+    parameter_name = "author_email"
+    lookup = "author__email"
+
+
+class RecipeNameFilter(InputFilter):
+    title = "названию рецепта"
+    parameter_name = "recipe_name"
+    lookup = "recipe__name__istartswith"
+
+
+class IngredientNameFilter(InputFilter):
+    title = "названию ингредиента"
+    parameter_name = "ingredient_name"
+    lookup = "ingredient__name__istartswith"
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from recipes.models import Ingredient
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = "manifest.json"
+PREFIX = "ingredients."
+
+_pending = threading.local()
+
+
+def catalogue_root() -> str:
+    return os.path.join(
+        settings.STATIC_ROOT, settings.INGREDIENT_CATALOGUE_DIR
+    )
+
+
+def _write(path: str, content: bytes) -> None:
+    """Записывает файл атомарно: читатели видят старую или новую версию.
+
+    У каждой записи свой временный файл, поэтому параллельные сборки не
+    мешают друг другу.
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), prefix=".", suffix=".tmp", delete=False
+    ) as file:
+        file.write(content)
+    try:
+        # mkstemp создаёт файл с правами 0600, а nginx должен его читать.
+        os.chmod(file.name, 0o644)
+        os.replace(file.name, path)
+    except OSError:
+        os.remove(file.name)
+        raise
+
+
+def _prune(root: str, keep: set) -> None:
+    """Удаляет версии каталога, кроме keep и нескольких последних."""
+    versions = sorted(
+        (
+            entry
+            for entry in os.scandir(root)
+            if entry.name.startswith(PREFIX) and entry.name.endswith(".json")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    stale = [
+        entry.name
+        for entry in versions[settings.INGREDIENT_CATALOGUE_KEEP:]
+        if entry.name not in keep
+    ]
+    for name in stale:
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.remove(os.path.join(root, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def build_catalogue() -> dict:
+    """Выгружает ингредиенты в статический файл с хэшем в имени.
+
+    Рядом пишутся сжатые копии .gz и, если установлен brotli, .br для
+    gzip_static/brotli_static в nginx. Текущая версия записывается в
+    manifest.json, старые версии удаляются.
+    """
+    rows = [
+        {"id": pk, "name": name, "measurement_unit": unit}
+        for pk, name, unit in Ingredient.objects.order_by("id").values_list(
+            "id", "name", "measurement_unit"
+        )
+    ]
+    content = json.dumps(
+        rows, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    version = hashlib.sha256(content).hexdigest()[:16]
+    filename = f"{PREFIX}{version}.json"
+    root = catalogue_root()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, filename)
+    if not os.path.exists(path):
+        _write(f"{path}.gz", gzip.compress(content, 9, mtime=0))
+        if brotli is not None:
+            _write(f"{path}.br", brotli.compress(content))
+        _write(path, content)
+    manifest = {"version": version, "file": filename, "count": len(rows)}
+    _write(os.path.join(root, MANIFEST), json.dumps(manifest).encode())
+    _prune(root, {filename})
+    return manifest
+
+
+def current_catalogue():
+    """Манифест текущей версии или None, если каталог ещё не собран."""
+    try:
+        with open(os.path.join(catalogue_root(), MANIFEST), "rb") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def catalogue_url(manifest: dict) -> str:
+    return (
+        f"{settings.STATIC_URL}{settings.INGREDIENT_CATALOGUE_DIR}/"
+        f"{manifest['file']}"
+    )
+
+
+def schedule_catalogue_build() -> None:
+    """Пересобирает каталог один раз после коммита транзакции."""
+    _pending.scheduled = True
+    transaction.on_commit(flush_catalogue_build)
+
+
+def flush_catalogue_build() -> None:
+    if not getattr(_pending, "scheduled", False):
+        return
+    _pending.scheduled = False
+    build_catalogue()
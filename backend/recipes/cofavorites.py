@@ -0,0 +1,99 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Sum
+from scipy import sparse
+
+from recipes.models import CoFavoriteRecipe, Favorite, Recipe, Shopping
+from recipes.similarity import BATCH_SIZE, id_pairs, select_top
+
+ROW_BLOCK = 1024
+
+
+def build_interaction_matrix(cart_weight=None):
+    """Строит матрицу рецепт × пользователь по избранному.
+
+    Список покупок учитывается с весом cart_weight (по умолчанию
+    COFAVORITE_CART_WEIGHT), если он больше нуля. Строки нормированы по
+    L2, так что произведение строк — косинусная мера совместного
+    добавления, а не сырое число пользователей, которое завышает связи с
+    самыми популярными рецептами.
+    """
+    if cart_weight is None:
+        cart_weight = settings.COFAVORITE_CART_WEIGHT
+    sources = [(Favorite, 1.0)]
+    if cart_weight > 0:
+        sources.append((Shopping, cart_weight))
+    pairs, weights = [], []
+    for model, weight in sources:
+        model_pairs = id_pairs(
+            model.objects.values_list("recipe_id", "user_id")
+        )
+        pairs.append(model_pairs)
+        weights.append(np.full(len(model_pairs), weight, np.float32))
+    pairs = np.concatenate(pairs)
+    recipe_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    _, columns = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.concatenate(weights), (rows.ravel(), columns.ravel())),
+        shape=(len(recipe_ids), columns.max(initial=-1) + 1),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    norms[norms == 0] = 1
+    return recipe_ids, sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def top_co_favorites(matrix, count: int):
+    """Для каждого блока рецептов выдаёт (рецепты, соседи, сила связи).
+
+    Блок строк X·Xᵀ считается разреженным произведением: стоимость
+    пропорциональна числу реальных совместных добавлений, а не квадрату
+    числа рецептов.
+    """
+    user_major = matrix.T.tocsr()
+    for start in range(0, matrix.shape[0], ROW_BLOCK):
+        scores = matrix[start:start + ROW_BLOCK].dot(user_major).tocoo()
+        owners = scores.row + start
+        other = owners != scores.col
+        yield select_top(
+            owners[other], scores.col[other], scores.data[other], count
+        )
+
+
+def rebuild_co_favorites(cart_weight=None) -> int:
+    """Полностью пересчитывает таблицу CoFavoriteRecipe."""
+    recipe_ids, matrix = build_interaction_matrix(cart_weight)
+    co_favorites = [
+        CoFavoriteRecipe(recipe_id=recipe_id, similar_id=other_id, score=score)
+        for owners, neighbours, scores in top_co_favorites(
+            matrix, settings.COFAVORITE_RECIPES_COUNT
+        )
+        for recipe_id, other_id, score in zip(
+            recipe_ids[owners].tolist(),
+            recipe_ids[neighbours].tolist(),
+            scores.tolist(),
+        )
+    ]
+    with transaction.atomic():
+        CoFavoriteRecipe.objects.all().delete()
+        CoFavoriteRecipe.objects.bulk_create(
+            co_favorites, batch_size=BATCH_SIZE
+        )
+    return len(recipe_ids)
+
+
+def suggestions_queryset(user):
+    """Рецепты, которые добавляют в избранное вместе с избранным user.
+
+    Вес рецепта — сумма силы связи со всеми избранными рецептами
+    пользователя; уже избранные рецепты исключаются.
+    """
+    favorites = Favorite.objects.filter(user=user)
+    return (
+        Recipe.objects.filter(
+            co_favorite_of__recipe_id__in=favorites.values("recipe_id")
+        )
+        .exclude(Exists(favorites.filter(recipe=OuterRef("pk"))))
+        .annotate(suggestion_score=Sum("co_favorite_of__score"))
+        .order_by("-suggestion_score", "-id")
+    )
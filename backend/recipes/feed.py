@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from recipes.models import Recipe
+from users.models import Subscribe
+
+FEED_CACHE_KEY = "recipe-feed:{user_id}"
+FEED_CACHE_SECONDS = 60 * 60
+
+
+def _followed_authors(user):
+    return Subscribe.objects.filter(user=user).values("author_id")
+
+
+def _cached_feed(user):
+    """Id свежих рецептов ленты, разложенные при записи.
+
+    Кэш строится только для пользователей, подписанных не меньше чем на
+    FEED_FANOUT_MIN_FOLLOWING авторов. Возвращает (ids, truncated) или None.
+    """
+    if not settings.FEED_FANOUT_MIN_FOLLOWING:
+        return None
+    key = FEED_CACHE_KEY.format(user_id=user.pk)
+    feed = cache.get(key)
+    if feed is not None:
+        return feed
+    if (
+        Subscribe.objects.filter(user=user).count()
+        < settings.FEED_FANOUT_MIN_FOLLOWING
+    ):
+        return None
+    ids = list(
+        Recipe.objects.filter(author_id__in=_followed_authors(user))
+        .order_by("-id")
+        .values_list("id", flat=True)[: settings.FEED_FANOUT_SIZE + 1]
+    )
+    feed = (
+        ids[: settings.FEED_FANOUT_SIZE],
+        len(ids) > settings.FEED_FANOUT_SIZE,
+    )
+    cache.set(key, feed, FEED_CACHE_SECONDS)
+    return feed
+
+
+def feed_queryset(user):
+    """Рецепты авторов, на которых подписан пользователь."""
+    feed = _cached_feed(user)
+    if feed is None:
+        return Recipe.objects.filter(author_id__in=_followed_authors(user))
+    ids, truncated = feed
+    condition = Q(id__in=ids)
+    if truncated:
+        condition |= Q(
+            id__lt=ids[-1], author_id__in=_followed_authors(user)
+        )
+    return Recipe.objects.filter(condition)
+
+
+def push_recipe_to_feeds(recipe_id: int, author_id: int) -> None:
+    """Добавляет новый рецепт в закэшированные ленты подписчиков."""
+    if not settings.FEED_FANOUT_MIN_FOLLOWING:
+        return
+    keys = [
+        FEED_CACHE_KEY.format(user_id=user_id)
+        for user_id in Subscribe.objects.filter(
+            author_id=author_id
+        ).values_list("user_id", flat=True)
+    ]
+    feeds = {}
+    for key, (ids, truncated) in cache.get_many(keys).items():
+        ids = [recipe_id, *ids]
+        feeds[key] = (
+            ids[: settings.FEED_FANOUT_SIZE],
+            truncated or len(ids) > settings.FEED_FANOUT_SIZE,
+        )
+    cache.set_many(feeds, FEED_CACHE_SECONDS)
+
+
+def invalidate_feed(user_id: int) -> None:
+    cache.delete(FEED_CACHE_KEY.format(user_id=user_id))
@@ -0,0 +1,154 @@
+import threading
+from array import array
+from collections import Counter, defaultdict
+from itertools import groupby
+
+from django.db import transaction
+
+from recipes.models import IngredientIndex, RecipeIngredient
+
+RECIPE_ID_TYPECODE = "I"
+COUNT_TYPECODE = "H"
+BATCH_SIZE = 500
+
+_pending = threading.local()
+
+
+def _load_posting(posting: IngredientIndex):
+    recipe_ids = array(RECIPE_ID_TYPECODE)
+    recipe_ids.frombytes(posting.recipe_ids)
+    counts = array(COUNT_TYPECODE)
+    counts.frombytes(posting.ingredient_counts)
+    return recipe_ids, counts
+
+
+def _store_posting(posting: IngredientIndex, entries: dict) -> None:
+    recipe_ids = sorted(entries)
+    posting.recipe_ids = array(RECIPE_ID_TYPECODE, recipe_ids).tobytes()
+    posting.ingredient_counts = array(
+        COUNT_TYPECODE, (entries[recipe_id] for recipe_id in recipe_ids)
+    ).tobytes()
+
+
+def _recipe_ingredients(recipe_ids) -> dict:
+    ingredients = defaultdict(list)
+    for recipe_id, ingredient_id in RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list("recipe_id", "ingredient_id").order_by():
+        ingredients[recipe_id].append(ingredient_id)
+    return ingredients
+
+
+def rebuild_ingredient_index() -> int:
+    """Полностью перестраивает индекс по RecipeIngredient."""
+    counts = Counter(
+        RecipeIngredient.objects.values_list("recipe_id", flat=True)
+        .order_by()
+        .iterator()
+    )
+    rows = (
+        RecipeIngredient.objects.values_list("ingredient_id", "recipe_id")
+        .order_by("ingredient_id", "recipe_id")
+        .iterator()
+    )
+    postings = []
+    for ingredient_id, group in groupby(rows, key=lambda row: row[0]):
+        posting = IngredientIndex(ingredient_id=ingredient_id)
+        _store_posting(
+            posting, {recipe_id: counts[recipe_id] for _, recipe_id in group}
+        )
+        postings.append(posting)
+    with transaction.atomic():
+        IngredientIndex.objects.all().delete()
+        IngredientIndex.objects.bulk_create(postings, batch_size=BATCH_SIZE)
+    return len(postings)
+
+
+def reindex_recipes(recipe_ids, stale_ingredient_ids=()) -> None:
+    """Обновляет индекс для изменённых или удалённых рецептов.
+
+    stale_ingredient_ids — ингредиенты, в которых рецепты были раньше.
+    """
+    recipe_ids = set(recipe_ids)
+    current = _recipe_ingredients(recipe_ids)
+    changes = defaultdict(dict)
+    for ingredient_id in stale_ingredient_ids:
+        for recipe_id in recipe_ids:
+            changes[ingredient_id][recipe_id] = None
+    for recipe_id, ingredient_ids in current.items():
+        for ingredient_id in ingredient_ids:
+            changes[ingredient_id][recipe_id] = len(ingredient_ids)
+    if not changes:
+        return
+
+    with transaction.atomic():
+        postings = IngredientIndex.objects.select_for_update().in_bulk(
+            list(changes)
+        )
+        created = []
+        for ingredient_id, recipes in changes.items():
+            posting = postings.get(ingredient_id)
+            if posting is None:
+                posting = IngredientIndex(ingredient_id=ingredient_id)
+                created.append(posting)
+                entries = {}
+            else:
+                entries = dict(zip(*_load_posting(posting)))
+            for recipe_id, count in recipes.items():
+                if count is None:
+                    entries.pop(recipe_id, None)
+                else:
+                    entries[recipe_id] = count
+            _store_posting(posting, entries)
+        IngredientIndex.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        IngredientIndex.objects.bulk_update(
+            postings.values(),
+            ("recipe_ids", "ingredient_counts"),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def schedule_reindex(recipe_id: int, stale_ingredient_ids=()) -> None:
+    """Откладывает обновление индекса рецепта до коммита транзакции."""
+    pending = getattr(_pending, "recipes", None)
+    if pending is None:
+        pending = _pending.recipes = defaultdict(set)
+    pending[recipe_id].update(stale_ingredient_ids)
+    transaction.on_commit(flush_reindex)
+
+
+def flush_reindex() -> None:
+    pending = getattr(_pending, "recipes", None)
+    if not pending:
+        return
+    _pending.recipes = None
+    reindex_recipes(pending, set().union(*pending.values()))
+
+
+def match_recipes(ingredient_ids, min_coverage: float = 0.0) -> list:
+    """Подбирает рецепты по имеющимся ингредиентам.
+
+    Возвращает список (recipe_id, coverage), где coverage — доля
+    ингредиентов рецепта, которые есть у пользователя. Список отсортирован
+    по убыванию покрытия, затем по новизне рецепта.
+    """
+    matched = Counter()
+    sizes = {}
+    for posting in IngredientIndex.objects.filter(
+        ingredient_id__in=set(ingredient_ids)
+    ):
+        recipe_ids, counts = _load_posting(posting)
+        matched.update(recipe_ids)
+        sizes.update(zip(recipe_ids, counts))
+    coverage = (
+        (recipe_id, hits / sizes[recipe_id])
+        for recipe_id, hits in matched.items()
+    )
+    return sorted(
+        (
+            (recipe_id, value)
+            for recipe_id, value in coverage
+            if value >= min_coverage
+        ),
+        key=lambda item: (-item[1], -item[0]),
+    )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recipes.cofavorites import rebuild_co_favorites
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает рецепты, которые добавляют в избранное вместе"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cart-weight",
+            type=float,
+            help="Учитывать список покупок с этим весом",
+        )
+
+    def handle(self, *args, **options):
+        recipes = rebuild_co_favorites(options["cart_weight"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Рассчитаны связи для рецептов: {recipes}")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recipes.catalogue import build_catalogue, catalogue_url
+
+
+class Command(BaseCommand):
+    help = "Выгружает ингредиенты в статический файл для клиентов"
+
+    def handle(self, *args, **options):
+        manifest = build_catalogue()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Каталог ингредиентов {manifest['version']}: "
+                f"{manifest['count']}, {catalogue_url(manifest)}"
+            )
+        )
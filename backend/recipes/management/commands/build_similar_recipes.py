@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import process_pending_similar, rebuild_similar_recipes
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает похожие рецепты"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Пересчитать только рецепты, изменённые с прошлого запуска",
+        )
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            updated = process_pending_similar()
+            message = f"Пересчитано рецептов: {updated}"
+        else:
+            recipes = rebuild_similar_recipes()
+            message = f"Рассчитаны похожие для рецептов: {recipes}"
+        self.stdout.write(self.style.SUCCESS(message))
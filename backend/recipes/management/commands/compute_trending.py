@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ranking import compute_trending
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает популярность рецептов для ordering=trending"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--half-life-days", type=float)
+        parser.add_argument("--window-days", type=int)
+
+    def handle(self, *args, **options):
+        ranked = compute_trending(
+            half_life_days=options["half_life_days"],
+            window_days=options["window_days"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Рассчитан рейтинг рецептов: {ranked}")
+        )
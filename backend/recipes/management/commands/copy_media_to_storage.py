@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from recipes.media import (IMAGE_DIRECTORY, copy_image, image_storage,
+                           walk_storage)
+
+
+class Command(BaseCommand):
+    help = (
+        "Копирует локальные изображения рецептов в текущее хранилище "
+        "под теми же именами"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=settings.MEDIA_ROOT)
+        parser.add_argument(
+            "--storage",
+            help="Класс хранилища назначения, по умолчанию хранилище "
+            "Recipe.image",
+        )
+        parser.add_argument("--workers", type=int, default=8)
+
+    def handle(self, *args, **options):
+        source = FileSystemStorage(location=options["source"])
+        if options["storage"]:
+            target = import_string(options["storage"])()
+        else:
+            target = image_storage()
+        copied = skipped = failed = 0
+
+        def copy(name):
+            try:
+                return name, copy_image(source, target, name), None
+            except Exception as error:
+                return name, False, error
+
+        with ThreadPoolExecutor(options["workers"]) as pool:
+            for name, done, error in pool.map(
+                copy, walk_storage(source, IMAGE_DIRECTORY)
+            ):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                elif done:
+                    copied += 1
+                else:
+                    skipped += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Скопировано файлов: {copied}, уже были: {skipped}, "
+                f"ошибок: {failed}"
+            )
+        )
@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from recipes.transfer import CHUNK_SIZE, export_recipes
+
+
+class Command(BaseCommand):
+    help = "Выгружает рецепты в NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="Файл или - для stdout"
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            exported = export_recipes(sys.stdout, options["chunk_size"])
+        else:
+            with open(options["path"], "w", encoding="utf-8") as stream:
+                exported = export_recipes(stream, options["chunk_size"])
+        self.stderr.write(
+            self.style.SUCCESS(f"Выгружено рецептов: {exported}")
+        )
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.media import image_storage, orphaned_images
+
+
+class Command(BaseCommand):
+    help = "Удаляет изображения рецептов, на которые нет ссылок"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--grace-hours", type=float, default=settings.MEDIA_GC_GRACE_HOURS
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать файлы, которые будут удалены",
+        )
+
+    def handle(self, *args, **options):
+        storage = image_storage()
+        dry_run = options["dry_run"]
+        removed = 0
+        size = 0
+        for orphans in orphaned_images(
+            options["batch_size"],
+            timedelta(hours=options["grace_hours"]),
+        ):
+            for name in orphans:
+                size += storage.size(name)
+                if dry_run:
+                    self.stdout.write(name)
+                else:
+                    storage.delete(name)
+            removed += len(orphans)
+        verb = "Будет удалено" if dry_run else "Удалено"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} файлов: {removed}, {size // 1024} КиБ"
+            )
+        )
@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.ingredient_index import rebuild_ingredient_index
+from recipes.models import PendingSimilarRecipe
+from recipes.transfer import CHUNK_SIZE, RecipeImporter
+
+
+class Command(BaseCommand):
+    help = "Загружает рецепты из NDJSON, выгруженного export_recipes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="Файл или - для stdin"
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        importer = RecipeImporter(options["chunk_size"])
+        started = time.perf_counter()
+        if options["path"] == "-":
+            importer.run(sys.stdin)
+        else:
+            with open(options["path"], encoding="utf-8") as stream:
+                importer.run(stream)
+        elapsed = time.perf_counter() - started
+
+        rebuild_ingredient_index()
+        PendingSimilarRecipe.objects.bulk_create(
+            (
+                PendingSimilarRecipe(recipe_id=recipe_id)
+                for recipe_id in importer.recipe_ids
+            ),
+            batch_size=options["chunk_size"],
+            ignore_conflicts=True,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Загружено рецептов: {importer.imported}, "
+                f"пропущено: {importer.skipped}, "
+                f"{importer.imported / max(elapsed, 1e-9):.0f} в секунду"
+            )
+        )
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Удаляет записи об удалениях старше SYNC_TOMBSTONE_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.SYNC_TOMBSTONE_DAYS
+        )
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=options["days"])
+        pruned, _ = Tombstone.objects.filter(deleted_at__lt=horizon).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Удалено записей об удалениях: {pruned}")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ingredient_index import rebuild_ingredient_index
+
+
+class Command(BaseCommand):
+    help = "Перестраивает инвертированный индекс ингредиентов"
+
+    def handle(self, *args, **options):
+        postings = rebuild_ingredient_index()
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано ингредиентов: {postings}")
+        )
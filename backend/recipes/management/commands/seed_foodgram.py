@@ -0,0 +1,228 @@
+import itertools
+import json
+import os
+import random
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from PIL import Image
+
+from recipes.catalogue import build_catalogue
+from recipes.ingredient_index import rebuild_ingredient_index
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            Shopping, Tag)
+from users.counters import repair_user_counters
+from users.models import Subscribe
+
+User = get_user_model()
+
+SEED_PASSWORD = "foodgram-seed"
+SEED_EMAIL = "seed{number}@example.com"
+SEED_IMAGE = "recipe_img/seed.png"
+BATCH_SIZE = 5000
+
+
+def zipf_weights(size: int, exponent: float) -> list:
+    """Кумулятивные веса степенного распределения по рангам."""
+    return list(
+        itertools.accumulate(
+            1 / rank ** exponent for rank in range(1, size + 1)
+        )
+    )
+
+
+def skewed_sample(population, cum_weights, count: int, rng) -> set:
+    count = min(count, len(population) // 2)
+    sample = set()
+    while len(sample) < count:
+        sample.update(
+            rng.choices(
+                population, cum_weights=cum_weights, k=count - len(sample)
+            )
+        )
+    return sample
+
+
+class Command(BaseCommand):
+    help = "Заполняет базу синтетическими пользователями и рецептами"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=5000)
+        parser.add_argument("--favorites", type=int, default=20)
+        parser.add_argument("--cart", type=int, default=5)
+        parser.add_argument("--subscriptions", type=int, default=10)
+        parser.add_argument("--skew", type=float, default=1.1)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        skew = options["skew"]
+        self.load_fixtures()
+        image = self.save_image()
+        with transaction.atomic():
+            first_user, users = self.create_users(options["users"])
+            recipes = self.create_recipes(
+                options["recipes"], users, image, skew, rng
+            )
+            recipe_weights = zipf_weights(len(recipes), skew)
+            self.create_relations(
+                Favorite, users, recipes, recipe_weights,
+                options["favorites"], rng,
+            )
+            self.create_relations(
+                Shopping, users, recipes, recipe_weights,
+                options["cart"], rng,
+            )
+            self.create_subscriptions(
+                users, options["subscriptions"], skew, rng
+            )
+            repair_user_counters(User.objects.filter(id__gte=min(users)))
+        rebuild_ingredient_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано пользователей: {len(users)}, "
+                f"рецептов: {len(recipes)}, "
+                f"первый номер пользователя: {first_user}"
+            )
+        )
+
+    def load_fixtures(self):
+        fixtures = ((Tag, "tags.json"), (Ingredient, "ingredients.json"))
+        for model, filename in fixtures:
+            if model.objects.exists():
+                continue
+            path = os.path.join(settings.BASE_DIR, "data", filename)
+            with open(path, encoding="utf-8") as fixture:
+                rows = json.load(fixture)
+            model.objects.bulk_create(
+                (model(pk=row["pk"], **row["fields"]) for row in rows),
+                batch_size=BATCH_SIZE,
+            )
+            if model is Ingredient:
+                build_catalogue()
+
+    def save_image(self) -> str:
+        # Хранилище адресует файлы по содержимому: повторный запуск
+        # возвращает тот же файл.
+        buffer = BytesIO()
+        Image.new("RGB", (64, 64), (230, 120, 40)).save(buffer, "PNG")
+        return default_storage.save(SEED_IMAGE, ContentFile(buffer.getvalue()))
+
+    def create_users(self, count: int) -> tuple:
+        """Первый номер seed-пользователя и id созданных пользователей."""
+        password = make_password(SEED_PASSWORD)
+        first = User.objects.order_by("-id").values_list("id", flat=True)
+        offset = (first.first() or 0) + 1
+        User.objects.bulk_create(
+            (
+                User(
+                    email=SEED_EMAIL.format(number=number),
+                    username=f"seed{number}",
+                    first_name=f"Имя{number}",
+                    last_name=f"Фамилия{number}",
+                    password=password,
+                )
+                for number in range(offset, offset + count)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return offset, list(
+            User.objects.filter(
+                username__in=[
+                    f"seed{number}" for number in range(offset, offset + count)
+                ]
+            ).values_list("id", flat=True)
+        )
+
+    def create_recipes(self, count, users, image, skew, rng) -> list:
+        tags = list(Tag.objects.values_list("id", flat=True))
+        ingredients = list(Ingredient.objects.values_list("id", flat=True))
+        rng.shuffle(ingredients)
+        ingredient_weights = zipf_weights(len(ingredients), skew)
+        author_weights = zipf_weights(len(users), skew)
+        authors = rng.choices(users, cum_weights=author_weights, k=count)
+
+        last_id = Recipe.objects.order_by("-id").values_list("id", flat=True)
+        start = (last_id.first() or 0) + 1
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=author,
+                    name=f"Рецепт {number}",
+                    text=f"Описание рецепта {number}. " * rng.randint(1, 20),
+                    cooking_time=rng.randint(5, 180),
+                    image=image,
+                )
+                for number, author in enumerate(authors, start=start)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        recipes = list(
+            Recipe.objects.filter(id__gte=start).values_list("id", flat=True)
+        )
+
+        recipe_tag = Recipe.tags.through
+        recipe_tag.objects.bulk_create(
+            (
+                recipe_tag(recipe_id=recipe, tag_id=tag)
+                for recipe in recipes
+                for tag in rng.sample(tags, rng.randint(1, min(3, len(tags))))
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        RecipeIngredient.objects.bulk_create(
+            (
+                RecipeIngredient(
+                    recipe_id=recipe,
+                    ingredient_id=ingredient,
+                    amount=rng.randint(1, 500),
+                )
+                for recipe in recipes
+                for ingredient in skewed_sample(
+                    ingredients, ingredient_weights, rng.randint(3, 12), rng
+                )
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return recipes
+
+    def create_relations(self, model, users, recipes, weights, average, rng):
+        model.objects.bulk_create(
+            (
+                model(user_id=user, recipe_id=recipe)
+                for user in users
+                for recipe in skewed_sample(
+                    recipes,
+                    weights,
+                    int(rng.expovariate(1 / average)) if average else 0,
+                    rng,
+                )
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+    def create_subscriptions(self, users, average, skew, rng):
+        weights = zipf_weights(len(users), skew)
+        Subscribe.objects.bulk_create(
+            (
+                Subscribe(user_id=user, author_id=author)
+                for user in users
+                for author in skewed_sample(
+                    users,
+                    weights,
+                    int(rng.expovariate(1 / average)) if average else 0,
+                    rng,
+                )
+                if author != user
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,146 @@
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.models import Recipe
+from recipes.storage import IMAGE_DIRECTORY
+
+_pending = threading.local()
+
+
+def image_storage():
+    return Recipe._meta.get_field("image").storage
+
+
+def referenced_images(names) -> set:
+    """Имена из names, на которые ссылается хотя бы один рецепт."""
+    return set(
+        Recipe.objects.filter(image__in=list(names)).values_list(
+            "image", flat=True
+        )
+    )
+
+
+def _is_settled(storage, name: str, grace: timedelta) -> bool:
+    try:
+        modified = storage.get_modified_time(name)
+    except FileNotFoundError:
+        return False
+    return modified < timezone.now() - grace
+
+
+def release_images(names, grace=None) -> list:
+    """Удаляет файлы из names, на которые больше не ссылаются рецепты.
+
+    Файлы моложе grace остаются: их могла только что получить повторная
+    загрузка того же содержимого, ещё не закоммиченная. Такие файлы
+    удалит gc_media.
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.MEDIA_GC_GRACE_HOURS)
+    names = set(filter(None, names))
+    storage = image_storage()
+    released = []
+    for name in sorted(names - referenced_images(names)):
+        if _is_settled(storage, name, grace):
+            storage.delete(name)
+            released.append(name)
+    return released
+
+
+def schedule_release(name: str) -> None:
+    """Проверяет ссылки на файл после коммита транзакции."""
+    if not name:
+        return
+    pending = getattr(_pending, "names", None)
+    if pending is None:
+        pending = _pending.names = set()
+    pending.add(name)
+    transaction.on_commit(flush_release)
+
+
+def flush_release() -> None:
+    pending = getattr(_pending, "names", None)
+    if not pending:
+        return
+    _pending.names = None
+    release_images(pending)
+
+
+def walk_storage(storage, directory: str):
+    """Имена всех файлов каталога хранилища, включая вложенные."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in sorted(files):
+        yield os.path.join(directory, name)
+    for name in sorted(directories):
+        yield from walk_storage(storage, os.path.join(directory, name))
+
+
+def orphaned_images(batch_size: int, grace: timedelta):
+    """Порции файлов изображений без ссылок из рецептов старше grace.
+
+    Сюда же попадают брошенные прямые загрузки из IMAGE_UPLOAD_PREFIX.
+    """
+    storage = image_storage()
+    batch = []
+    for directory in (IMAGE_DIRECTORY, settings.IMAGE_UPLOAD_PREFIX):
+        for name in walk_storage(storage, directory):
+            batch.append(name)
+            if len(batch) >= batch_size:
+                yield _orphans(storage, batch, grace)
+                batch = []
+    if batch:
+        yield _orphans(storage, batch, grace)
+
+
+def _orphans(storage, names, grace) -> list:
+    referenced = referenced_images(names)
+    return [
+        name
+        for name in names
+        if name not in referenced and _is_settled(storage, name, grace)
+    ]
+
+
+def upload_key(user_id: int, extension: str) -> str:
+    return (
+        f"{settings.IMAGE_UPLOAD_PREFIX}/{user_id}/{uuid.uuid4().hex}"
+        f"{extension}"
+    )
+
+
+def is_own_upload(key: str, user_id: int) -> bool:
+    prefix = f"{settings.IMAGE_UPLOAD_PREFIX}/{user_id}/"
+    return (
+        key.startswith(prefix)
+        and "/" not in key[len(prefix):]
+        and ".." not in key
+    )
+
+
+def read_upload(key: str) -> SimpleUploadedFile:
+    """Файл прямой загрузки в памяти, для проверки и сохранения по хэшу."""
+    storage = image_storage()
+    with storage.open(key) as file:
+        return SimpleUploadedFile(os.path.basename(key), file.read())
+
+
+def discard_upload(key: str) -> None:
+    image_storage().delete(key)
+
+
+def copy_image(source, target, name: str) -> bool:
+    """Копирует файл под тем же именем, если в target его ещё нет."""
+    if target.exists(name):
+        return False
+    with source.open(name) as file:
+        target.save_exact(name, file)
+    return True
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0003_recipe_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngredientIndex",
+            fields=[
+                (
+                    "ingredient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recipe_index",
+                        serialize=False,
+                        to="recipes.ingredient",
+                        verbose_name="Ингредиент",
+                    ),
+                ),
+                (
+                    "recipe_ids",
+                    models.BinaryField(default=bytes, verbose_name="Id рецептов"),
+                ),
+                (
+                    "ingredient_counts",
+                    models.BinaryField(
+                        default=bytes, verbose_name="Количество ингредиентов в рецептах"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Индекс ингредиента",
+                "verbose_name_plural": "Индекс ингредиентов",
+            },
+        ),
+    ]
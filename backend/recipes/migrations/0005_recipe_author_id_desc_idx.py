@@ -0,0 +1,18 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0004_ingredientindex"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["author", "-id"], name="recipe_author_id_desc_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0006_reciperanking_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingSimilarRecipe",
+            fields=[
+                (
+                    "recipe_id",
+                    models.PositiveIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Id рецепта"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рецепт в очереди пересчёта похожих",
+                "verbose_name_plural": "Очередь пересчёта похожих рецептов",
+            },
+        ),
+        migrations.CreateModel(
+            name="SimilarRecipe",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Сходство")),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_recipes",
+                        to="recipes.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_to",
+                        to="recipes.recipe",
+                        verbose_name="Похожий рецепт",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Похожий рецепт",
+                "verbose_name_plural": "Похожие рецепты",
+                "ordering": ("-score",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="similarrecipe",
+            constraint=models.UniqueConstraint(
+                fields=("recipe", "similar"), name="unique_similar_recipe"
+            ),
+        ),
+    ]
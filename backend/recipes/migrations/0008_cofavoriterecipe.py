@@ -0,0 +1,57 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0007_similarrecipe"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CoFavoriteRecipe",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Сила связи")),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="co_favorites",
+                        to="recipes.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="co_favorite_of",
+                        to="recipes.recipe",
+                        verbose_name="Рецепт, добавляемый вместе",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Совместное избранное",
+                "verbose_name_plural": "Совместное избранное",
+                "ordering": ("-score",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cofavoriterecipe",
+            constraint=models.UniqueConstraint(
+                fields=("recipe", "similar"), name="unique_co_favorite_recipe"
+            ),
+        ),
+    ]
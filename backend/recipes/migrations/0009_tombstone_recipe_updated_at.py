@@ -0,0 +1,93 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("recipes", "0008_cofavoriterecipe"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("recipe", "Рецепт"),
+                            ("favorite", "Избранное"),
+                            ("cart", "Список покупок"),
+                            ("subscription", "Подписка"),
+                        ],
+                        max_length=16,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField(verbose_name="Id объекта")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата удаления"),
+                ),
+            ],
+            options={
+                "verbose_name": "Удалённый объект",
+                "verbose_name_plural": "Удалённые объекты",
+            },
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["user", "created_at"], name="favorite_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["updated_at", "id"], name="recipe_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shopping",
+            index=models.Index(
+                fields=["user", "created_at"], name="cart_user_created_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="tombstones",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["user", "deleted_at", "id"], name="tombstone_user_deleted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0009_tombstone_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="recipe",
+            name="image",
+            field=models.ImageField(
+                db_index=True, upload_to="recipe_img/", verbose_name="Изображение"
+            ),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("recipes", "0010_recipe_image_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShoppingListJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("done", "Готово"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(max_length=64, verbose_name="Отпечаток корзины"),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="shopping_lists/", verbose_name="Файл"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Ошибка")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Начало"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Завершение"
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        blank=True, db_index=True, null=True, verbose_name="Хранить до"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shopping_list_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Выгрузка списка покупок",
+                "verbose_name_plural": "Выгрузки списков покупок",
+                "ordering": ("-id",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="shoppinglistjob",
+            index=models.Index(
+                fields=["status", "id"], name="shopping_list_job_queue_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="shoppinglistjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ("pending", "running"))),
+                fields=("user",),
+                name="unique_active_shopping_list_job",
+            ),
+        ),
+    ]
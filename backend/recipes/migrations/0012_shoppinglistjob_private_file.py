@@ -0,0 +1,24 @@
+# Generated by Django 3.2.11 on 2026-10-19 10:17
+
+from django.db import migrations, models
+
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0011_shoppinglistjob"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="shoppinglistjob",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                storage=recipes.storage.private_storage,
+                upload_to="shopping_lists/",
+                verbose_name="Файл",
+            ),
+        ),
+    ]
@@ -1,11 +1,14 @@
 import re
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core import validators
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from recipes.storage import private_storage
+
 User = get_user_model()
 
 
@@ -64,7 +67,9 @@ class Recipe(models.Model):
         verbose_name="Автор",
     )
     name = models.CharField("Название", max_length=200)
-    image = models.ImageField("Изображение", upload_to="recipe_img/")
+    image = models.ImageField(
+        "Изображение", upload_to="recipe_img/", db_index=True
+    )
     text = models.TextField("Описание")
     ingredients = models.ManyToManyField(
         Ingredient, verbose_name="Ингредиенты", through="RecipeIngredient"
@@ -78,11 +83,27 @@ class Recipe(models.Model):
             ),
         ),
     )
+    search_vector = SearchVectorField(
+        "Поисковый вектор",
+        null=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     class Meta:
         ordering = ("-id",)
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(
+                fields=["author", "-id"],
+                name="recipe_author_id_desc_idx",
+            ),
+            models.Index(
+                fields=["updated_at", "id"],
+                name="recipe_updated_at_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -124,6 +145,29 @@ class RecipeIngredient(models.Model):
         ]
 
 
+class IngredientIndex(models.Model):
+    """Инвертированный индекс: ингредиент и содержащие его рецепты."""
+
+    ingredient = models.OneToOneField(
+        Ingredient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="recipe_index",
+        verbose_name="Ингредиент",
+    )
+    recipe_ids = models.BinaryField("Id рецептов", default=bytes)
+    ingredient_counts = models.BinaryField(
+        "Количество ингредиентов в рецептах", default=bytes
+    )
+
+    class Meta:
+        verbose_name = "Индекс ингредиента"
+        verbose_name_plural = "Индекс ингредиентов"
+
+    def __str__(self):
+        return f"Индекс ингредиента {self.ingredient_id}"
+
+
 class Favorite(models.Model):
     """Модель избранного."""
 
@@ -139,6 +183,9 @@ class Favorite(models.Model):
         related_name="favorites",
         verbose_name="Рецепт из списка избранного",
     )
+    created_at = models.DateTimeField(
+        "Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Избранное"
@@ -148,6 +195,12 @@ class Favorite(models.Model):
                 fields=["user", "recipe"], name="unique_favorite_recipes"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"],
+                name="favorite_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Рецепт {self.recipe_id} в избранном у {self.user_id}"
@@ -168,6 +221,9 @@ class Shopping(models.Model):
         related_name="cart",
         verbose_name="Список покупок",
     )
+    created_at = models.DateTimeField(
+        "Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Список покупок"
@@ -177,6 +233,215 @@ class Shopping(models.Model):
                 fields=["user", "recipe"], name="unique_cart_user_recipes"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"],
+                name="cart_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Рецепт {self.recipe_id} в списке покупок у {self.user_id}"
+
+
+class RecipeRanking(models.Model):
+    """Предрасчитанная популярность рецепта."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="ranking",
+        verbose_name="Рецепт",
+    )
+    score = models.FloatField("Рейтинг", db_index=True)
+    computed_at = models.DateTimeField("Дата расчёта")
+
+    class Meta:
+        verbose_name = "Рейтинг рецепта"
+        verbose_name_plural = "Рейтинги рецептов"
+
+    def __str__(self):
+        return f"Рейтинг рецепта {self.recipe_id}: {self.score:.3f}"
+
+
+class SimilarRecipe(models.Model):
+    """Предрасчитанный похожий рецепт."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="similar_recipes",
+        verbose_name="Рецепт",
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="similar_to",
+        verbose_name="Похожий рецепт",
+    )
+    score = models.FloatField("Сходство")
+
+    class Meta:
+        ordering = ("-score",)
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "similar"], name="unique_similar_recipe"
+            )
+        ]
+
+    def __str__(self):
+        return f"Рецепт {self.similar_id} похож на {self.recipe_id}"
+
+
+class PendingSimilarRecipe(models.Model):
+    """Рецепт, похожие на который нужно пересчитать."""
+
+    recipe_id = models.PositiveIntegerField("Id рецепта", primary_key=True)
+
+    class Meta:
+        verbose_name = "Рецепт в очереди пересчёта похожих"
+        verbose_name_plural = "Очередь пересчёта похожих рецептов"
+
+    def __str__(self):
+        return f"Рецепт {self.recipe_id}"
+
+
+class CoFavoriteRecipe(models.Model):
+    """Рецепт, который часто добавляют в избранное вместе с другим."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="co_favorites",
+        verbose_name="Рецепт",
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="co_favorite_of",
+        verbose_name="Рецепт, добавляемый вместе",
+    )
+    score = models.FloatField("Сила связи")
+
+    class Meta:
+        ordering = ("-score",)
+        verbose_name = "Совместное избранное"
+        verbose_name_plural = "Совместное избранное"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "similar"], name="unique_co_favorite_recipe"
+            )
+        ]
+
+    def __str__(self):
+        return f"Рецепт {self.similar_id} добавляют вместе с {self.recipe_id}"
+
+
+class Tombstone(models.Model):
+    """Запись об удалении для синхронизации клиентов.
+
+    Удаления рецептов общие, удаления из избранного, списка покупок и
+    подписок относятся к пользователю.
+    """
+
+    RECIPE = "recipe"
+    FAVORITE = "favorite"
+    CART = "cart"
+    SUBSCRIPTION = "subscription"
+    KINDS = (
+        (RECIPE, "Рецепт"),
+        (FAVORITE, "Избранное"),
+        (CART, "Список покупок"),
+        (SUBSCRIPTION, "Подписка"),
+    )
+
+    kind = models.CharField("Тип", max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField("Id объекта")
+    # Без ограничения внешнего ключа: подписки удаляемого пользователя
+    # оставляют записи уже после его удаления, их чистит prune_tombstones.
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="tombstones",
+        verbose_name="Пользователь",
+    )
+    deleted_at = models.DateTimeField("Дата удаления", auto_now=True)
+
+    class Meta:
+        verbose_name = "Удалённый объект"
+        verbose_name_plural = "Удалённые объекты"
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_at", "id"],
+                name="tombstone_user_deleted_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Удалён {self.kind} {self.object_id}"
+
+
+class ShoppingListJob(models.Model):
+    """Задание на выгрузку списка покупок в PDF для фонового воркера."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (FAILED, "Ошибка"),
+    )
+    ACTIVE = (PENDING, RUNNING)
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list_jobs",
+        verbose_name="Пользователь",
+    )
+    status = models.CharField(
+        "Статус", max_length=16, choices=STATUSES, default=PENDING
+    )
+    fingerprint = models.CharField("Отпечаток корзины", max_length=64)
+    file = models.FileField(
+        "Файл",
+        upload_to="shopping_lists/",
+        storage=private_storage,
+        blank=True,
+    )
+    error = models.TextField("Ошибка", blank=True)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    started_at = models.DateTimeField("Начало", null=True, blank=True)
+    finished_at = models.DateTimeField("Завершение", null=True, blank=True)
+    expires_at = models.DateTimeField(
+        "Хранить до", null=True, blank=True, db_index=True
+    )
+
+    class Meta:
+        ordering = ("-id",)
+        verbose_name = "Выгрузка списка покупок"
+        verbose_name_plural = "Выгрузки списков покупок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(status__in=("pending", "running")),
+                name="unique_active_shopping_list_job",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["status", "id"], name="shopping_list_job_queue_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Список покупок {self.user_id}: {self.status}"
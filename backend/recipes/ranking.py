@@ -0,0 +1,58 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from recipes.models import Favorite, RecipeRanking, Shopping
+
+BATCH_SIZE = 1000
+
+
+def daily_events(model, since):
+    """Количество событий по рецептам и дням, агрегированное в SQL."""
+    return (
+        model.objects.filter(created_at__gte=since)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("recipe_id", "day")
+        .annotate(events=Count("pk"))
+        .order_by()
+    )
+
+
+def compute_trending(half_life_days=None, window_days=None, now=None):
+    """Пересчитывает таблицу RecipeRanking.
+
+    Каждое добавление в избранное или в список покупок даёт вклад
+    weight * 0.5 ** (age / half_life), где age — возраст события в днях.
+    """
+    half_life_days = half_life_days or settings.TRENDING_HALF_LIFE_DAYS
+    window_days = window_days or settings.TRENDING_WINDOW_DAYS
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    since = now - timedelta(days=window_days)
+
+    scores = defaultdict(float)
+    for model, weight in (
+        (Favorite, settings.TRENDING_FAVORITE_WEIGHT),
+        (Shopping, settings.TRENDING_CART_WEIGHT),
+    ):
+        for recipe_id, day, events in daily_events(model, since).iterator():
+            age = (today - day).days
+            scores[recipe_id] += weight * events * 0.5 ** (
+                age / half_life_days
+            )
+
+    with transaction.atomic():
+        RecipeRanking.objects.all().delete()
+        RecipeRanking.objects.bulk_create(
+            (
+                RecipeRanking(recipe_id=pk, score=score, computed_at=now)
+                for pk, score in scores.items()
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    return len(scores)
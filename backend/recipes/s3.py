@@ -0,0 +1,70 @@
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from recipes.storage import IMAGE_DIRECTORY, ContentAddressedMixin
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class S3ContentAddressedStorage(ContentAddressedMixin, S3Boto3Storage):
+    """Изображения в S3-совместимом бакете (AWS S3, MinIO).
+
+    Файлы отдаются клиентам напрямую из бакета или CDN перед ним
+    (AWS_S3_CUSTOM_DOMAIN), без Django и общего тома с медиафайлами.
+    """
+
+    def _key(self, name: str) -> str:
+        return self._normalize_name(clean_name(name))
+
+    def get_object_parameters(self, name):
+        # Навсегда кэшируются только изображения с хэшем в имени, но не
+        # временные загрузки клиентов.
+        parameters = super().get_object_parameters(name)
+        if name.startswith(f"{self._key(IMAGE_DIRECTORY)}/"):
+            parameters.setdefault("CacheControl", IMMUTABLE_CACHE_CONTROL)
+        return parameters
+
+    def touch(self, name: str) -> None:
+        # S3 не меняет LastModified без записи: объект копируется в себя.
+        stored = self.bucket.Object(self._key(name))
+        parameters = {
+            "Metadata": stored.metadata,
+            "ContentType": stored.content_type,
+        }
+        if stored.cache_control:
+            parameters["CacheControl"] = stored.cache_control
+        stored.copy_from(
+            CopySource={"Bucket": self.bucket_name, "Key": stored.key},
+            MetadataDirective="REPLACE",
+            **parameters,
+        )
+
+    def presigned_upload(
+        self, name: str, content_type: str, max_size: int, expires: int
+    ) -> dict:
+        """Подписанная форма POST для загрузки файла клиентом в бакет."""
+        return self.connection.meta.client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=self._key(name),
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires,
+        )
+
+
+class PrivateS3Storage(S3Boto3Storage):
+    """Закрытые файлы пользователей в том же бакете под private/.
+
+    Объекты пишутся с ACL private и без заголовков кэширования, ссылки на
+    них подписываются.
+    """
+
+    def __init__(self, **options):
+        options.setdefault("location", "private")
+        options.setdefault("default_acl", "private")
+        options.setdefault("querystring_auth", True)
+        options.setdefault("file_overwrite", False)
+        super().__init__(**options)
@@ -0,0 +1,139 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from recipes.catalogue import schedule_catalogue_build
+from recipes.feed import invalidate_feed, push_recipe_to_feeds
+from recipes.ingredient_index import schedule_reindex
+from recipes.media import schedule_release
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            Shopping, SimilarRecipe, Tombstone)
+from recipes.similarity import schedule_similar_update
+from users.counters import change_counter
+from users.models import Subscribe
+
+USER_RECIPE_KINDS = {Favorite: Tombstone.FAVORITE, Shopping: Tombstone.CART}
+
+
+def revive(kind: str, user_id: int, object_id: int) -> None:
+    """Убирает запись об удалении связи, созданной заново."""
+    Tombstone.objects.filter(
+        kind=kind, user_id=user_id, object_id=object_id
+    ).delete()
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_previous_ingredient(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_ingredient_id = (
+            RecipeIngredient.objects.filter(pk=instance.pk)
+            .values_list("ingredient_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_ingredient_id", None)
+    schedule_reindex(instance.recipe_id, [previous] if previous else ())
+    schedule_similar_update(instance.recipe_id)
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(sender, instance, **kwargs):
+    schedule_reindex(instance.recipe_id, [instance.ingredient_id])
+    schedule_similar_update(instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    schedule_catalogue_build()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, **kwargs):
+    if action.startswith("post_") and not reverse:
+        schedule_similar_update(instance.pk)
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_previous_image(sender, instance, **kwargs):
+    if instance.pk is not None and not instance.image._committed:
+        instance._previous_image = (
+            Recipe.objects.filter(pk=instance.pk)
+            .values_list("image", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    previous = instance.__dict__.pop("_previous_image", None)
+    if previous and previous != instance.image.name:
+        schedule_release(previous)
+    if created:
+        change_counter(instance.author_id, "recipes_count", 1)
+        transaction.on_commit(
+            lambda: push_recipe_to_feeds(instance.id, instance.author_id)
+        )
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    """Ставит в очередь рецепты, в чьих списках похожих был удаляемый.
+
+    Их строки SimilarRecipe удаляются каскадом, и после коммита найти
+    такие рецепты уже нельзя.
+    """
+    referrers = SimilarRecipe.objects.filter(similar=instance).values_list(
+        "recipe_id", flat=True
+    )
+    for recipe_id in referrers:
+        schedule_similar_update(recipe_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(instance.author_id, "recipes_count", -1)
+    schedule_release(instance.image.name)
+    Tombstone.objects.create(kind=Tombstone.RECIPE, object_id=instance.id)
+
+
+@receiver(post_save, sender=Subscribe)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(instance.author_id, "followers_count", 1)
+        change_counter(instance.user_id, "following_count", 1)
+        revive(Tombstone.SUBSCRIPTION, instance.user_id, instance.author_id)
+    invalidate_feed(instance.user_id)
+
+
+@receiver(post_delete, sender=Subscribe)
+def subscription_deleted(sender, instance, **kwargs):
+    change_counter(instance.author_id, "followers_count", -1)
+    change_counter(instance.user_id, "following_count", -1)
+    Tombstone.objects.create(
+        kind=Tombstone.SUBSCRIPTION,
+        object_id=instance.author_id,
+        user_id=instance.user_id,
+    )
+    invalidate_feed(instance.user_id)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Shopping)
+def user_recipe_added(sender, instance, created, **kwargs):
+    if created:
+        revive(USER_RECIPE_KINDS[sender], instance.user_id, instance.recipe_id)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Shopping)
+def user_recipe_removed(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        kind=USER_RECIPE_KINDS[sender],
+        object_id=instance.recipe_id,
+        user_id=instance.user_id,
+    )
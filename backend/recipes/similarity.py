@@ -0,0 +1,244 @@
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from recipes.models import (PendingSimilarRecipe, Recipe, RecipeIngredient,
+                            SimilarRecipe)
+
+BATCH_SIZE = 1000
+ROW_BLOCK = 256
+SAMPLE_SIZE = 4096
+
+_pending = threading.local()
+
+
+def id_pairs(queryset) -> np.ndarray:
+    """Пары id из values_list в виде массива n × 2."""
+    return np.fromiter(
+        (value for pair in queryset.order_by().iterator() for value in pair),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+
+def build_feature_matrix():
+    """Строит матрицу рецепт × (ингредиенты + теги).
+
+    Возвращает отсортированный массив id рецептов и CSR-матрицу, строки
+    которой нормированы по L2: произведение строк равно косинусному
+    сходству наборов ингредиентов и тегов.
+    """
+    ingredients = id_pairs(
+        RecipeIngredient.objects.values_list("recipe_id", "ingredient_id")
+    )
+    tags = id_pairs(
+        Recipe.tags.through.objects.values_list("recipe_id", "tag_id")
+    )
+    recipe_ids = np.unique(np.concatenate((ingredients[:, 0], tags[:, 0])))
+    ingredient_ids, ingredient_columns = np.unique(
+        ingredients[:, 1], return_inverse=True
+    )
+    _, tag_columns = np.unique(tags[:, 1], return_inverse=True)
+
+    rows = np.concatenate(
+        (
+            np.searchsorted(recipe_ids, ingredients[:, 0]),
+            np.searchsorted(recipe_ids, tags[:, 0]),
+        )
+    )
+    columns = np.concatenate(
+        (
+            ingredient_columns.ravel(),
+            tag_columns.ravel() + len(ingredient_ids),
+        )
+    )
+    data = np.concatenate(
+        (
+            np.ones(len(ingredients), dtype=np.float32),
+            np.full(
+                len(tags), settings.SIMILAR_RECIPES_TAG_WEIGHT, np.float32
+            ),
+        )
+    )
+    matrix = sparse.csr_matrix(
+        (data, (rows, columns)),
+        shape=(len(recipe_ids), columns.max(initial=-1) + 1),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    norms[norms == 0] = 1
+    return recipe_ids, sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def _rows_of(recipe_ids, ids) -> np.ndarray:
+    """Номера строк матрицы для тех ids, что в ней есть."""
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = np.searchsorted(recipe_ids, ids)
+    found = rows < len(recipe_ids)
+    found[found] = recipe_ids[rows[found]] == ids[found]
+    return rows[found]
+
+
+def select_top(owners, neighbours, values, count: int):
+    """Оставляет для каждой строки count соседей с наибольшим сходством.
+
+    Результат упорядочен по строке, затем по убыванию сходства; при
+    равенстве выше сосед с меньшим номером.
+    """
+    order = np.lexsort((neighbours, -values, owners))
+    owners = owners[order]
+    _, starts, sizes = np.unique(owners, return_index=True, return_counts=True)
+    neighbours, values = neighbours[order], values[order]
+    keep = np.arange(len(owners)) - np.repeat(starts, sizes) < count
+    return owners[keep], neighbours[keep], values[keep]
+
+
+def _block_scores(matrix, rows) -> np.ndarray:
+    """Сходство всех рецептов со строками rows, без сходства с собой.
+
+    Возвращает плотный массив рецепты × rows.
+    """
+    scores = matrix.dot(matrix[rows].toarray().T)
+    scores[rows, np.arange(len(rows))] = 0
+    return scores
+
+
+def top_neighbours(matrix, rows, count: int):
+    """Для каждого блока строк выдаёт (строки, соседи, сходство).
+
+    Сходство считается блоками по ROW_BLOCK строк умножением разреженной
+    матрицы на плотный блок. Порог для отбора кандидатов берётся как
+    count-е по величине сходство среди первых SAMPLE_SIZE рецептов: это
+    нижняя граница для count-го соседа, так что полностью сортируются
+    только кандидаты выше порога. Массивы упорядочены по строке, затем по
+    убыванию сходства.
+    """
+    rows = np.asarray(rows)
+    count = min(count, matrix.shape[0] - 1)
+    if count <= 0 or not len(rows):
+        return
+    sample_size = max(SAMPLE_SIZE, count)
+    for start in range(0, len(rows), ROW_BLOCK):
+        block = rows[start:start + ROW_BLOCK]
+        scores = _block_scores(matrix, block)
+        sample = np.ascontiguousarray(scores[:sample_size].T)
+        floor = np.partition(sample, -count, axis=1)[:, -count]
+        neighbours, owners = np.nonzero(
+            scores >= np.maximum(floor, np.finfo(scores.dtype).tiny)
+        )
+        owners, neighbours, values = select_top(
+            owners, neighbours, scores[neighbours, owners], count
+        )
+        yield block[owners], neighbours, values
+
+
+def _similar_rows(recipe_ids, matrix, rows):
+    for owners, neighbours, scores in top_neighbours(
+        matrix, rows, settings.SIMILAR_RECIPES_COUNT
+    ):
+        for recipe_id, similar_id, score in zip(
+            recipe_ids[owners].tolist(),
+            recipe_ids[neighbours].tolist(),
+            scores.tolist(),
+        ):
+            yield SimilarRecipe(
+                recipe_id=recipe_id, similar_id=similar_id, score=score
+            )
+
+
+def rebuild_similar_recipes() -> int:
+    """Полностью пересчитывает таблицу SimilarRecipe."""
+    recipe_ids, matrix = build_feature_matrix()
+    similar = list(
+        _similar_rows(recipe_ids, matrix, np.arange(len(recipe_ids)))
+    )
+    with transaction.atomic():
+        SimilarRecipe.objects.all().delete()
+        PendingSimilarRecipe.objects.all().delete()
+        SimilarRecipe.objects.bulk_create(similar, batch_size=BATCH_SIZE)
+    return len(recipe_ids)
+
+
+def _affected_rows(recipe_ids, matrix, changed_rows, changed_ids):
+    """Строки, у которых мог измениться список похожих.
+
+    Это сами изменённые рецепты, рецепты, в чьих списках они уже есть, и
+    рецепты, для которых изменённый рецепт теперь сильнее самого слабого
+    соседа.
+    """
+    full = dict(
+        SimilarRecipe.objects.values("recipe_id")
+        .annotate(neighbours=Count("pk"), floor=Min("score"))
+        .filter(neighbours__gte=settings.SIMILAR_RECIPES_COUNT)
+        .values_list("recipe_id", "floor")
+        .order_by()
+    )
+    full_ids = np.fromiter(full.keys(), np.int64, len(full))
+    full_floors = np.fromiter(full.values(), np.float32, len(full))
+    present = np.isin(full_ids, recipe_ids)
+    floors = np.zeros(len(recipe_ids), dtype=np.float32)
+    floors[np.searchsorted(recipe_ids, full_ids[present])] = full_floors[
+        present
+    ]
+
+    affected = np.zeros(len(recipe_ids), dtype=bool)
+    affected[changed_rows] = True
+    for start in range(0, len(changed_rows), ROW_BLOCK):
+        scores = _block_scores(matrix, changed_rows[start:start + ROW_BLOCK])
+        affected |= (scores > floors[:, None]).any(axis=1)
+    listing = SimilarRecipe.objects.filter(
+        similar_id__in=changed_ids
+    ).values_list("recipe_id", flat=True)
+    affected[_rows_of(recipe_ids, list(listing))] = True
+    return np.flatnonzero(affected)
+
+
+def update_similar_recipes(changed_ids) -> int:
+    """Пересчитывает похожие только для рецептов, затронутых изменениями.
+
+    Возвращает количество пересчитанных рецептов.
+    """
+    changed_ids = sorted(set(changed_ids))
+    recipe_ids, matrix = build_feature_matrix()
+    changed_rows = _rows_of(recipe_ids, changed_ids)
+    rows = _affected_rows(recipe_ids, matrix, changed_rows, changed_ids)
+    similar = list(_similar_rows(recipe_ids, matrix, rows))
+    stale_ids = set(changed_ids).union(recipe_ids[rows].tolist())
+    with transaction.atomic():
+        SimilarRecipe.objects.filter(recipe_id__in=stale_ids).delete()
+        SimilarRecipe.objects.bulk_create(similar, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def process_pending_similar() -> int:
+    """Обрабатывает очередь рецептов, изменённых после прошлого запуска."""
+    changed_ids = list(
+        PendingSimilarRecipe.objects.values_list("recipe_id", flat=True)
+    )
+    if not changed_ids:
+        return 0
+    updated = update_similar_recipes(changed_ids)
+    PendingSimilarRecipe.objects.filter(recipe_id__in=changed_ids).delete()
+    return updated
+
+
+def schedule_similar_update(recipe_id: int) -> None:
+    """Ставит рецепт в очередь пересчёта после коммита транзакции."""
+    pending = getattr(_pending, "recipes", None)
+    if pending is None:
+        pending = _pending.recipes = set()
+    pending.add(recipe_id)
+    transaction.on_commit(flush_similar_queue)
+
+
+def flush_similar_queue() -> None:
+    pending = getattr(_pending, "recipes", None)
+    if not pending:
+        return
+    _pending.recipes = None
+    PendingSimilarRecipe.objects.bulk_create(
+        (PendingSimilarRecipe(recipe_id=recipe_id) for recipe_id in pending),
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, get_storage_class
+
+HASH_CHUNK_SIZE = 64 * 1024
+IMAGE_DIRECTORY = "recipe_img"
+
+
+def content_hash(content) -> str:
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name: str, digest: str) -> str:
+    """recipe_img/photo.png -> recipe_img/ab/ab12...ef.png."""
+    directory = os.path.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    return os.path.join(directory, digest[:2], digest + extension)
+
+
+class ContentAddressedMixin:
+    """Хранит файлы под именем из хэша содержимого.
+
+    Одинаковые загрузки сохраняются один раз, а файл по имени никогда не
+    меняется, поэтому его можно кэшировать навсегда. Повторная загрузка
+    существующего файла обновляет его время изменения: gc_media не удаляет
+    файлы моложе MEDIA_GC_GRACE_HOURS, даже если ссылка на них ещё не
+    закоммичена. Обновление времени - метод touch(name) конкретного
+    хранилища.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = hashed_name(name, content_hash(content))
+        if self.exists(name):
+            self.touch(name)
+            return name
+        return super().save(name, content, max_length)
+
+    def save_exact(self, name: str, content) -> str:
+        """Сохраняет файл под переданным именем, для переноса хранилищ."""
+        return self._save(name, content)
+
+
+class ContentAddressedStorage(ContentAddressedMixin, FileSystemStorage):
+    def touch(self, name: str) -> None:
+        os.utime(self.path(name))
+
+
+class PrivateStorage(FileSystemStorage):
+    """Файлы, которые отдаёт только Django: каталог не раздаётся nginx."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("location", settings.PRIVATE_MEDIA_ROOT)
+        super().__init__(**kwargs)
+
+
+def private_storage():
+    """Хранилище файлов пользователей без публичных ссылок."""
+    return get_storage_class(settings.PRIVATE_FILE_STORAGE)()
@@ -0,0 +1,235 @@
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from recipes.catalogue import schedule_catalogue_build
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.counters import repair_user_counters
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+
+RecipeTag = Recipe.tags.through
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _insert_rows(model, field_names, rows) -> None:
+    """Вставляет строки значениями, не создавая экземпляров модели."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+    )
+    placeholder = "({})".format(", ".join(["%s"] * len(fields)))
+    batch_size = connection.ops.bulk_batch_size(fields, rows)
+    with connection.cursor() as cursor:
+        for chunk in _chunks(rows, batch_size):
+            cursor.execute(
+                sql + ", ".join([placeholder] * len(chunk)),
+                [value for row in chunk for value in row],
+            )
+
+
+def _recipe_chunks(size: int):
+    """Рецепты порциями по возрастанию id, без OFFSET."""
+    last_id = 0
+    while True:
+        chunk = list(
+            Recipe.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values(
+                "id", "name", "text", "cooking_time", "image", "author__email"
+            )[:size]
+        )
+        if not chunk:
+            return
+        last_id = chunk[-1]["id"]
+        yield chunk
+
+
+def export_recipes(stream, chunk_size: int = CHUNK_SIZE) -> int:
+    """Пишет рецепты в stream в формате NDJSON, по рецепту на строку.
+
+    Ингредиенты указываются парой (название, единица измерения), теги —
+    slug, автор — email, изображение — путь в хранилище медиафайлов.
+    """
+    exported = 0
+    for chunk in _recipe_chunks(chunk_size):
+        recipe_ids = [recipe["id"] for recipe in chunk]
+        tags = defaultdict(list)
+        for recipe_id, slug in (
+            RecipeTag.objects.filter(recipe_id__in=recipe_ids)
+            .values_list("recipe_id", "tag__slug")
+            .order_by("id")
+        ):
+            tags[recipe_id].append(slug)
+        ingredients = defaultdict(list)
+        for recipe_id, name, unit, amount in (
+            RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+            .values_list(
+                "recipe_id",
+                "ingredient__name",
+                "ingredient__measurement_unit",
+                "amount",
+            )
+            .order_by("id")
+        ):
+            ingredients[recipe_id].append([name, unit, amount])
+        for recipe in chunk:
+            stream.write(
+                json.dumps(
+                    {
+                        "author": recipe["author__email"],
+                        "name": recipe["name"],
+                        "text": recipe["text"],
+                        "cooking_time": recipe["cooking_time"],
+                        "image": recipe["image"],
+                        "tags": tags[recipe["id"]],
+                        "ingredients": ingredients[recipe["id"]],
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+        exported += len(chunk)
+    return exported
+
+
+class RecipeImporter:
+    """Загружает рецепты из NDJSON порциями в отдельных транзакциях.
+
+    Теги и ингредиенты держатся в памяти, отсутствующие ингредиенты
+    создаются. Рецепты с неизвестным автором или тегом пропускаются.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.tags = dict(Tag.objects.values_list("slug", "id"))
+        self.ingredients = {
+            (name, unit): pk
+            for pk, name, unit in Ingredient.objects.values_list(
+                "id", "name", "measurement_unit"
+            )
+        }
+        self.authors = {}
+        self.imported = 0
+        self.skipped = 0
+        self.recipe_ids = []
+
+    def run(self, lines) -> int:
+        rows = (json.loads(line) for line in lines if line.strip())
+        for chunk in _chunks(rows, self.chunk_size):
+            with transaction.atomic():
+                self.import_chunk(chunk)
+        return self.imported
+
+    def resolve_authors(self, chunk) -> None:
+        emails = {row["author"] for row in chunk} - self.authors.keys()
+        if emails:
+            self.authors.update(
+                User.objects.filter(email__in=emails).values_list(
+                    "email", "id"
+                )
+            )
+
+    def resolve_ingredients(self, chunk) -> None:
+        missing = {
+            (name, unit)
+            for row in chunk
+            for name, unit, _ in row["ingredients"]
+        } - self.ingredients.keys()
+        if not missing:
+            return
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in missing
+        )
+        schedule_catalogue_build()
+        names = {name for name, _ in missing}
+        self.ingredients.update(
+            ((name, unit), pk)
+            for pk, name, unit in Ingredient.objects.filter(
+                name__in=names
+            ).values_list("id", "name", "measurement_unit")
+        )
+
+    def import_chunk(self, chunk) -> None:
+        self.resolve_authors(chunk)
+        valid = [
+            row
+            for row in chunk
+            if row["author"] in self.authors
+            and all(slug in self.tags for slug in row["tags"])
+        ]
+        self.skipped += len(chunk) - len(valid)
+        if not valid:
+            return
+        self.resolve_ingredients(valid)
+        recipes = self.create_recipes(
+            [
+                Recipe(
+                    author_id=self.authors[row["author"]],
+                    name=row["name"],
+                    text=row["text"],
+                    cooking_time=row["cooking_time"],
+                    image=row["image"],
+                )
+                for row in valid
+            ]
+        )
+        _insert_rows(
+            RecipeTag,
+            ("recipe", "tag"),
+            [
+                (recipe.id, self.tags[slug])
+                for recipe, row in zip(recipes, valid)
+                for slug in dict.fromkeys(row["tags"])
+            ],
+        )
+        _insert_rows(
+            RecipeIngredient,
+            ("recipe", "ingredient", "amount"),
+            [
+                (recipe.id, self.ingredients[(name, unit)], amount)
+                for recipe, row in zip(recipes, valid)
+                for name, unit, amount in row["ingredients"]
+            ],
+        )
+        repair_user_counters(
+            User.objects.filter(
+                id__in={recipe.author_id for recipe in recipes}
+            )
+        )
+        self.imported += len(recipes)
+        self.recipe_ids.extend(recipe.id for recipe in recipes)
+
+    def create_recipes(self, recipes) -> list:
+        if connection.features.can_return_rows_from_bulk_insert:
+            return Recipe.objects.bulk_create(recipes)
+        # Без RETURNING id берутся по порядку вставки внутри транзакции.
+        last_id = (
+            Recipe.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        Recipe.objects.bulk_create(recipes)
+        for recipe, pk in zip(
+            recipes,
+            Recipe.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True),
+        ):
+            recipe.id = pk
+        return recipes
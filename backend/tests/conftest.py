@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from tests import factories
+
+
+@pytest.fixture
+def user(db):
+    return factories.create_user()
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {factories.create_token(user).key}"
+    )
+    return client
+
+
+@pytest.fixture
+def catalog(user):
+    """Набор данных больше одной страницы выдачи."""
+    tags = [factories.create_tag() for _ in range(3)]
+    ingredients = [factories.create_ingredient() for _ in range(5)]
+    authors = [factories.create_user() for _ in range(8)]
+    recipes = [
+        factories.create_recipe(
+            author,
+            tags=tags[: 1 + number % 3],
+            ingredients=ingredients[: 2 + number % 4],
+        )
+        for author in authors
+        for number in range(2)
+    ]
+    for recipe in recipes[::2]:
+        factories.create_favorite(user, recipe)
+    for recipe in recipes[::3]:
+        factories.create_cart_item(user, recipe)
+    for author in authors:
+        factories.create_subscription(user, author)
+    return SimpleNamespace(
+        tags=tags,
+        ingredients=ingredients,
+        authors=authors,
+        recipes=recipes,
+        recipe=recipes[0],
+        author=authors[0],
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
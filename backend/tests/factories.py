@@ -0,0 +1,86 @@
+import itertools
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            Shopping, Tag)
+from users.models import Subscribe
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04"
+    b"\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D"
+    b"\x01\x00;"
+)
+
+_sequence = itertools.count(1)
+
+
+def create_user(**fields):
+    number = next(_sequence)
+    defaults = {
+        "email": f"user{number}@example.com",
+        "username": f"user{number}",
+        "first_name": f"Имя{number}",
+        "last_name": f"Фамилия{number}",
+        "password": "password-123",
+    }
+    defaults.update(fields)
+    return User.objects.create_user(**defaults)
+
+
+def create_token(user):
+    return Token.objects.create(user=user)
+
+
+def create_tag(**fields):
+    number = next(_sequence)
+    defaults = {
+        "name": f"Тег {number}",
+        "color": f"#{number:06X}",
+        "slug": f"tag-{number}",
+    }
+    defaults.update(fields)
+    return Tag.objects.create(**defaults)
+
+
+def create_ingredient(**fields):
+    number = next(_sequence)
+    defaults = {"name": f"ингредиент {number}", "measurement_unit": "г"}
+    defaults.update(fields)
+    return Ingredient.objects.create(**defaults)
+
+
+def create_recipe(author, tags=(), ingredients=(), **fields):
+    number = next(_sequence)
+    defaults = {
+        "name": f"Рецепт {number}",
+        "text": f"Описание рецепта {number}",
+        "cooking_time": 10,
+        "image": SimpleUploadedFile(
+            f"recipe{number}.gif", SMALL_GIF, content_type="image/gif"
+        ),
+    }
+    defaults.update(fields)
+    recipe = Recipe.objects.create(author=author, **defaults)
+    recipe.tags.set(tags)
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=amount)
+        for amount, ingredient in enumerate(ingredients, start=1)
+    )
+    return recipe
+
+
+def create_favorite(user, recipe):
+    return Favorite.objects.create(user=user, recipe=recipe)
+
+
+def create_cart_item(user, recipe):
+    return Shopping.objects.create(user=user, recipe=recipe)
+
+
+def create_subscription(user, author):
+    return Subscribe.objects.create(user=user, author=author)
@@ -0,0 +1,38 @@
+from contextlib import ContextDecorator
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class query_budget(ContextDecorator):
+    """Падает, если внутри блока выполнено больше max_queries запросов."""
+
+    def __init__(self, max_queries: int, using=connection):
+        self.max_queries = max_queries
+        self.capture = CaptureQueriesContext(using)
+
+    def __enter__(self):
+        self.capture.__enter__()
+        return self.capture
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.capture.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.capture.captured_queries)
+        if executed > self.max_queries:
+            statements = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(
+                    self.capture.captured_queries, start=1
+                )
+            )
+            raise QueryBudgetExceeded(
+                f"Выполнено {executed} запросов при бюджете "
+                f"{self.max_queries}:\n{statements}"
+            )
+        return False
@@ -0,0 +1,27 @@
+import tempfile
+
+from backend.settings import *  # noqa: F401,F403
+
+SECRET_KEY = "foodgram-tests"
+
+ALLOWED_HOSTS = ["testserver"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+    # Отдельная база для тестов маршрутизации чтений на реплики.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+}
+
+REPLICA_DATABASES = []
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="foodgram-media-")
+PRIVATE_MEDIA_ROOT = tempfile.mkdtemp(prefix="foodgram-private-")
+STATIC_ROOT = tempfile.mkdtemp(prefix="foodgram-static-")
@@ -0,0 +1,49 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from tests import factories
+from tests.query_budget import query_budget
+
+# Сессия, пользователь, COUNT(*) страницы и выборка страницы, плюс
+# значения небольших фильтров (теги, единицы измерения). Число запросов не
+# зависит от количества строк в таблицах.
+CHANGELIST_BUDGETS = {
+    "recipes_recipe": 5,
+    "recipes_recipeingredient": 4,
+    "recipes_favorite": 4,
+    "recipes_shopping": 4,
+    "recipes_ingredient": 6,
+    "users_subscribe": 4,
+    "users_customuser": 4,
+}
+
+
+@pytest.fixture
+def admin_client(db):
+    client = Client()
+    client.force_login(factories.create_user(is_staff=True, is_superuser=True))
+    return client
+
+
+@pytest.mark.parametrize("model,budget", CHANGELIST_BUDGETS.items())
+def test_changelist_query_budget(admin_client, catalog, model, budget):
+    url = reverse(f"admin:{model}_changelist")
+
+    with query_budget(budget):
+        response = admin_client.get(url)
+
+    assert response.status_code == 200
+
+
+def test_recipe_changelist_filters_by_author_email(admin_client, catalog):
+    response = admin_client.get(
+        reverse("admin:recipes_recipe_changelist"),
+        {"author_email": catalog.author.email},
+    )
+
+    assert response.status_code == 200
+    assert {
+        recipe.author_id for recipe in response.context["cl"].result_list
+    } == {catalog.author.pk}
+    assert 'name="author_email"' in response.content.decode()
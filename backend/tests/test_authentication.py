@@ -0,0 +1,88 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from rest_framework.exceptions import AuthenticationFailed
+
+from api import authentication as authentication_module
+from api.authentication import TOKEN_CACHE_KEY, CachedTokenAuthentication
+from api.checks import token_cache_is_shared
+from tests import factories
+
+
+@pytest.fixture
+def token(user):
+    return factories.create_token(user)
+
+
+def cached(token):
+    return cache.get(TOKEN_CACHE_KEY.format(key=token.key))
+
+
+def test_token_is_cached(token, django_assert_num_queries):
+    authentication = CachedTokenAuthentication()
+    user, _ = authentication.authenticate_credentials(token.key)
+
+    with django_assert_num_queries(0):
+        cached_user, cached_token = authentication.authenticate_credentials(
+            token.key
+        )
+
+    assert cached_user == user
+    assert cached_token.key == token.key
+
+
+def test_logout_is_seen_by_other_processes(
+    token, tmp_path, monkeypatch, django_capture_on_commit_callbacks
+):
+    # Два воркера gunicorn с общим кэшем: токен закэширован в одном, а
+    # удалён запросом, который обслужил другой.
+    api_worker = FileBasedCache(str(tmp_path), {})
+    web_worker = FileBasedCache(str(tmp_path), {})
+    authentication = CachedTokenAuthentication()
+    monkeypatch.setattr(authentication_module, "cache", api_worker)
+    authentication.authenticate_credentials(token.key)
+
+    monkeypatch.setattr(authentication_module, "cache", web_worker)
+    with django_capture_on_commit_callbacks(execute=True):
+        token.delete()
+
+    monkeypatch.setattr(authentication_module, "cache", api_worker)
+    with pytest.raises(AuthenticationFailed):
+        authentication.authenticate_credentials(token.key)
+
+
+def test_cached_authentication_requires_shared_cache(settings, tmp_path):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_AUTHENTICATION_CLASSES": [
+            "api.authentication.CachedTokenAuthentication"
+        ],
+    }
+
+    assert [error.id for error in token_cache_is_shared(None)] == [
+        "api.E001"
+    ]
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    assert token_cache_is_shared(None) == []
+
+
+def test_user_save_invalidates_cache_after_commit(
+    token, user, django_capture_on_commit_callbacks
+):
+    authentication = CachedTokenAuthentication()
+    authentication.authenticate_credentials(token.key)
+    assert cached(token) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+        assert cached(token) is not None
+
+    assert cached(token) is None
+    with pytest.raises(AuthenticationFailed):
+        authentication.authenticate_credentials(token.key)
@@ -0,0 +1,84 @@
+import pytest
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.cards import card_columns, recipe_cards
+from api.fieldsets import Fieldset
+from api.serializers import RecipeGetSerializer
+from recipes.models import Recipe, RecipeIngredient, Tag
+
+
+def make_request(user=None):
+    request = APIRequestFactory().get("/api/recipes/")
+    if user is not None:
+        force_authenticate(request, user)
+    return Request(request)
+
+
+def serializer_output(request, fieldset=None):
+    recipes = Recipe.objects.select_related("author").prefetch_related(
+        Prefetch("tags", queryset=Tag.objects.order_by("id")),
+        Prefetch(
+            "amount",
+            queryset=RecipeIngredient.objects.select_related("ingredient"),
+        ),
+    )
+    return RecipeGetSerializer(
+        recipes, many=True, context={"request": request, "fieldset": fieldset}
+    ).data
+
+
+@pytest.mark.parametrize("authenticated", [True, False])
+def test_cards_match_recipe_serializer(user, catalog, authenticated):
+    user = user if authenticated else None
+    expected = serializer_output(make_request(user))
+    request = make_request(user)
+
+    fieldset = Fieldset(
+        RecipeGetSerializer.Meta.fields, RecipeGetSerializer.compact_fields
+    )
+    cards = recipe_cards(
+        list(Recipe.objects.values(*card_columns(fieldset))),
+        request,
+        fieldset,
+    )
+
+    assert JSONRenderer().render(cards) == JSONRenderer().render(expected)
+    assert any(card["is_favorited"] for card in cards) == authenticated
+
+
+def test_list_endpoint_serves_cards(auth_client, catalog, user):
+    results = auth_client.get("/api/recipes/", {"limit": 100}).data[
+        "results"
+    ]
+
+    expected = serializer_output(make_request(user))
+    assert JSONRenderer().render(results) == JSONRenderer().render(expected)
+
+
+@pytest.mark.parametrize(
+    "fields,expand",
+    [
+        ("id,name,image,cooking_time,tags", None),
+        ("author,tags,is_favorited", "author"),
+        ("ingredients,tags,is_in_shopping_cart", "tags"),
+    ],
+)
+def test_sparse_cards_match_recipe_serializer(user, catalog, fields, expand):
+    fieldset = Fieldset(
+        RecipeGetSerializer.Meta.fields,
+        RecipeGetSerializer.compact_fields,
+        fields,
+        expand,
+    )
+    expected = serializer_output(make_request(user), fieldset)
+
+    cards = recipe_cards(
+        list(Recipe.objects.values(*card_columns(fieldset))),
+        make_request(user),
+        fieldset,
+    )
+
+    assert JSONRenderer().render(cards) == JSONRenderer().render(expected)
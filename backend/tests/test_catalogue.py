@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from recipes.catalogue import _write, catalogue_root
+from recipes.models import Ingredient
+from tests import factories
+
+CATALOGUE_URL = reverse("api:ingredients-catalogue")
+
+
+def read_catalogue(url: str) -> list:
+    path = os.path.join(catalogue_root(), url.rsplit("/", 1)[-1])
+    with open(path, "rb") as file:
+        content = file.read()
+    with open(f"{path}.gz", "rb") as file:
+        assert gzip.decompress(file.read()) == content
+    return json.loads(content)
+
+
+def test_catalogue_matches_ingredients(client, db):
+    ingredients = [factories.create_ingredient() for _ in range(3)]
+    call_command("build_ingredient_catalogue")
+
+    response = client.get(CATALOGUE_URL)
+
+    assert response.status_code == 200
+    data = response.data
+    assert data["count"] == 3
+    assert data["url"].startswith("http://testserver/backend_static/")
+    assert data["version"] in data["url"]
+    assert read_catalogue(data["url"]) == [
+        {
+            "id": ingredient.pk,
+            "name": ingredient.name,
+            "measurement_unit": ingredient.measurement_unit,
+        }
+        for ingredient in ingredients
+    ]
+
+
+def test_catalogue_rebuilt_on_ingredient_change(
+    client, db, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        ingredient = factories.create_ingredient()
+    before = client.get(CATALOGUE_URL).data
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.filter(pk=ingredient.pk).get().delete()
+    after = client.get(CATALOGUE_URL).data
+
+    assert after["version"] != before["version"]
+    assert after["count"] == before["count"] - 1
+    assert ingredient.pk not in {
+        row["id"] for row in read_catalogue(after["url"])
+    }
+    # Предыдущая версия остаётся для клиентов, которые её ещё скачивают.
+    assert read_catalogue(before["url"])
+
+
+def test_concurrent_writes_do_not_collide(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    contents = [str(number).encode() * 1000 for number in range(20)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda content: _write(path, content), contents))
+
+    with open(path, "rb") as file:
+        assert file.read() in contents
+    assert os.listdir(tmp_path) == ["manifest.json"]
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+
+from recipes.cofavorites import rebuild_co_favorites
+from recipes.models import CoFavoriteRecipe
+from tests import factories
+
+
+@pytest.fixture
+def tastes(user):
+    first, second, third, fourth = [
+        factories.create_recipe(user) for _ in range(4)
+    ]
+    for recipes in (
+        (first, second),
+        (first, second, third),
+        (third, fourth),
+    ):
+        fan = factories.create_user()
+        for recipe in recipes:
+            factories.create_favorite(fan, recipe)
+    return first, second, third, fourth
+
+
+def test_rebuild_scores_co_favorites(tastes):
+    first, second, third, fourth = tastes
+
+    assert rebuild_co_favorites() == 4
+
+    assert list(
+        CoFavoriteRecipe.objects.filter(recipe=first).values_list(
+            "similar_id", "score"
+        )
+    ) == [(second.pk, pytest.approx(1.0)), (third.pk, pytest.approx(0.5))]
+
+
+def test_cart_weight_adds_shopping(tastes, user):
+    first, second, third, fourth = tastes
+    factories.create_cart_item(user, first)
+    factories.create_cart_item(user, fourth)
+
+    rebuild_co_favorites(cart_weight=1.0)
+
+    assert CoFavoriteRecipe.objects.filter(
+        recipe=first, similar=fourth
+    ).exists()
+
+
+def test_suggestions_skip_own_favorites(auth_client, user, tastes):
+    first, second, third, fourth = tastes
+    rebuild_co_favorites()
+    factories.create_favorite(user, first)
+
+    response = auth_client.get(reverse("api:recipes-suggestions"))
+
+    assert response.status_code == 200
+    assert [recipe["id"] for recipe in response.data["results"]] == [
+        second.pk,
+        third.pk,
+    ]
@@ -0,0 +1,67 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.feed import FEED_CACHE_KEY, feed_queryset
+from tests import factories
+
+FEED_URL = reverse("api:recipes-feed")
+
+
+@pytest.fixture
+def timeline(user):
+    followed = factories.create_user()
+    stranger = factories.create_user()
+    factories.create_subscription(user, followed)
+    recipes = [factories.create_recipe(followed) for _ in range(5)]
+    factories.create_recipe(stranger)
+    return followed, recipes
+
+
+def test_feed_returns_followed_authors_newest_first(auth_client, timeline):
+    followed, recipes = timeline
+
+    response = auth_client.get(FEED_URL)
+
+    assert response.status_code == 200
+    assert [recipe["id"] for recipe in response.data["results"]] == [
+        recipe.pk for recipe in reversed(recipes)
+    ]
+
+
+def test_feed_cursor_pages_do_not_overlap(auth_client, timeline):
+    followed, recipes = timeline
+
+    first = auth_client.get(FEED_URL, {"limit": 3}).data
+    second = auth_client.get(first["next"]).data
+
+    ids = [recipe["id"] for recipe in first["results"] + second["results"]]
+    assert ids == [recipe.pk for recipe in reversed(recipes)]
+    assert second["next"] is None
+
+
+def test_feed_requires_authentication(client):
+    assert client.get(FEED_URL).status_code == 401
+
+
+@override_settings(FEED_FANOUT_MIN_FOLLOWING=1, FEED_FANOUT_SIZE=3)
+def test_fanout_cache_matches_join(
+    user, timeline, django_capture_on_commit_callbacks
+):
+    followed, recipes = timeline
+    key = FEED_CACHE_KEY.format(user_id=user.pk)
+
+    assert list(feed_queryset(user).order_by("-id")) == recipes[::-1]
+    assert cache.get(key) == ([recipe.pk for recipe in recipes[:1:-1]], True)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        fresh = factories.create_recipe(followed)
+    assert cache.get(key)[0][0] == fresh.pk
+    assert list(feed_queryset(user).order_by("-id")) == [
+        fresh,
+        *recipes[::-1],
+    ]
+
+    factories.create_subscription(user, factories.create_user())
+    assert cache.get(key) is None
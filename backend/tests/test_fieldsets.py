@@ -0,0 +1,85 @@
+from django.urls import reverse
+
+from recipes.ingredient_index import match_recipes, rebuild_ingredient_index
+from tests.query_budget import query_budget
+
+RECIPES_URL = reverse("api:recipes-list")
+USERS_URL = reverse("api:users-list")
+
+
+def executed_sql(queries) -> str:
+    return "\n".join(query["sql"] for query in queries.captured_queries)
+
+
+def test_card_fields_skip_unrequested_work(auth_client, catalog):
+    with query_budget(10) as queries:
+        response = auth_client.get(
+            RECIPES_URL, {"fields": "id,name,image,cooking_time,tags"}
+        )
+
+    recipe = response.data["results"][0]
+    assert list(recipe) == ["id", "name", "tags", "cooking_time", "image"]
+    assert all(isinstance(tag, int) for tag in recipe["tags"])
+    sql = executed_sql(queries)
+    assert "recipes_recipeingredient" not in sql
+    assert '"text"' not in sql
+    assert "recipes_favorite" not in sql
+
+
+def test_expand_returns_nested_objects(auth_client, catalog):
+    response = auth_client.get(
+        RECIPES_URL, {"fields": "author,tags", "expand": "author,tags"}
+    )
+
+    recipe = response.data["results"][0]
+    assert recipe["author"]["is_subscribed"] is True
+    assert set(recipe["tags"][0]) == {"id", "name", "color", "slug"}
+
+
+def test_retrieve_without_ingredients_skips_prefetch(auth_client, catalog):
+    url = reverse("api:recipes-detail", kwargs={"pk": catalog.recipe.pk})
+
+    with query_budget(10) as queries:
+        response = auth_client.get(url, {"fields": "id,author"})
+
+    assert response.data == {
+        "id": catalog.recipe.pk,
+        "author": catalog.recipe.author_id,
+    }
+    assert "recipes_recipeingredient" not in executed_sql(queries)
+
+
+def test_unknown_fields_are_rejected(auth_client, catalog):
+    response = auth_client.get(
+        RECIPES_URL, {"fields": "id,calories", "expand": "text"}
+    )
+
+    assert response.status_code == 400
+    assert set(response.data) == {"fields", "expand"}
+
+
+def test_user_fields_skip_subscription_lookup(auth_client, catalog):
+    with query_budget(10) as queries:
+        response = auth_client.get(USERS_URL, {"fields": "id,username"})
+
+    assert list(response.data["results"][0]) == ["id", "username"]
+    assert "users_subscribe" not in executed_sql(queries)
+
+
+def test_match_without_id_field(client, catalog):
+    rebuild_ingredient_index()
+    ingredient = catalog.ingredients[0].pk
+
+    response = client.get(
+        reverse("api:recipes-match"),
+        {"ingredients": [ingredient], "fields": "name"},
+    )
+
+    assert response.status_code == 200
+    results = response.data["results"]
+    assert results
+    assert all(list(recipe) == ["name", "coverage"] for recipe in results)
+    assert [recipe["coverage"] for recipe in results] == [
+        round(coverage, 4)
+        for _, coverage in match_recipes([ingredient])[: len(results)]
+    ]
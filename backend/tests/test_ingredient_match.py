@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+
+from recipes.ingredient_index import (match_recipes, rebuild_ingredient_index,
+                                      reindex_recipes)
+from recipes.models import RecipeIngredient
+from tests import factories
+
+
+@pytest.fixture
+def pantry(user):
+    ingredients = [factories.create_ingredient() for _ in range(4)]
+    full = factories.create_recipe(user, ingredients=ingredients[:2])
+    half = factories.create_recipe(user, ingredients=ingredients[1:3])
+    other = factories.create_recipe(user, ingredients=ingredients[3:])
+    rebuild_ingredient_index()
+    return ingredients, full, half, other
+
+
+def test_match_ranks_by_coverage(pantry):
+    ingredients, full, half, other = pantry
+
+    assert match_recipes([ingredients[0].pk, ingredients[1].pk]) == [
+        (full.pk, 1.0),
+        (half.pk, 0.5),
+    ]
+
+
+def test_match_respects_min_coverage(pantry):
+    ingredients, full, half, other = pantry
+
+    assert match_recipes(
+        [ingredients[0].pk, ingredients[1].pk], min_coverage=0.75
+    ) == [(full.pk, 1.0)]
+
+
+def test_reindex_follows_ingredient_changes(pantry):
+    ingredients, full, half, other = pantry
+    stale = list(full.amount.values_list("ingredient_id", flat=True))
+    RecipeIngredient.objects.filter(recipe=full).delete()
+    RecipeIngredient.objects.create(
+        recipe=full, ingredient=ingredients[3], amount=1
+    )
+
+    reindex_recipes([full.pk], stale)
+
+    assert match_recipes([ingredients[3].pk]) == [
+        (other.pk, 1.0),
+        (full.pk, 1.0),
+    ]
+    assert match_recipes([ingredients[0].pk]) == []
+
+
+def test_index_follows_recipe_deletion(
+    pantry, django_capture_on_commit_callbacks
+):
+    ingredients, full, half, other = pantry
+
+    with django_capture_on_commit_callbacks(execute=True):
+        half.delete()
+
+    assert match_recipes([ingredients[2].pk]) == []
+
+
+def test_match_endpoint(client, pantry):
+    ingredients, full, half, other = pantry
+
+    response = client.get(
+        reverse("api:recipes-match"),
+        {"ingredients": [ingredients[0].pk, ingredients[1].pk]},
+    )
+
+    assert response.status_code == 200
+    assert [
+        (recipe["id"], recipe["coverage"])
+        for recipe in response.json()["results"]
+    ] == [(full.pk, 1.0), (half.pk, 0.5)]
+
+
+def test_match_endpoint_requires_ingredients(client, db):
+    response = client.get(reverse("api:recipes-match"))
+
+    assert response.status_code == 400
@@ -0,0 +1,81 @@
+import datetime
+import io
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+PAYLOAD = OrderedDict(
+    id=1,
+    name="Борщ с пампушками",
+    text="Первая строка\u2028вторая строка\u2029",
+    price=Decimal("12.50"),
+    created=datetime.datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    cooked=datetime.datetime(2024, 5, 1, 12, 30, 15, 123456),
+    day=datetime.date(2024, 5, 1),
+    label=gettext_lazy("Пользователь"),
+    tags=[{"slug": "breakfast"}, None, True, 1.5],
+    errors={0: ["Введите правильное число."], 2: []},
+)
+
+
+@pytest.mark.parametrize("library", ["orjson", None])
+def test_renderer_matches_drf_output(monkeypatch, library):
+    if library is None:
+        monkeypatch.setattr(renderers, "orjson", None)
+
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(
+        PAYLOAD
+    )
+
+
+def test_renderer_indents_like_drf():
+    media_type = "application/json; indent=2"
+
+    assert FastJSONRenderer().render(
+        PAYLOAD, media_type
+    ) == JSONRenderer().render(PAYLOAD, media_type)
+
+
+@pytest.mark.parametrize("library", ["orjson", None])
+def test_parser_matches_drf_parser(monkeypatch, library):
+    if library is None:
+        monkeypatch.setattr(parsers, "orjson", None)
+    body = JSONRenderer().render({"text": "Щи", "amounts": [1, 2.5]})
+
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize("body", [b"{", b'{"amount": NaN}'])
+def test_parser_rejects_invalid_json(body):
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(body))
+
+
+def test_list_errors_are_rendered(auth_client, db):
+    match = auth_client.get(
+        reverse("api:recipes-match"), {"ingredients": ["1", "abc"]}
+    )
+    create = auth_client.post(
+        reverse("api:recipes-list"),
+        {"name": "Суп", "ingredients": [{"id": "abc", "amount": -1}]},
+        format="json",
+    )
+
+    assert match.status_code == 400
+    assert match.json() == {
+        "ingredients": {"1": ["Введите правильное число."]}
+    }
+    assert create.status_code == 400
@@ -0,0 +1,74 @@
+import os
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from recipes.media import image_storage, release_images
+from recipes.models import Recipe
+from tests import factories
+from tests.factories import SMALL_GIF
+
+OTHER_GIF = SMALL_GIF.replace(b"\xff\xff\xff", b"\x00\xff\x00")
+
+
+def make_old(name: str) -> None:
+    past = time.time() - 48 * 3600
+    os.utime(image_storage().path(name), (past, past))
+
+
+def test_identical_uploads_share_one_file(user):
+    first = factories.create_recipe(user)
+    second = factories.create_recipe(user)
+
+    assert first.image.name == second.image.name
+    name = os.path.basename(first.image.name)
+    assert len(name.split(".")[0]) == 64
+    assert first.image.name.startswith(f"recipe_img/{name[:2]}/")
+
+
+def test_replaced_image_is_released_on_commit(
+    user, django_capture_on_commit_callbacks
+):
+    recipe = factories.create_recipe(user)
+    shared = factories.create_recipe(user, name="С той же картинкой")
+    old_name = recipe.image.name
+    make_old(old_name)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.image = ContentFile(OTHER_GIF, name="other.gif")
+        recipe.save()
+    assert image_storage().exists(old_name)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        shared.delete()
+    assert not image_storage().exists(old_name)
+    assert image_storage().exists(recipe.image.name)
+
+
+def test_fresh_orphans_wait_for_grace_period(user):
+    recipe = factories.create_recipe(
+        user, image=ContentFile(OTHER_GIF, name="fresh.gif")
+    )
+    name = recipe.image.name
+    Recipe.objects.filter(pk=recipe.pk).delete()
+
+    assert release_images([name]) == []
+    assert image_storage().exists(name)
+
+
+def test_gc_media_dry_run_and_delete(user):
+    kept = factories.create_recipe(user)
+    orphan = image_storage().save(
+        "recipe_img/orphan.gif", ContentFile(OTHER_GIF)
+    )
+    make_old(orphan)
+    make_old(kept.image.name)
+
+    call_command("gc_media", "--dry-run", stdout=StringIO())
+    assert image_storage().exists(orphan)
+
+    call_command("gc_media", "--batch-size", "1", stdout=StringIO())
+    assert not image_storage().exists(orphan)
+    assert image_storage().exists(kept.image.name)
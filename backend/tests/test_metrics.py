@@ -0,0 +1,65 @@
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.metrics import Counter, Histogram, Registry
+from api.middleware import RequestMetricsMiddleware
+
+METRICS_URL = reverse("api:metrics")
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = registry.register(
+        Counter("requests_total", "Запросы.", ("view", "status"))
+    )
+    duration = registry.register(
+        Histogram("duration_seconds", "Время.", ("view",), (0.1, 1.0))
+    )
+
+    requests.inc(view="Tags.list", status=200)
+    requests.inc(view="Tags.list", status=200)
+    duration.observe(0.05, view="Tags.list")
+    duration.observe(0.5, view="Tags.list")
+    duration.observe(5, view="Tags.list")
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Запросы.",
+        "# TYPE requests_total counter",
+        'requests_total{view="Tags.list",status="200"} 2.0',
+        "# HELP duration_seconds Время.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{view="Tags.list",le="0.1"} 1',
+        'duration_seconds_bucket{view="Tags.list",le="1.0"} 2',
+        'duration_seconds_bucket{view="Tags.list",le="+Inf"} 3',
+        'duration_seconds_sum{view="Tags.list"} 5.55',
+        'duration_seconds_count{view="Tags.list"} 3',
+    ]
+
+
+def test_metrics_disabled(client, settings):
+    settings.REQUEST_METRICS_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        RequestMetricsMiddleware(lambda request: None)
+    assert client.get(METRICS_URL).status_code == 404
+
+
+def test_requests_are_recorded(db, settings):
+    settings.REQUEST_METRICS_ENABLED = True
+    client = APIClient()
+
+    response = client.get(reverse("api:tags-list"))
+    metrics = client.get(METRICS_URL)
+
+    assert 'desc="1 queries"' in response["Server-Timing"]
+    assert metrics.status_code == 200
+    body = metrics.content.decode()
+    assert (
+        'foodgram_requests_total{view="TagViewSet.list",method="GET",'
+        'status="200"}'
+    ) in body
+    assert (
+        'foodgram_db_queries_bucket{view="TagViewSet.list",le="1"}'
+    ) in body
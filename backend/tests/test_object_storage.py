@@ -0,0 +1,113 @@
+import base64
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from recipes.media import image_storage
+from recipes.models import Recipe
+from recipes.storage import ContentAddressedStorage
+from tests import factories
+from tests.factories import SMALL_GIF
+
+RECIPES_URL = reverse("api:recipes-list")
+UPLOAD_URL = reverse("api:recipes-upload")
+
+
+class TargetStorage(ContentAddressedStorage):
+    def __init__(self):
+        super().__init__(location=f"{settings.MEDIA_ROOT}-copy")
+
+
+def recipe_payload(catalog, **image):
+    return {
+        "name": "Рецепт с загрузкой",
+        "text": "Описание",
+        "cooking_time": 5,
+        "tags": [catalog.tags[0].pk],
+        "ingredients": [{"id": catalog.ingredients[0].pk, "amount": 1}],
+        **image,
+    }
+
+
+def test_local_storage_has_no_direct_upload(auth_client, db):
+    response = auth_client.post(UPLOAD_URL, {"content_type": "image/gif"})
+
+    assert response.status_code == 501
+
+
+def test_recipe_created_from_direct_upload(
+    auth_client, catalog, user, django_capture_on_commit_callbacks
+):
+    key = image_storage().save_exact(
+        f"uploads/{user.id}/photo.gif", ContentFile(SMALL_GIF)
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = auth_client.post(
+            RECIPES_URL,
+            recipe_payload(catalog, image_upload=key),
+            format="json",
+        )
+
+    assert response.status_code == 201, response.content
+    recipe = Recipe.objects.get(pk=response.data["id"])
+    assert recipe.image.name.startswith("recipe_img/")
+    assert recipe.image.read() == SMALL_GIF
+    assert not image_storage().exists(key)
+
+
+def test_foreign_or_mixed_upload_is_rejected(auth_client, catalog, user):
+    other = factories.create_user()
+    key = image_storage().save_exact(
+        f"uploads/{other.id}/photo.gif", ContentFile(SMALL_GIF)
+    )
+    image = "data:image/gif;base64," + base64.b64encode(SMALL_GIF).decode()
+
+    foreign = auth_client.post(
+        RECIPES_URL, recipe_payload(catalog, image_upload=key), format="json"
+    )
+    missing = auth_client.post(
+        RECIPES_URL, recipe_payload(catalog), format="json"
+    )
+    own = image_storage().save_exact(
+        f"uploads/{user.id}/own.gif", ContentFile(SMALL_GIF)
+    )
+    mixed = auth_client.post(
+        RECIPES_URL,
+        recipe_payload(catalog, image=image, image_upload=own),
+        format="json",
+    )
+
+    assert foreign.status_code == 400
+    assert "image_upload" in foreign.data
+    assert missing.status_code == 400
+    assert "image" in missing.data
+    assert mixed.status_code == 400
+
+
+def test_copy_media_to_storage(user):
+    recipe = factories.create_recipe(user)
+    output = StringIO()
+
+    call_command(
+        "copy_media_to_storage",
+        "--storage",
+        "tests.test_object_storage.TargetStorage",
+        "--workers",
+        "2",
+        stdout=output,
+    )
+    call_command(
+        "copy_media_to_storage",
+        "--storage",
+        "tests.test_object_storage.TargetStorage",
+        stdout=output,
+    )
+
+    target = TargetStorage()
+    with target.open(recipe.image.name) as file:
+        assert file.read() == SMALL_GIF
+    assert "Скопировано файлов: 0" in output.getvalue().splitlines()[-1]
@@ -0,0 +1,189 @@
+import base64
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.urls import router_v1
+from recipes.catalogue import build_catalogue
+from recipes.cofavorites import rebuild_co_favorites
+from recipes.models import ShoppingListJob
+from tests import factories
+from tests.factories import SMALL_GIF
+from tests.query_budget import QueryBudgetExceeded, query_budget
+
+IMAGE = "data:image/gif;base64," + base64.b64encode(SMALL_GIF).decode()
+
+
+def recipe_payload(catalog):
+    return {
+        "name": "Новый рецепт",
+        "text": "Описание",
+        "cooking_time": 5,
+        "image": IMAGE,
+        "tags": [tag.pk for tag in catalog.tags],
+        "ingredients": [
+            {"id": ingredient.pk, "amount": 10}
+            for ingredient in catalog.ingredients
+        ],
+    }
+
+
+# Бюджеты учитывают запрос токена (кэш аутентификации очищается перед
+# тестом) и обработчики on_commit.
+ENDPOINT_BUDGETS = {
+    ("get", "users-list"): 3,
+    ("get", "users-detail"): 2,
+    ("get", "users-me"): 2,
+    ("get", "users-subscriptions"): 4,
+    ("post", "users-subscribe"): 8,
+    ("get", "tags-list"): 2,
+    ("get", "tags-detail"): 2,
+    ("get", "ingredients-list"): 2,
+    ("get", "ingredients-detail"): 2,
+    ("get", "ingredients-catalogue"): 1,
+    ("get", "recipes-list"): 8,
+    ("get", "recipes-detail"): 7,
+    ("get", "recipes-feed"): 7,
+    ("get", "recipes-similar"): 3,
+    ("get", "recipes-suggestions"): 8,
+    ("post", "recipes-list"): 20,
+    ("patch", "recipes-detail"): 23,
+    ("post", "recipes-favorite"): 8,
+    ("post", "recipes-shopping-cart"): 8,
+    ("get", "download_shopping_cart"): 2,
+    ("get", "sync"): 11,
+    ("post", "shopping_list_jobs-list"): 6,
+    ("get", "shopping_list_jobs-detail"): 2,
+}
+
+URL_KWARGS = {
+    "users-detail": lambda catalog: {"id": catalog.author.pk},
+    "users-subscribe": lambda catalog: {"id": catalog.subscribable.pk},
+    "tags-detail": lambda catalog: {"pk": catalog.tags[0].pk},
+    "ingredients-detail": lambda catalog: {"pk": catalog.ingredients[0].pk},
+    "recipes-detail": lambda catalog: {"pk": catalog.own_recipe.pk},
+    "recipes-similar": lambda catalog: {"pk": catalog.own_recipe.pk},
+    "shopping_list_jobs-detail": lambda catalog: {"pk": catalog.job.pk},
+    "recipes-favorite": lambda catalog: {"pk": catalog.recipes[1].pk},
+    "recipes-shopping-cart": lambda catalog: {"pk": catalog.recipes[1].pk},
+}
+
+PAYLOADS = {
+    ("post", "recipes-list"): recipe_payload,
+    ("patch", "recipes-detail"): recipe_payload,
+}
+
+
+@pytest.fixture
+def budget_catalog(catalog, user):
+    catalog.subscribable = factories.create_user()
+    catalog.own_recipe = factories.create_recipe(
+        user, tags=catalog.tags, ingredients=catalog.ingredients
+    )
+    for number, author in enumerate(catalog.authors):
+        factories.create_favorite(author, catalog.recipes[0])
+        factories.create_favorite(author, catalog.recipes[number + 1])
+    rebuild_co_favorites()
+    build_catalogue()
+    catalog.job = ShoppingListJob.objects.create(
+        user=user, status=ShoppingListJob.DONE
+    )
+    return catalog
+
+
+@pytest.mark.parametrize(
+    "method,url_name,budget",
+    [
+        (method, url_name, budget)
+        for (method, url_name), budget in ENDPOINT_BUDGETS.items()
+    ],
+)
+def test_endpoint_query_budget(
+    auth_client,
+    budget_catalog,
+    django_capture_on_commit_callbacks,
+    method,
+    url_name,
+    budget,
+):
+    kwargs = URL_KWARGS.get(url_name, lambda catalog: {})(budget_catalog)
+    url = reverse(f"api:{url_name}", kwargs=kwargs)
+    payload = PAYLOADS.get((method, url_name), lambda catalog: None)
+    data = payload(budget_catalog)
+
+    with query_budget(budget):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = getattr(auth_client, method)(
+                url, data, format="json"
+            )
+
+    assert response.status_code < 400, response.content
+
+
+def write_recipe(client, user, size):
+    catalog = SimpleNamespace(
+        tags=[factories.create_tag() for _ in range(size)],
+        ingredients=[factories.create_ingredient() for _ in range(size)],
+    )
+    recipe = factories.create_recipe(
+        user, tags=catalog.tags, ingredients=catalog.ingredients
+    )
+    return {
+        "post": (reverse("api:recipes-list"), recipe_payload(catalog)),
+        "patch": (
+            reverse("api:recipes-detail", kwargs={"pk": recipe.pk}),
+            recipe_payload(catalog),
+        ),
+    }
+
+
+def read_subscriptions(client, user, size):
+    for _ in range(size):
+        author = factories.create_user()
+        factories.create_recipe(author)
+        factories.create_recipe(author)
+        factories.create_subscription(user, author)
+    return {"get": (reverse("api:users-subscriptions"), None)}
+
+
+@pytest.mark.parametrize(
+    "method,setup",
+    [
+        ("post", write_recipe),
+        ("patch", write_recipe),
+        ("get", read_subscriptions),
+    ],
+)
+def test_queries_do_not_grow_with_rows(
+    auth_client, user, django_capture_on_commit_callbacks, method, setup
+):
+    counts = []
+    for size in (1, 5):
+        url, data = setup(auth_client, user, size)[method]
+        with CaptureQueriesContext(connection) as captured:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = getattr(auth_client, method)(
+                    url, data, format="json"
+                )
+        assert response.status_code < 400, response.content
+        counts.append(len(captured.captured_queries))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize("prefix,viewset,basename", router_v1.registry)
+def test_every_viewset_has_budget(prefix, viewset, basename):
+    budgeted = {name for _, name in ENDPOINT_BUDGETS}
+    assert f"{basename}-list" in budgeted or f"{basename}-me" in budgeted
+    assert f"{basename}-detail" in budgeted
+
+
+def test_query_budget_reports_sql(db):
+    from recipes.models import Tag
+
+    with pytest.raises(QueryBudgetExceeded, match="recipes_tag"):
+        with query_budget(0):
+            list(Tag.objects.all())
@@ -0,0 +1,52 @@
+from django.urls import reverse
+
+from tests.query_budget import query_budget
+
+RECIPES_URL = reverse("api:recipes-list")
+USERS_URL = reverse("api:users-list")
+
+
+def test_recipe_flags_match_user_relations(auth_client, catalog):
+    favorited = {recipe.pk for recipe in catalog.recipes[::2]}
+    in_cart = {recipe.pk for recipe in catalog.recipes[::3]}
+    followed = {author.pk for author in catalog.authors}
+
+    results = auth_client.get(RECIPES_URL, {"limit": 100}).data["results"]
+
+    assert len(results) == len(catalog.recipes)
+    for recipe in results:
+        assert recipe["is_favorited"] == (recipe["id"] in favorited)
+        assert recipe["is_in_shopping_cart"] == (recipe["id"] in in_cart)
+        assert recipe["author"]["is_subscribed"] == (
+            recipe["author"]["id"] in followed
+        )
+
+
+def test_user_list_loads_subscriptions_once(auth_client, catalog, user):
+    auth_client.get(USERS_URL)
+
+    with query_budget(3) as queries:
+        response = auth_client.get(USERS_URL, {"limit": 100})
+
+    results = response.data["results"]
+    assert len(results) == len(catalog.authors) + 1
+    assert {
+        row["id"] for row in results if row["is_subscribed"]
+    } == {author.pk for author in catalog.authors}
+    subscribe_queries = [
+        query
+        for query in queries.captured_queries
+        if "users_subscribe" in query["sql"]
+    ]
+    assert len(subscribe_queries) == 1
+
+
+def test_anonymous_user_has_no_relations(client, catalog):
+    results = client.get(RECIPES_URL).data["results"]
+
+    assert not any(
+        recipe["is_favorited"]
+        or recipe["is_in_shopping_cart"]
+        or recipe["author"]["is_subscribed"]
+        for recipe in results
+    )
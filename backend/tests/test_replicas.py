@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.db_router import (PRIMARY_DATABASE, PrimaryReplicaRouter,
+                               read_from_replica)
+from recipes.models import Favorite, Recipe
+from tests import factories
+
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+RECIPES_URL = reverse("api:recipes-list")
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ["replica"]
+
+
+def test_router_keeps_one_replica_per_block(settings):
+    settings.REPLICA_DATABASES = ["replica_1", "replica_2", "replica_3"]
+    router = PrimaryReplicaRouter()
+
+    assert router.db_for_read(Recipe) == PRIMARY_DATABASE
+    for _ in range(10):
+        with read_from_replica() as replica:
+            assert {router.db_for_read(Recipe) for _ in range(20)} == {
+                replica
+            }
+            assert router.db_for_write(Recipe) == PRIMARY_DATABASE
+    assert router.db_for_read(Recipe) == PRIMARY_DATABASE
+
+
+def test_reads_go_to_replica(replicas, user):
+    factories.create_recipe(user)
+
+    response = APIClient().get(RECIPES_URL)
+
+    assert response.status_code == 200
+    assert response.data["count"] == 0
+
+
+def test_reads_stick_to_primary_after_write(replicas, user):
+    recipe = factories.create_recipe(user)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {factories.create_token(user).key}"
+    )
+
+    assert client.get(RECIPES_URL).data["count"] == 0
+    response = client.post(
+        reverse("api:recipes-favorite", kwargs={"pk": recipe.pk})
+    )
+
+    assert response.status_code == 201
+    assert Favorite.objects.using(PRIMARY_DATABASE).filter(
+        user=user, recipe=recipe
+    ).exists()
+    assert not Favorite.objects.using("replica").exists()
+    assert client.get(RECIPES_URL).data["count"] == 1
+    assert APIClient().get(RECIPES_URL).data["count"] == 0
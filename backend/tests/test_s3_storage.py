@@ -0,0 +1,102 @@
+import base64
+import json
+
+import pytest
+from django.core.files.base import ContentFile
+
+from recipes.storage import content_hash, hashed_name
+from tests.factories import SMALL_GIF
+
+pytest.importorskip("storages")
+Stubber = pytest.importorskip("botocore.stub").Stubber
+
+from recipes.s3 import (PrivateS3Storage,  # noqa: E402
+                        S3ContentAddressedStorage)
+
+BUCKET = "foodgram-media"
+
+
+@pytest.fixture
+def storage():
+    return S3ContentAddressedStorage(
+        bucket_name=BUCKET,
+        location="media",
+        access_key="minio",
+        secret_key="minio-secret",
+        region_name="us-east-1",
+        endpoint_url="http://minio:9000",
+    )
+
+
+@pytest.fixture
+def stubber(storage):
+    with Stubber(storage.connection.meta.client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_key_includes_location(storage):
+    assert storage._key("recipe_img/ab.png") == "media/recipe_img/ab.png"
+    assert storage._key("uploads//1/./a.png") == "media/uploads/1/a.png"
+
+
+def test_only_recipe_images_are_immutable(storage):
+    image = storage._get_write_parameters(storage._key("recipe_img/ab.png"))
+    upload = storage._get_write_parameters(storage._key("uploads/1/a.png"))
+
+    assert image["CacheControl"] == "public, max-age=31536000, immutable"
+    assert "CacheControl" not in upload
+
+
+def test_private_files_are_not_public():
+    storage = PrivateS3Storage(bucket_name=BUCKET, region_name="us-east-1")
+    key = storage._normalize_name("shopping_lists/1.pdf")
+    parameters = storage._get_write_parameters(key)
+
+    assert key == "private/shopping_lists/1.pdf"
+    assert parameters["ACL"] == "private"
+    assert "CacheControl" not in parameters
+
+
+def test_existing_content_is_touched_not_uploaded(storage, stubber):
+    name = hashed_name(
+        "recipe_img/photo.gif", content_hash(ContentFile(SMALL_GIF))
+    )
+    key = f"media/{name}"
+    head = {
+        "Metadata": {"origin": "seed"},
+        "ContentType": "image/gif",
+        "CacheControl": "public, max-age=31536000, immutable",
+    }
+    stubber.add_response("head_object", {}, {"Bucket": BUCKET, "Key": key})
+    stubber.add_response("head_object", head, {"Bucket": BUCKET, "Key": key})
+    stubber.add_response(
+        "copy_object",
+        {},
+        {
+            "Bucket": BUCKET,
+            "Key": key,
+            "CopySource": {"Bucket": BUCKET, "Key": key},
+            "MetadataDirective": "REPLACE",
+            "Metadata": head["Metadata"],
+            "ContentType": head["ContentType"],
+            "CacheControl": head["CacheControl"],
+        },
+    )
+
+    assert storage.save("recipe_img/photo.gif", ContentFile(SMALL_GIF)) == (
+        name
+    )
+
+
+def test_presigned_upload_limits_type_and_size(storage):
+    form = storage.presigned_upload(
+        "uploads/1/photo.png", "image/png", max_size=1024, expires=60
+    )
+
+    assert form["url"] == f"http://minio:9000/{BUCKET}"
+    assert form["fields"]["key"] == "media/uploads/1/photo.png"
+    assert form["fields"]["Content-Type"] == "image/png"
+    policy = json.loads(base64.b64decode(form["fields"]["policy"]))
+    assert {"Content-Type": "image/png"} in policy["conditions"]
+    assert ["content-length-range", 1, 1024] in policy["conditions"]
@@ -0,0 +1,35 @@
+from django.urls import reverse
+
+from tests import factories
+
+# В sqlite поиск деградирует до LIKE, который не сравнивает кириллицу
+# без учёта регистра, поэтому запросы совпадают с данными по регистру.
+
+
+def search(client, **params):
+    response = client.get(reverse("api:recipes-list"), params)
+    assert response.status_code == 200
+    return [recipe["name"] for recipe in response.json()["results"]]
+
+
+def test_search_matches_name_and_text(client, user):
+    factories.create_recipe(user, name="Борщ", text="Свёкла и капуста")
+    factories.create_recipe(user, name="Щи", text="Как Борщ, но без свёклы")
+    factories.create_recipe(user, name="Плов", text="Рис и морковь")
+
+    assert search(client, search="Борщ") == ["Борщ", "Щи"]
+
+
+def test_search_ranks_name_above_text(client, user):
+    factories.create_recipe(user, name="Суп", text="Лучший пирог к супу")
+    factories.create_recipe(user, name="пирог", text="Тесто")
+
+    assert search(client, search="пирог") == ["пирог", "Суп"]
+
+
+def test_search_combines_with_filters(client, user):
+    tag = factories.create_tag()
+    factories.create_recipe(user, name="Салат цезарь", tags=[tag])
+    factories.create_recipe(user, name="Салат оливье")
+
+    assert search(client, search="Салат", tags=tag.slug) == ["Салат цезарь"]
@@ -0,0 +1,148 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from api import shopping_list
+from api.shopping_list import claim_jobs, prune_jobs, run_job
+from recipes.models import ShoppingListJob
+from tests import factories
+
+JOBS_URL = reverse("api:shopping_list_jobs-list")
+
+
+def run_worker():
+    call_command(
+        "run_shopping_list_worker", "--inline", "--once", stdout=StringIO()
+    )
+
+
+def stored_files() -> set:
+    directory = os.path.join(settings.PRIVATE_MEDIA_ROOT, "shopping_lists")
+    return set(os.listdir(directory)) if os.path.isdir(directory) else set()
+
+
+def test_job_is_rendered_by_worker(auth_client, catalog):
+    created = auth_client.post(JOBS_URL)
+    assert created.status_code == 202
+    assert created.data["status"] == ShoppingListJob.PENDING
+    assert created.data["download"] is None
+
+    run_worker()
+
+    job_url = reverse(
+        "api:shopping_list_jobs-detail", kwargs={"pk": created.data["id"]}
+    )
+    job = auth_client.get(job_url).data
+    assert job["status"] == ShoppingListJob.DONE
+    response = auth_client.get(job["download"])
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content).startswith(b"%PDF")
+    path = ShoppingListJob.objects.get().file.path
+    assert path.startswith(settings.PRIVATE_MEDIA_ROOT)
+
+
+def test_jobs_are_deduplicated_per_user(auth_client, catalog, user):
+    first = auth_client.post(JOBS_URL).data
+    second = auth_client.post(JOBS_URL).data
+    assert first["id"] == second["id"]
+
+    run_worker()
+    done = auth_client.post(JOBS_URL)
+    assert done.status_code == 200
+    assert done.data["id"] == first["id"]
+
+    factories.create_cart_item(user, factories.create_recipe(user))
+    changed = auth_client.post(JOBS_URL)
+    assert changed.status_code == 202
+    assert changed.data["id"] != first["id"]
+
+
+def test_jobs_are_private(auth_client, db):
+    job = ShoppingListJob.objects.create(user=factories.create_user())
+
+    response = auth_client.get(
+        reverse("api:shopping_list_jobs-detail", kwargs={"pk": job.pk})
+    )
+
+    assert response.status_code == 404
+
+
+def test_claim_respects_render_limit(db, settings):
+    settings.SHOPPING_LIST_MAX_RENDERS = 2
+    for _ in range(3):
+        ShoppingListJob.objects.create(user=factories.create_user())
+
+    assert len(claim_jobs(5)) == 2
+    assert claim_jobs(5) == []
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="advisory-блокировки Postgres"
+)
+def test_claim_takes_advisory_lock(db, django_assert_num_queries):
+    with django_assert_num_queries(3) as captured:
+        claim_jobs(1)
+
+    assert "pg_advisory_xact_lock" in captured.captured_queries[0]["sql"]
+
+
+def test_timed_out_job_is_not_overwritten(user, monkeypatch):
+    job = ShoppingListJob.objects.create(
+        user=user, status=ShoppingListJob.RUNNING
+    )
+    render = shopping_list.render_shopping_list
+
+    def slow_render(rows):
+        ShoppingListJob.objects.filter(id=job.id).update(
+            status=ShoppingListJob.FAILED
+        )
+        return render(rows)
+
+    monkeypatch.setattr(shopping_list, "render_shopping_list", slow_render)
+    files = stored_files()
+
+    assert run_job(job.id) == ShoppingListJob.FAILED
+    job.refresh_from_db()
+    assert job.status == ShoppingListJob.FAILED
+    assert not job.file
+    assert stored_files() == files
+
+
+def test_expired_jobs_are_pruned(auth_client, catalog):
+    auth_client.post(JOBS_URL)
+    run_worker()
+    job = ShoppingListJob.objects.get()
+    storage = job.file.storage
+    assert storage.exists(job.file.name)
+
+    ShoppingListJob.objects.update(
+        expires_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    assert prune_jobs() == 1
+    assert not ShoppingListJob.objects.exists()
+    assert not storage.exists(job.file.name)
+
+
+def test_expired_or_missing_file_is_not_served(auth_client, catalog):
+    auth_client.post(JOBS_URL)
+    run_worker()
+    job = ShoppingListJob.objects.get()
+    url = reverse("api:shopping_list_jobs-download", kwargs={"pk": job.pk})
+    assert auth_client.get(url).status_code == 200
+
+    ShoppingListJob.objects.update(expires_at=timezone.now())
+    assert auth_client.get(url).status_code == 404
+
+    ShoppingListJob.objects.update(
+        expires_at=timezone.now() + timedelta(minutes=1)
+    )
+    job.file.storage.delete(job.file.name)
+    assert auth_client.get(url).status_code == 404
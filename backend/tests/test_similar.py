@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from scipy import sparse
+
+from recipes import similarity
+from recipes.models import (PendingSimilarRecipe, RecipeIngredient,
+                            SimilarRecipe)
+from recipes.similarity import (process_pending_similar,
+                                rebuild_similar_recipes, top_neighbours)
+from tests import factories
+
+
+def stored_neighbours():
+    return {
+        (recipe_id, similar_id): pytest.approx(score, abs=1e-6)
+        for recipe_id, similar_id, score in SimilarRecipe.objects.values_list(
+            "recipe_id", "similar_id", "score"
+        )
+    }
+
+
+def test_top_neighbours_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(similarity, "SAMPLE_SIZE", 16)
+    monkeypatch.setattr(similarity, "ROW_BLOCK", 64)
+    matrix = sparse.random(300, 40, density=0.1, random_state=1, format="csr")
+    rows = np.arange(300)
+
+    owners, neighbours, scores = map(
+        np.concatenate, zip(*top_neighbours(matrix, rows, 5))
+    )
+
+    dense = (matrix @ matrix.T).toarray()
+    np.fill_diagonal(dense, 0)
+    for row in rows:
+        expected = np.sort(dense[row][dense[row] > 0])[::-1][:5]
+        assert np.allclose(scores[owners == row], expected)
+    assert (dense[owners, neighbours] == scores).all()
+
+
+@pytest.fixture
+def kitchen(user):
+    ingredients = [factories.create_ingredient() for _ in range(6)]
+    tag = factories.create_tag()
+    base = factories.create_recipe(
+        user, tags=[tag], ingredients=ingredients[:4]
+    )
+    close = factories.create_recipe(
+        user, tags=[tag], ingredients=ingredients[:3]
+    )
+    far = factories.create_recipe(user, ingredients=ingredients[3:5])
+    unrelated = factories.create_recipe(user, ingredients=ingredients[5:])
+    return ingredients, base, close, far, unrelated
+
+
+def test_similar_endpoint_orders_by_similarity(client, kitchen):
+    ingredients, base, close, far, unrelated = kitchen
+    rebuild_similar_recipes()
+
+    response = client.get(reverse("api:recipes-similar", args=[base.pk]))
+
+    assert response.status_code == 200
+    assert [recipe["id"] for recipe in response.data] == [close.pk, far.pk]
+
+
+def test_similar_endpoint_unknown_recipe(client, db):
+    response = client.get(reverse("api:recipes-similar", args=[999]))
+
+    assert response.status_code == 404
+
+
+@override_settings(SIMILAR_RECIPES_COUNT=1)
+def test_pending_update_matches_full_rebuild(
+    user, kitchen, django_capture_on_commit_callbacks
+):
+    ingredients, base, close, far, unrelated = kitchen
+    rebuild_similar_recipes()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        RecipeIngredient.objects.create(
+            recipe=unrelated, ingredient=ingredients[4], amount=1
+        )
+        added = factories.create_recipe(
+            user, tags=[factories.create_tag()], ingredients=ingredients[3:5]
+        )
+    assert {unrelated.pk, added.pk} <= set(
+        PendingSimilarRecipe.objects.values_list("recipe_id", flat=True)
+    )
+
+    process_pending_similar()
+    incremental = stored_neighbours()
+    rebuild_similar_recipes()
+
+    assert incremental == stored_neighbours()
+    assert not PendingSimilarRecipe.objects.exists()
+
+
+@override_settings(SIMILAR_RECIPES_COUNT=1)
+def test_deleted_recipe_referrers_are_refilled(
+    kitchen, django_capture_on_commit_callbacks
+):
+    ingredients, base, close, far, unrelated = kitchen
+    similarity.flush_similar_queue()
+    rebuild_similar_recipes()
+    assert SimilarRecipe.objects.get(recipe=base).similar_id == close.pk
+
+    with django_capture_on_commit_callbacks(execute=True):
+        close.delete()
+    process_pending_similar()
+
+    assert SimilarRecipe.objects.filter(recipe=base).count() == (
+        settings.SIMILAR_RECIPES_COUNT
+    )
+    incremental = stored_neighbours()
+    rebuild_similar_recipes()
+    assert incremental == stored_neighbours()
@@ -0,0 +1,133 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from api.sync import decode_cursor, encode_cursor
+from recipes.models import Favorite, Recipe, Tombstone
+from tests import factories
+
+SYNC_URL = reverse("api:sync")
+
+
+def sync_all(client, since=None, **params):
+    """Проходит все страницы синхронизации и собирает изменения."""
+    changes = {"recipes": [], "favorites": [], "deleted": {}}
+    while True:
+        if since:
+            params["since"] = since
+        response = client.get(SYNC_URL, params)
+        assert response.status_code == 200, response.content
+        data = response.data
+        changes["recipes"].extend(recipe["id"] for recipe in data["recipes"])
+        changes["favorites"].extend(data["favorites"])
+        for key, ids in data["deleted"].items():
+            changes["deleted"].setdefault(key, []).extend(ids)
+        since = data["cursor"]
+        if not data["has_more"]:
+            return changes, since
+
+
+def test_sync_requires_authentication(client, db):
+    assert client.get(SYNC_URL).status_code == 401
+
+
+def test_initial_sync_pages_through_everything(auth_client, catalog, user):
+    changes, _ = sync_all(auth_client, limit=5)
+
+    assert sorted(changes["recipes"]) == sorted(
+        recipe.pk for recipe in catalog.recipes
+    )
+    assert sorted(changes["favorites"]) == sorted(
+        recipe.pk for recipe in catalog.recipes[::2]
+    )
+    assert not any(changes["deleted"].values())
+
+
+def test_sync_returns_changes_and_deletions(auth_client, catalog, user):
+    _, cursor = sync_all(auth_client)
+    past = timezone.now() - timedelta(minutes=1)
+    Recipe.objects.update(updated_at=past)
+    Favorite.objects.update(created_at=past)
+    marker = past + timedelta(seconds=1)
+    cursor = encode_cursor(
+        {name: (marker, 0) for name in decode_cursor(cursor)}
+    )
+
+    edited = catalog.recipes[1]
+    edited.name = "Новое название"
+    edited.save()
+    deleted = catalog.recipes[2]
+    deleted_id = deleted.pk
+    deleted.delete()
+    Favorite.objects.filter(user=user, recipe=catalog.recipes[4]).delete()
+    factories.create_favorite(user, catalog.recipes[5])
+    Favorite.objects.filter(user=user, recipe=catalog.recipes[6]).delete()
+    factories.create_favorite(user, catalog.recipes[6])
+
+    changes, _ = sync_all(auth_client, cursor)
+
+    assert changes["recipes"] == [edited.pk]
+    assert sorted(changes["favorites"]) == [
+        catalog.recipes[5].pk,
+        catalog.recipes[6].pk,
+    ]
+    assert changes["deleted"]["recipes"] == [deleted_id]
+    # Избранное удалённого рецепта удаляется каскадом.
+    assert changes["deleted"]["favorites"] == [
+        deleted_id,
+        catalog.recipes[4].pk,
+    ]
+
+
+def test_sync_hides_other_users_deletions(auth_client, catalog, user):
+    _, cursor = sync_all(auth_client)
+    other = factories.create_user()
+    factories.create_favorite(other, catalog.recipe).delete()
+    cursor = encode_cursor(
+        {
+            name: (timezone.now() - timedelta(minutes=1), 0)
+            for name in decode_cursor(cursor)
+        }
+    )
+
+    changes, _ = sync_all(auth_client, cursor)
+
+    assert changes["deleted"]["favorites"] == []
+
+
+def test_expired_cursor_requires_full_sync(auth_client, db, settings):
+    past = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)
+
+    response = auth_client.get(
+        SYNC_URL, {"since": encode_cursor({"deleted": (past, 0)})}
+    )
+
+    assert response.status_code == 410
+
+
+def test_invalid_sync_params(auth_client, db):
+    assert auth_client.get(SYNC_URL, {"since": "%%%"}).status_code == 400
+    assert auth_client.get(SYNC_URL, {"limit": 0}).status_code == 400
+    naive = base64.urlsafe_b64encode(
+        json.dumps({"deleted": ["2026-10-19T00:00:00", 0]}).encode()
+    ).decode()
+    response = auth_client.get(SYNC_URL, {"since": naive})
+    assert response.status_code == 400
+    assert response.data == {"since": "Некорректный курсор."}
+
+
+def test_prune_tombstones(db, settings):
+    old = Tombstone.objects.create(kind=Tombstone.RECIPE, object_id=1)
+    Tombstone.objects.filter(pk=old.pk).update(
+        deleted_at=timezone.now()
+        - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)
+    )
+    fresh = Tombstone.objects.create(kind=Tombstone.RECIPE, object_id=2)
+
+    call_command("prune_tombstones")
+
+    assert list(Tombstone.objects.values_list("pk", flat=True)) == [fresh.pk]
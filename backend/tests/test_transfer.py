@@ -0,0 +1,43 @@
+import io
+import json
+
+from django.core.management import call_command
+
+from recipes.models import Ingredient, Recipe
+from recipes.transfer import RecipeImporter, export_recipes
+
+
+def export_lines():
+    stream = io.StringIO()
+    export_recipes(stream, chunk_size=5)
+    return stream.getvalue().splitlines()
+
+
+def test_export_import_round_trip(catalog, tmp_path):
+    path = tmp_path / "recipes.ndjson"
+    call_command(
+        "export_recipes", str(path), chunk_size=5, stderr=io.StringIO()
+    )
+    exported = path.read_text(encoding="utf-8").splitlines()
+    Recipe.objects.all().delete()
+
+    call_command("import_recipes", str(path), chunk_size=3)
+
+    assert len(exported) == len(catalog.recipes)
+    assert export_lines() == exported
+    catalog.author.refresh_from_db()
+    assert catalog.author.recipes_count == 2
+
+
+def test_import_skips_unknown_authors_and_creates_ingredients(catalog):
+    row = json.loads(export_lines()[0])
+    unknown_author = dict(row, author="nobody@example.com")
+    new_ingredient = dict(row, ingredients=[["шафран", "г", 1]])
+
+    importer = RecipeImporter()
+    importer.run([json.dumps(unknown_author), json.dumps(new_ingredient)])
+
+    assert (importer.imported, importer.skipped) == (1, 1)
+    ingredient = Ingredient.objects.get(name="шафран")
+    recipe = Recipe.objects.get(pk=importer.recipe_ids[0])
+    assert list(recipe.ingredients.all()) == [ingredient]
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from recipes.models import Favorite, RecipeRanking, Shopping
+from recipes.ranking import compute_trending
+from tests import factories
+
+
+@pytest.fixture
+def popularity(user):
+    fans = [factories.create_user() for _ in range(3)]
+    old, fresh, carted, unranked = [
+        factories.create_recipe(user) for _ in range(4)
+    ]
+    for fan in fans:
+        factories.create_favorite(fan, old)
+    Favorite.objects.filter(recipe=old).update(
+        created_at=timezone.now() - timedelta(days=21)
+    )
+    factories.create_favorite(fans[0], fresh)
+    factories.create_cart_item(fans[0], carted)
+    return old, fresh, carted, unranked
+
+
+def test_compute_trending_decays_old_events(popularity):
+    old, fresh, carted, unranked = popularity
+
+    assert compute_trending(half_life_days=7) == 3
+
+    scores = dict(RecipeRanking.objects.values_list("recipe_id", "score"))
+    assert scores[fresh.pk] == pytest.approx(1.0)
+    assert scores[carted.pk] == pytest.approx(0.5)
+    assert scores[old.pk] == pytest.approx(3 * 0.5**3)
+    assert unranked.pk not in scores
+
+
+def test_compute_trending_skips_events_outside_window(popularity):
+    old, fresh, carted, unranked = popularity
+    Shopping.objects.update(created_at=timezone.now() - timedelta(days=90))
+
+    compute_trending(window_days=30)
+
+    assert not RecipeRanking.objects.filter(recipe=carted).exists()
+
+
+def test_ordering_trending(auth_client, popularity):
+    old, fresh, carted, unranked = popularity
+    call_command("compute_trending", half_life_days=7)
+
+    response = auth_client.get(
+        reverse("api:recipes-list"), {"ordering": "trending"}
+    )
+
+    assert [recipe["id"] for recipe in response.data["results"]] == [
+        fresh.pk,
+        carted.pk,
+        old.pk,
+        unranked.pk,
+    ]
@@ -0,0 +1,122 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from api.authentication import CachedTokenAuthentication
+from api.views import CustomUserViewSet
+from tests import factories
+
+User = get_user_model()
+
+USERS_URL = reverse("api:users-list")
+
+
+def test_username_prefix_filter(client, db):
+    factories.create_user(username="Anna")
+    factories.create_user(username="annette")
+    factories.create_user(username="boris")
+
+    response = client.get(USERS_URL, {"username": "ann"})
+
+    assert {row["username"] for row in response.data["results"]} == {
+        "Anna",
+        "annette",
+    }
+
+
+def test_cursor_pages_follow_id_order(client, db):
+    users = [factories.create_user() for _ in range(5)]
+
+    first = client.get(USERS_URL, {"cursor": "", "limit": 3}).data
+    second = client.get(first["next"]).data
+
+    assert "count" not in first
+    assert second["next"] is None
+    assert [
+        row["id"] for row in first["results"] + second["results"]
+    ] == [user.pk for user in users]
+
+
+def counters(user):
+    user.refresh_from_db()
+    return user.recipes_count, user.followers_count, user.following_count
+
+
+def test_counters_follow_recipes_and_subscriptions(user):
+    author = factories.create_user()
+    recipe = factories.create_recipe(author)
+    factories.create_recipe(author)
+    subscription = factories.create_subscription(user, author)
+
+    assert counters(author) == (2, 1, 0)
+    assert counters(user) == (0, 0, 1)
+
+    recipe.delete()
+    subscription.delete()
+
+    assert counters(author) == (1, 0, 0)
+    assert counters(user) == (0, 0, 0)
+
+
+def test_counters_follow_cascade_delete(user):
+    author = factories.create_user()
+    factories.create_recipe(author)
+    factories.create_subscription(user, author)
+    factories.create_subscription(author, user)
+
+    author.delete()
+
+    assert counters(user) == (0, 0, 0)
+
+
+def test_user_saves_keep_counters(auth_client, user):
+    factories.create_recipe(user)
+    factories.create_subscription(factories.create_user(), user)
+    assert auth_client.get(reverse("api:users-me")).status_code == 200
+
+    response = auth_client.post(
+        reverse("api:users-set-password"),
+        {"current_password": "password-123", "new_password": "n3w-Pa55word"},
+    )
+    assert response.status_code == 204, response.data
+    assert counters(user) == (1, 1, 0)
+
+    stale = User.objects.get(pk=user.pk)
+    stale.recipes_count = stale.followers_count = 0
+    stale.first_name = "Новое имя"
+    stale.save()
+    assert counters(user) == (1, 1, 0)
+    assert user.first_name == "Новое имя"
+
+
+def test_cached_user_reads_fresh_counters(auth_client, user, monkeypatch):
+    monkeypatch.setattr(
+        CustomUserViewSet,
+        "authentication_classes",
+        [CachedTokenAuthentication],
+    )
+    me_url = reverse("api:users-me")
+    assert auth_client.get(me_url).data["recipes_count"] == 0
+
+    factories.create_recipe(user)
+
+    assert auth_client.get(me_url).data["recipes_count"] == 1
+
+
+def test_repair_command_restores_counters(user, catalog):
+    User.objects.update(recipes_count=0, followers_count=5)
+
+    call_command("repair_user_counters", batch_size=3, stdout=StringIO())
+
+    assert counters(catalog.author) == (2, 1, 0)
+    assert counters(user) == (0, 0, len(catalog.authors))
+
+
+def test_user_list_reads_counters(auth_client, catalog):
+    results = auth_client.get(USERS_URL, {"limit": 100}).data["results"]
+
+    author = next(row for row in results if row["id"] == catalog.author.pk)
+    assert author["recipes_count"] == 2
+    assert author["followers_count"] == 1
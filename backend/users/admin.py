@@ -3,6 +3,9 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
+from recipes.admin_tools import (AuthorEmailFilter, EstimatedCountPaginator,
+                                 UserEmailFilter)
+
 from .forms import CustomUserCreationForm
 from .models import Subscribe
 
@@ -20,17 +23,20 @@ class CustomUserAdmin(UserAdmin):
         "first_name",
         "last_name",
     )
-    list_filter = (
-        "email",
-        "username",
-    )
+    list_filter = ("is_staff", "is_active")
     ordering = ("id",)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
 
 @admin.register(Subscribe)
 class SubscribeAdmin(admin.ModelAdmin):
     list_display = ("user", "author")
-    search_fields = ("user", "author")
-    list_filter = ("user", "author")
+    list_select_related = ("user", "author")
+    search_fields = ("user__email", "author__email")
+    list_filter = (UserEmailFilter, AuthorEmailFilter)
+    autocomplete_fields = ("user", "author")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Recipe
+from users.models import Subscribe
+
+User = get_user_model()
+
+COUNTERS = {
+    "recipes_count": (Recipe, "author"),
+    "followers_count": (Subscribe, "author"),
+    "following_count": (Subscribe, "user"),
+}
+
+
+def count_of(model, field: str):
+    """Подзапрос с числом строк model, ссылающихся на пользователя."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def repair_user_counters(queryset=None) -> int:
+    """Пересчитывает счётчики пользователей по рецептам и подпискам."""
+    if queryset is None:
+        queryset = User.objects.all()
+    return queryset.update(
+        **{
+            name: count_of(model, field)
+            for name, (model, field) in COUNTERS.items()
+        }
+    )
+
+
+def change_counter(user_id: int, name: str, delta: int) -> None:
+    queryset = User.objects.filter(pk=user_id)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{name}__gte": -delta})
+    queryset.update(**{name: F(name) + delta})
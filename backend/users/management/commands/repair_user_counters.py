@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.counters import repair_user_counters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики рецептов и подписок пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = User.objects.order_by("-id").values_list("id", flat=True)
+        last_id = last_id.first() or 0
+        repaired = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                repaired += repair_user_counters(
+                    User.objects.filter(
+                        id__gt=start, id__lte=start + batch_size
+                    )
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пересчитаны счётчики пользователей: {repaired}"
+            )
+        )
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+CREATE_INDEX_SQL = """
+CREATE INDEX users_customuser_username_upper_like
+    ON users_customuser (UPPER(username::text) text_pattern_ops);
+"""
+
+DROP_INDEX_SQL = """
+DROP INDEX IF EXISTS users_customuser_username_upper_like;
+"""
+
+
+def create_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_INDEX_SQL)
+
+
+def drop_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_username_index, drop_username_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    user_model = apps.get_model("users", "CustomUser")
+    recipe_model = apps.get_model("recipes", "Recipe")
+    subscribe_model = apps.get_model("users", "Subscribe")
+
+    def count_of(model, field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{field: OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+    user_model.objects.update(
+        recipes_count=count_of(recipe_model, "author"),
+        followers_count=count_of(subscribe_model, "author"),
+        following_count=count_of(subscribe_model, "user"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_username_upper_like_index"),
+        ("recipes", "0008_cofavoriterecipe"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="followers_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Подписчиков"
+            ),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="following_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Подписок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="recipes_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Рецептов"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.11 on 2026-10-19 09:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_user_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscribe",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name="Дата подписки",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="subscribe",
+            index=models.Index(
+                fields=["user", "created_at"], name="subscribe_user_created_idx"
+            ),
+        ),
+    ]
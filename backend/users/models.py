@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+COUNTER_FIELDS = ("recipes_count", "followers_count", "following_count")
+
 
 class CustomUser(AbstractUser):
     """Модель пользователя."""
@@ -24,6 +26,15 @@ class CustomUser(AbstractUser):
     )
     first_name = models.CharField("Имя", max_length=150)
     last_name = models.CharField("Фамилия", max_length=150)
+    recipes_count = models.PositiveIntegerField(
+        "Рецептов", default=0, editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        "Подписчиков", default=0, editable=False
+    )
+    following_count = models.PositiveIntegerField(
+        "Подписок", default=0, editable=False
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = [
@@ -47,6 +58,21 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        """Не перезаписывает счётчики: их меняет только users.counters."""
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = (
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                )
+            kwargs["update_fields"] = [
+                name for name in update_fields if name not in COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Subscribe(models.Model):
     """Модель подписки."""
@@ -63,6 +89,7 @@ class Subscribe(models.Model):
         related_name="following",
         verbose_name="Автор",
     )
+    created_at = models.DateTimeField("Дата подписки", auto_now_add=True)
 
     class Meta:
         verbose_name = "Подписка"
@@ -73,6 +100,12 @@ class Subscribe(models.Model):
                 name="unique_follow",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"],
+                name="subscribe_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user_id} подписан на {self.author_id}"